@@ -3,6 +3,9 @@ from django.utils.html import format_html
 from django.urls import reverse
 from django.http import HttpResponseRedirect
 from django.contrib import messages
+from django.db import transaction
+from django.utils import timezone
+from . import catalog
 from .models import Scheme, Subject, AcademicResource
 
 
@@ -34,7 +37,7 @@ class AcademicResourceAdmin(admin.ModelAdmin):
     list_filter = ['category', 'subject__scheme', 'is_approved', 'is_featured', 'uploaded_by', 'created_at']
     search_fields = ['title', 'description', 'subject__name', 'uploaded_by__username']
     list_editable = ['is_approved', 'is_featured']
-    readonly_fields = ['uploaded_by', 'file_size', 'download_count', 'view_count', 'created_at', 'updated_at']
+    readonly_fields = ['uploaded_by', 'file_size', 'page_count', 'thumbnail', 'processed_at', 'download_count', 'view_count', 'created_at', 'updated_at']
     date_hierarchy = 'created_at'
     actions = ['approve_selected_resources', 'reject_selected_resources']
     
@@ -43,7 +46,7 @@ class AcademicResourceAdmin(admin.ModelAdmin):
             'fields': ('title', 'description', 'category', 'subject')
         }),
         ('File Information', {
-            'fields': ('file', 'file_size')
+            'fields': ('file', 'file_size', 'page_count', 'thumbnail', 'processed_at')
         }),
         ('Resource Details', {
             'fields': ('module_number', 'exam_type', 'exam_year', 'author', 'publisher', 'edition', 'isbn')
@@ -78,13 +81,16 @@ class AcademicResourceAdmin(admin.ModelAdmin):
     
     def approve_selected_resources(self, request, queryset):
         """Admin action to approve selected resources"""
-        updated = queryset.update(is_approved=True, approved_by=request.user)
+        updated = queryset.update(is_approved=True, approved_by=request.user, approved_at=timezone.now())
+        # Bulk updates skip model signals
+        transaction.on_commit(catalog.invalidate)
         self.message_user(request, f'{updated} resources have been approved.')
     approve_selected_resources.short_description = "Approve selected resources"
     
     def reject_selected_resources(self, request, queryset):
         """Admin action to reject selected resources"""
         updated = queryset.update(is_approved=False, approved_by=None)
+        transaction.on_commit(catalog.invalidate)
         self.message_user(request, f'{updated} resources have been rejected.')
     reject_selected_resources.short_description = "Reject selected resources"
     
@@ -0,0 +1,93 @@
+"""
+Precomputed Scheme -> Semester -> Subject catalog.
+
+The whole tree, including per-subject resource counts by category, is built
+with three queries and stored in Django's cache under a version number.
+Changes to schemes, subjects or resources bump the version (see
+``academics.signals``), so readers never see a stale tree and never have to
+delete keys across workers. That only holds when the cache is shared by all
+workers (Redis or the database cache, see ``eesa_backend.checks``); entries
+also expire after an hour as a bound if it is not.
+"""
+import hashlib
+import json
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count
+
+VERSION_KEY = 'academics:catalog:version'
+CACHE_TIMEOUT = 60 * 60
+
+
+def get_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def invalidate():
+    """Move readers to a new catalog version; the old entry simply expires"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, 2, timeout=None)
+
+
+def build_catalog():
+    from .models import ACADEMIC_CATEGORIES, AcademicResource, Scheme, Subject
+
+    counts = defaultdict(dict)
+    for row in (
+        AcademicResource.objects.filter(is_approved=True, is_active=True)
+        .order_by()
+        .values('subject_id', 'category')
+        .annotate(count=Count('id'))
+    ):
+        counts[row['subject_id']][row['category']] = row['count']
+
+    semesters = defaultdict(lambda: defaultdict(list))
+    for subject in Subject.objects.order_by('semester', 'name').values(
+        'id', 'name', 'code', 'semester', 'credits', 'is_active', 'scheme_id'
+    ):
+        subject_counts = {category: counts[subject['id']].get(category, 0) for category, _ in ACADEMIC_CATEGORIES}
+        semesters[subject.pop('scheme_id')][subject['semester']].append({
+            **subject,
+            'resource_counts': subject_counts,
+            'total_resources': sum(subject_counts.values()),
+        })
+
+    schemes = []
+    for scheme in Scheme.objects.order_by('-year').values('id', 'name', 'year', 'description', 'is_active'):
+        scheme_semesters = semesters.get(scheme['id'], {})
+        schemes.append({
+            **scheme,
+            'semesters': [
+                {'semester': number, 'subjects': scheme_semesters[number]}
+                for number in sorted(scheme_semesters)
+            ],
+        })
+
+    return {
+        'categories': [{'value': value, 'name': name} for value, name in ACADEMIC_CATEGORIES],
+        'schemes': schemes,
+    }
+
+
+def get_catalog():
+    """Return ``(etag, catalog)`` for the current version, building it on a miss"""
+    version = get_version()
+    key = f'academics:catalog:{version}'
+    entry = cache.get(key)
+    if entry is None:
+        data = build_catalog()
+        payload = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+        entry = {
+            'etag': '"%s"' % hashlib.md5(payload.encode()).hexdigest(),
+            'data': data,
+        }
+        cache.set(key, entry, timeout=CACHE_TIMEOUT)
+    return entry['etag'], entry['data']
@@ -0,0 +1,363 @@
+"""
+Write-behind download/view counters for academic resources.
+
+Increments are buffered instead of saving the resource row on every request.
+Buffers are flushed in batches: one ``UPDATE ... SET download_count =
+download_count + n`` per distinct delta, the same counts added to the
+trending buckets, plus a single ``bulk_create`` of the pending
+``ResourceDownload`` rows (history for signed-in users, already counted in
+the buckets).
+
+Two buffer backends are available (``ACADEMICS_COUNTERS['BACKEND']``):
+
+* ``memory`` - per-process buffer, flushed by whichever request crosses the
+  flush threshold/interval and at interpreter exit. Each worker holds its
+  own counts, which ``flush_resource_counters`` cannot reach and a killed
+  worker loses; meant for single-process development.
+* ``cache`` - a journal in Django's cache framework shared by all workers,
+  flushed by the ``flush_resource_counters`` management command (cron) or
+  by the request that crosses the threshold. The default with Redis.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BACKEND': 'memory',
+    'FLUSH_THRESHOLD': 100,
+    'FLUSH_INTERVAL': 30,
+    'MAX_PENDING': 10000,
+    'CACHE_PREFIX': 'academics:counters',
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'ACADEMICS_COUNTERS', {}))
+    return config
+
+
+def apply_increments(download_counts, view_counts, download_events):
+    """Write aggregated increments to the database in a single transaction"""
+    from . import trending
+    from .models import AcademicResource, ResourceDownload
+
+    with transaction.atomic():
+        for field, counts in (('download_count', download_counts), ('view_count', view_counts)):
+            by_delta = defaultdict(list)
+            for resource_id, delta in counts.items():
+                if delta:
+                    by_delta[delta].append(resource_id)
+            for delta, resource_ids in by_delta.items():
+                AcademicResource.objects.filter(pk__in=resource_ids).update(**{field: F(field) + delta})
+
+        if download_events:
+            existing = set(
+                AcademicResource.objects.filter(
+                    pk__in={event['resource_id'] for event in download_events}
+                ).values_list('pk', flat=True)
+            )
+            ResourceDownload.objects.bulk_create(
+                [
+                    ResourceDownload(
+                        resource_id=event['resource_id'],
+                        user_id=event['user_id'],
+                        ip_address=event['ip_address'],
+                        downloaded_at=event['downloaded_at'],
+                        is_aggregated=True,
+                    )
+                    for event in download_events
+                    if event['resource_id'] in existing
+                ],
+                batch_size=500,
+                ignore_conflicts=True,
+            )
+
+        # Every download and view, signed in or not; the ResourceDownload rows above are not counted again
+        trending.record_activity(download_counts, view_counts)
+
+
+class MemoryCounterBuffer:
+    """Per-process buffer guarded by a lock"""
+
+    def __init__(self, config):
+        self.config = config
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._downloads = Counter()
+        self._views = Counter()
+        self._events = []
+        self._pending = 0
+        self._oldest_pending = None
+        self._last_flush = time.monotonic()
+        self.metrics = {
+            'flushes': 0,
+            'flushed_increments': 0,
+            'dropped_increments': 0,
+            'last_flush_at': None,
+            'last_flush_duration': 0.0,
+            'last_flush_lag': 0.0,
+        }
+
+    def record(self, kind, resource_id, event=None):
+        with self._lock:
+            if self._pending >= self.config['MAX_PENDING']:
+                self.metrics['dropped_increments'] += 1
+                return
+            counts = self._downloads if kind == 'download' else self._views
+            counts[resource_id] += 1
+            if event is not None:
+                self._events.append(event)
+            self._pending += 1
+            if self._oldest_pending is None:
+                self._oldest_pending = time.monotonic()
+        if self.should_flush():
+            self.flush()
+
+    def should_flush(self):
+        if self._pending >= self.config['FLUSH_THRESHOLD']:
+            return True
+        return self._pending and time.monotonic() - self._last_flush >= self.config['FLUSH_INTERVAL']
+
+    def _drain(self):
+        with self._lock:
+            drained = (self._downloads, self._views, self._events, self._pending, self._oldest_pending)
+            self._downloads, self._views, self._events = Counter(), Counter(), []
+            self._pending = 0
+            self._oldest_pending = None
+            self._last_flush = time.monotonic()
+        return drained
+
+    def _restore(self, downloads, views, events, pending, oldest):
+        """Put back increments from a failed flush, dropping what does not fit"""
+        with self._lock:
+            room = self.config['MAX_PENDING'] - self._pending
+            if pending > room:
+                self.metrics['dropped_increments'] += pending
+                return
+            self._downloads.update(downloads)
+            self._views.update(views)
+            self._events.extend(events)
+            self._pending += pending
+            if oldest is not None:
+                self._oldest_pending = min(filter(None, [self._oldest_pending, oldest]))
+
+    def flush(self):
+        # Only one thread flushes at a time; others keep buffering
+        if not self._flush_lock.acquire(blocking=False):
+            return 0
+        try:
+            downloads, views, events, pending, oldest = self._drain()
+            if not pending:
+                return 0
+            started = time.monotonic()
+            try:
+                apply_increments(downloads, views, events)
+            except Exception:
+                logger.exception('Failed to flush academic resource counters')
+                self._restore(downloads, views, events, pending, oldest)
+                return 0
+            finished = time.monotonic()
+            self.metrics['flushes'] += 1
+            self.metrics['flushed_increments'] += pending
+            self.metrics['last_flush_at'] = timezone.now()
+            self.metrics['last_flush_duration'] = round(finished - started, 4)
+            self.metrics['last_flush_lag'] = round(finished - oldest, 4) if oldest else 0.0
+            return pending
+        finally:
+            self._flush_lock.release()
+
+    def stats(self):
+        with self._lock:
+            pending = self._pending
+            oldest = self._oldest_pending
+        return {
+            'backend': 'memory',
+            'pending_increments': pending,
+            'pending_age': round(time.monotonic() - oldest, 4) if oldest else 0.0,
+            **self.metrics,
+        }
+
+
+class CacheCounterBuffer:
+    """
+    Journal of increments kept in Django's cache.
+
+    Every increment takes a slot number from an atomic ``incr`` sequence and
+    is stored under its own key, so concurrent workers never overwrite each
+    other. A flush reads the slots between the last flushed sequence and the
+    current one with ``get_many``; slots evicted by the cache are reported as
+    dropped increments.
+    """
+
+    SLOT_TIMEOUT = 24 * 60 * 60
+
+    def __init__(self, config):
+        self.config = config
+        self.prefix = config['CACHE_PREFIX']
+
+    def key(self, name):
+        return f'{self.prefix}:{name}'
+
+    def _sequence(self):
+        try:
+            return cache.incr(self.key('seq'))
+        except ValueError:
+            cache.add(self.key('seq'), 0, timeout=None)
+            return cache.incr(self.key('seq'))
+
+    def record(self, kind, resource_id, event=None):
+        flushed = cache.get(self.key('flushed_seq'), 0)
+        if cache.get(self.key('seq'), 0) - flushed >= self.config['MAX_PENDING']:
+            self._bump_metric('dropped_increments')
+            return
+        seq = self._sequence()
+        cache.set(
+            self.key(f'slot:{seq}'),
+            {'kind': kind, 'resource_id': resource_id, 'event': event, 'at': time.time()},
+            timeout=self.SLOT_TIMEOUT,
+        )
+        if seq - flushed >= self.config['FLUSH_THRESHOLD']:
+            self.flush()
+
+    def _bump_metric(self, name, amount=1):
+        key = self.key(f'metric:{name}')
+        if not cache.add(key, amount, timeout=None):
+            try:
+                cache.incr(key, amount)
+            except ValueError:
+                cache.set(key, amount, timeout=None)
+
+    def flush(self):
+        lock_key = self.key('flush_lock')
+        if not cache.add(lock_key, 1, timeout=60):
+            return 0
+        try:
+            started = time.monotonic()
+            flushed_seq = cache.get(self.key('flushed_seq'), 0)
+            current_seq = cache.get(self.key('seq'), 0)
+            if current_seq <= flushed_seq:
+                return 0
+
+            slot_numbers = list(range(flushed_seq + 1, current_seq + 1))
+            slots = {}
+            for i in range(0, len(slot_numbers), 500):
+                keys = [self.key(f'slot:{n}') for n in slot_numbers[i:i + 500]]
+                slots.update(cache.get_many(keys))
+
+            downloads, views, events = Counter(), Counter(), []
+            oldest = None
+            dropped = 0
+            last_seq = flushed_seq
+            stalled = cache.get(self.key('stalled_seq'))
+            for n in slot_numbers:
+                slot = slots.get(self.key(f'slot:{n}'))
+                if slot is None:
+                    # A writer may have taken the number but not stored the
+                    # slot yet; give it until the next flush before dropping.
+                    if stalled != n:
+                        cache.set(self.key('stalled_seq'), n, timeout=None)
+                        break
+                    dropped += 1
+                    last_seq = n
+                    continue
+                counts = downloads if slot['kind'] == 'download' else views
+                counts[slot['resource_id']] += 1
+                if slot['event'] is not None:
+                    events.append(slot['event'])
+                oldest = min(filter(None, [oldest, slot['at']]))
+                last_seq = n
+
+            if downloads or views:
+                apply_increments(downloads, views, events)
+
+            cache.set(self.key('flushed_seq'), last_seq, timeout=None)
+            cache.delete_many([self.key(f'slot:{n}') for n in range(flushed_seq + 1, last_seq + 1)])
+
+            flushed = sum(downloads.values()) + sum(views.values())
+            if dropped:
+                self._bump_metric('dropped_increments', dropped)
+            self._bump_metric('flushes')
+            self._bump_metric('flushed_increments', flushed)
+            cache.set_many({
+                self.key('metric:last_flush_at'): timezone.now(),
+                self.key('metric:last_flush_duration'): round(time.monotonic() - started, 4),
+                self.key('metric:last_flush_lag'): round(time.time() - oldest, 4) if oldest else 0.0,
+            }, timeout=None)
+            return flushed
+        except Exception:
+            logger.exception('Failed to flush academic resource counters')
+            return 0
+        finally:
+            cache.delete(lock_key)
+
+    def stats(self):
+        names = ['flushes', 'flushed_increments', 'dropped_increments',
+                 'last_flush_at', 'last_flush_duration', 'last_flush_lag']
+        values = cache.get_many([self.key(f'metric:{name}') for name in names])
+        flushed_seq = cache.get(self.key('flushed_seq'), 0)
+        current_seq = cache.get(self.key('seq'), 0)
+        oldest = cache.get(self.key(f'slot:{flushed_seq + 1}'))
+        stats = {
+            'backend': 'cache',
+            'pending_increments': max(0, current_seq - flushed_seq),
+            'pending_age': round(time.time() - oldest['at'], 4) if oldest else 0.0,
+        }
+        for name in names:
+            stats[name] = values.get(self.key(f'metric:{name}'), 0 if name != 'last_flush_at' else None)
+        return stats
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                config = get_config()
+                if config['BACKEND'] == 'cache':
+                    _buffer = CacheCounterBuffer(config)
+                else:
+                    _buffer = MemoryCounterBuffer(config)
+                    atexit.register(_buffer.flush)
+    return _buffer
+
+
+def record_download(resource_id, user=None, ip_address=None):
+    """Buffer a download; authenticated downloads also produce a ResourceDownload row"""
+    event = None
+    if user is not None and user.is_authenticated:
+        event = {
+            'resource_id': resource_id,
+            'user_id': user.pk,
+            'ip_address': ip_address,
+            'downloaded_at': timezone.now(),
+        }
+    get_buffer().record('download', resource_id, event)
+
+
+def record_view(resource_id):
+    """Buffer a view of a resource"""
+    get_buffer().record('view', resource_id)
+
+
+def flush():
+    """Flush buffered increments now; returns the number of increments written"""
+    return get_buffer().flush()
+
+
+def get_stats():
+    return get_buffer().stats()
@@ -0,0 +1,108 @@
+"""
+Content-hash deduplication for academic resource files.
+
+Every new upload is hashed (SHA-256, streamed in chunks) before it is sent
+to storage. If a resource with the same hash already exists, the new
+resource points at the stored blob instead of uploading a second copy.
+"""
+import hashlib
+from urllib.request import urlopen
+
+from .downloads import get_local_path, signed_file_url
+
+HASH_CHUNK_SIZE = 64 * 1024
+
+
+def hash_file(file_obj):
+    """SHA-256 of an (uploaded or opened) Django File, read in chunks"""
+    digest = hashlib.sha256()
+    for chunk in file_obj.chunks(HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    if hasattr(file_obj, 'seek'):
+        file_obj.seek(0)
+    return digest.hexdigest()
+
+
+def hash_stored_file(field_file):
+    """SHA-256 of a file already in storage, with bounded memory even for remote storage"""
+    digest = hashlib.sha256()
+    path = get_local_path(field_file)
+    if path is not None:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+    else:
+        # Storage backends such as Cloudinary read the whole file into
+        # memory in open(); stream from the URL instead.
+        with urlopen(signed_file_url(field_file), timeout=60) as response:
+            for chunk in iter(lambda: response.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def find_existing_blob(file_hash, exclude_pk=None):
+    """Return (file name, size) of a stored resource with this content, if any"""
+    from .models import AcademicResource
+
+    existing = AcademicResource.objects.filter(file_hash=file_hash).exclude(file='')
+    if exclude_pk is not None:
+        existing = existing.exclude(pk=exclude_pk)
+    return existing.order_by('id').values_list('file', 'file_size').first()
+
+
+def deduplicate_upload(resource):
+    """
+    Hash a not-yet-stored upload on ``resource`` and, if identical content
+    is already stored, point the resource at that blob instead.
+
+    New resources may arrive with ``file_hash`` precomputed (the chunked
+    upload pipeline hashes while assembling); otherwise it is computed here.
+    """
+    if resource.pk is None and resource.file_hash:
+        content_hash = resource.file_hash
+    else:
+        content_hash = hash_file(resource.file)
+    resource.file_hash = content_hash
+    resource.file_size = resource.file.size
+
+    existing = find_existing_blob(content_hash, exclude_pk=resource.pk)
+    if existing is not None:
+        name, size = existing
+        # Assigning the stored name marks the file as committed, so no upload happens
+        resource.file = name
+        resource.file_size = size or resource.file_size
+    return existing is not None
+
+
+def duplicates_for(rows):
+    """
+    Map resource id -> list of other resources sharing its file hash, for
+    rows of dicts containing ``id`` and ``file_hash``. One query.
+    """
+    from .models import AcademicResource
+
+    hashes = {row['file_hash'] for row in rows if row.get('file_hash')}
+    if not hashes:
+        return {}
+
+    by_hash = {}
+    for other in AcademicResource.objects.filter(file_hash__in=hashes).order_by('id').values(
+        'id', 'title', 'file_hash', 'is_approved', 'subject__code'
+    ):
+        by_hash.setdefault(other['file_hash'], []).append(other)
+
+    duplicates = {}
+    for row in rows:
+        others = [
+            {
+                'id': other['id'],
+                'title': other['title'],
+                'subject_code': other['subject__code'],
+                'is_approved': other['is_approved'],
+            }
+            for other in by_hash.get(row.get('file_hash'), [])
+            if other['id'] != row['id']
+        ]
+        if others:
+            duplicates[row['id']] = others
+    return duplicates
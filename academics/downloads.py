@@ -0,0 +1,181 @@
+"""
+Streaming file delivery for academic resources.
+
+Files are never read fully into memory: local files are streamed in chunks
+(optionally honouring a single HTTP Range), can be handed off to the front
+web server via X-Accel-Redirect / X-Sendfile, and remote storages such as
+Cloudinary are answered with a redirect to a signed URL.
+"""
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def get_chunk_size():
+    return getattr(settings, 'ACADEMICS_DOWNLOAD_CHUNK_SIZE', 64 * 1024)
+
+
+def get_local_path(field_file):
+    """Return the local filesystem path of a file, or None for remote storages"""
+    try:
+        return field_file.path
+    except NotImplementedError:
+        return None
+
+
+def signed_file_url(field_file):
+    """Build a (signed where supported) URL for files on remote storage"""
+    storage = field_file.storage
+    try:
+        from cloudinary_storage.storage import MediaCloudinaryStorage
+    except ImportError:
+        MediaCloudinaryStorage = None
+
+    if MediaCloudinaryStorage is not None and isinstance(storage, MediaCloudinaryStorage):
+        import cloudinary.utils
+        url, _ = cloudinary.utils.cloudinary_url(
+            field_file.name,
+            resource_type=storage.RESOURCE_TYPE,
+            sign_url=True,
+            secure=True,
+        )
+        return url
+    return field_file.url
+
+
+def file_etag(stat_result):
+    """Strong ETag derived from the file's mtime and size"""
+    return quote_etag(f'{int(stat_result.st_mtime):x}-{stat_result.st_size:x}')
+
+
+def parse_range(header, size):
+    """
+    Parse a single-range ``Range`` header into an inclusive (start, end) tuple.
+
+    Returns None when the header is absent or unsupported (e.g. multiple
+    ranges), in which case the full file is served. Raises ValueError when
+    the range cannot be satisfied.
+    """
+    if not header:
+        return None
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    start, end = match.groups()
+    if start == '' and end == '':
+        return None
+    if start == '':
+        # Suffix range: the last N bytes
+        length = int(end)
+        if length == 0:
+            raise ValueError('Unsatisfiable range')
+        return max(0, size - length), size - 1
+
+    start = int(start)
+    end = int(end) if end else size - 1
+    if start >= size or end < start:
+        raise ValueError('Unsatisfiable range')
+    return start, min(end, size - 1)
+
+
+def iter_file_range(path, start, length, chunk_size):
+    """Yield ``length`` bytes of ``path`` starting at ``start`` in chunks"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = f.read(min(chunk_size, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def serve_file(request, field_file, on_download=None):
+    """
+    Build the response for downloading ``field_file``.
+
+    ``on_download`` is called once for every request that starts a new
+    download, i.e. not for 304 revalidations or resumed ranges.
+    """
+    def count():
+        if on_download is not None:
+            on_download()
+
+    file_path = get_local_path(field_file)
+    if file_path is None:
+        count()
+        return HttpResponseRedirect(signed_file_url(field_file))
+
+    try:
+        stat_result = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+
+    etag = file_etag(stat_result)
+    last_modified = int(stat_result.st_mtime)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        return not_modified
+
+    size = stat_result.st_size
+    filename = os.path.basename(field_file.name)
+    content_type = 'application/octet-stream'
+
+    # Only honour Range if the client's cached copy is still current
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if if_range and if_range != etag:
+        range_header = None
+
+    try:
+        byte_range = parse_range(range_header, size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None or byte_range[0] == 0:
+        count()
+
+    offload = getattr(settings, 'ACADEMICS_DOWNLOAD_OFFLOAD', '')
+    if offload:
+        # The web server streams the file and handles Range itself
+        response = HttpResponse(content_type=content_type)
+        if offload == 'x-accel-redirect':
+            prefix = getattr(settings, 'ACADEMICS_DOWNLOAD_ACCEL_PREFIX', '/protected-media/')
+            response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + field_file.name.lstrip('/')
+        else:
+            response['X-Sendfile'] = file_path
+    elif byte_range is not None:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            iter_file_range(file_path, start, length, get_chunk_size()),
+            status=206,
+            content_type=content_type,
+        )
+        response['Content-Length'] = str(length)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    else:
+        response = FileResponse(
+            open(file_path, 'rb'),
+            as_attachment=True,
+            filename=filename,
+            content_type=content_type,
+        )
+        response.block_size = get_chunk_size()
+
+    if 'Content-Disposition' not in response:
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
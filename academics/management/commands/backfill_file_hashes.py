@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from academics.dedup import hash_stored_file
+from academics.models import AcademicResource
+
+
+class Command(BaseCommand):
+    help = 'Compute content hashes for academic resources that do not have one yet'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100, help='Resources loaded per query')
+        parser.add_argument(
+            '--link-duplicates',
+            action='store_true',
+            help='Point duplicate resources at the oldest stored copy (orphaned blobs are listed, not deleted)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        pending = AcademicResource.objects.filter(file_hash='').exclude(file='')
+        total = pending.count()
+        self.stdout.write(f'🔐 Hashing {total} academic resources...')
+
+        hashed = failed = 0
+        last_id = 0
+        while True:
+            # Keyset batches keep memory flat; files are streamed in fixed-size chunks
+            batch = list(pending.filter(id__gt=last_id).order_by('id').only('id', 'file')[:batch_size])
+            if not batch:
+                break
+            for resource in batch:
+                last_id = resource.id
+                try:
+                    file_hash = hash_stored_file(resource.file)
+                except Exception as e:
+                    failed += 1
+                    self.stdout.write(self.style.WARNING(f'⚠️  Resource {resource.id} ({resource.file.name}): {e}'))
+                    continue
+                AcademicResource.objects.filter(pk=resource.pk).update(file_hash=file_hash)
+                hashed += 1
+            self.stdout.write(f'   {hashed}/{total} hashed')
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Hashed {hashed} resources ({failed} failed)'))
+
+        groups = (
+            AcademicResource.objects.exclude(file_hash='')
+            .order_by()
+            .values('file_hash')
+            .annotate(count=Count('id'))
+            .filter(count__gt=1)
+        )
+        duplicate_groups = list(groups.values_list('file_hash', flat=True))
+        self.stdout.write(f'📎 {len(duplicate_groups)} sets of identical files')
+
+        if not options['link_duplicates']:
+            return
+
+        orphaned = set()
+        linked = 0
+        for file_hash in duplicate_groups:
+            copies = list(
+                AcademicResource.objects.filter(file_hash=file_hash).order_by('id').values_list('id', 'file')
+            )
+            canonical_name = copies[0][1]
+            for resource_id, name in copies[1:]:
+                if name != canonical_name:
+                    AcademicResource.objects.filter(pk=resource_id).update(file=canonical_name)
+                    orphaned.add(name)
+                    linked += 1
+
+        self.stdout.write(self.style.SUCCESS(f'✅ Linked {linked} duplicate resources to a shared file'))
+        for name in sorted(orphaned):
+            self.stdout.write(f'   unreferenced: {name}')
@@ -0,0 +1,68 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from academics import counters
+from academics.models import AcademicResource
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Compare downloads/second of per-request save() counting against the write-behind counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--downloads',
+            type=int,
+            default=2000,
+            help='Number of simulated downloads per run',
+        )
+        parser.add_argument(
+            '--resources',
+            type=int,
+            default=10,
+            help='Number of approved resources to spread downloads over',
+        )
+
+    def handle(self, *args, **options):
+        downloads = options['downloads']
+        resources = list(
+            AcademicResource.objects.filter(is_approved=True)[:options['resources']]
+        )
+        if not resources:
+            raise CommandError('No approved academic resources to benchmark against')
+        user = User.objects.first()
+        
+        self.stdout.write(f'🚀 Benchmarking {downloads} downloads over {len(resources)} resources...')
+        
+        # Everything runs in a transaction that is rolled back, so the
+        # benchmark leaves no counts or ResourceDownload rows behind.
+        with transaction.atomic():
+            legacy_rate = self.run_legacy(resources, downloads)
+            buffered_rate = self.run_buffered(resources, downloads, user)
+            transaction.set_rollback(True)
+        
+        self.stdout.write(f'🐢 save() per download:   {legacy_rate:,.0f} downloads/s')
+        self.stdout.write(f'⚡ write-behind counters: {buffered_rate:,.0f} downloads/s')
+        self.stdout.write(self.style.SUCCESS(f'✅ Speedup: {buffered_rate / legacy_rate:.1f}x'))
+
+    def run_legacy(self, resources, downloads):
+        """The original path: load the row and save() it on every download"""
+        started = time.perf_counter()
+        for i in range(downloads):
+            resource = AcademicResource.objects.get(pk=resources[i % len(resources)].pk)
+            resource.download_count += 1
+            resource.save()
+        return downloads / (time.perf_counter() - started)
+
+    def run_buffered(self, resources, downloads, user):
+        """Buffered increments, including the final flush"""
+        counters.flush()
+        started = time.perf_counter()
+        for i in range(downloads):
+            counters.record_download(resources[i % len(resources)].pk, user, '127.0.0.1')
+        counters.flush()
+        return downloads / (time.perf_counter() - started)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from academics.models import ResourceUploadSession
+from academics.uploads import discard_parts
+
+
+class Command(BaseCommand):
+    help = 'Delete expired chunked upload sessions and their temporary parts'
+
+    def handle(self, *args, **options):
+        expired = ResourceUploadSession.objects.filter(
+            status__in=['pending', 'assembling'],
+            expires_at__lt=timezone.now()
+        )
+        
+        count = 0
+        for session in expired.iterator():
+            discard_parts(session)
+            count += 1
+        expired.delete()
+        
+        self.stdout.write(self.style.SUCCESS(f'✅ Removed {count} expired upload sessions'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from academics import counters
+
+
+class Command(BaseCommand):
+    help = 'Flush buffered academic resource download/view counters to the database'
+
+    def handle(self, *args, **options):
+        flushed = counters.flush()
+        stats = counters.get_stats()
+        
+        if counters.get_config()['BACKEND'] == 'memory':
+            self.stdout.write(self.style.WARNING(
+                '⚠️  Memory backend: only this process was flushed; each server worker flushes its own buffer'
+            ))
+        self.stdout.write(self.style.SUCCESS(f'✅ Flushed {flushed} increments'))
+        self.stdout.write(f'📦 Pending: {stats["pending_increments"]} (oldest {stats["pending_age"]}s)')
+        self.stdout.write(f'⏱️  Last flush lag: {stats["last_flush_lag"]}s')
+        if stats['dropped_increments']:
+            self.stdout.write(
+                self.style.WARNING(f'⚠️  Dropped increments: {stats["dropped_increments"]}')
+            )
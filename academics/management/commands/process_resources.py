@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+
+from academics import processing
+from academics.models import AcademicResource, ResourceProcessingJob
+
+
+class Command(BaseCommand):
+    help = 'Run the background worker that extracts page count, text and thumbnails from academic PDFs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='Extraction processes (default ACADEMICS_PROCESSING_WORKERS)')
+        parser.add_argument('--once', action='store_true', help='Exit when the queue is empty')
+        parser.add_argument('--poll-interval', type=float, default=5, help='Seconds to sleep when the queue is empty')
+        parser.add_argument('--enqueue-missing', action='store_true', help='Queue every unprocessed resource first')
+
+    def handle(self, *args, **options):
+        if options['enqueue_missing']:
+            queued = ResourceProcessingJob.objects.filter(resource=OuterRef('pk'), status__in=['pending', 'running'])
+            missing = (
+                AcademicResource.objects.filter(processed_at__isnull=True)
+                .exclude(file='')
+                .exclude(Exists(queued))
+                .values_list('id', flat=True)
+            )
+            jobs = ResourceProcessingJob.objects.bulk_create(
+                [ResourceProcessingJob(resource_id=resource_id) for resource_id in missing.iterator()],
+                batch_size=500,
+            )
+            self.stdout.write(f'📥 Queued {len(jobs)} unprocessed resources')
+        
+        workers = options['workers'] or processing.get_worker_count()
+        self.stdout.write(f'⚙️  Processing academic resources with {workers} workers...')
+        
+        def log(done, failed):
+            self.stdout.write(f'   processed {done}, failed {failed}')
+        
+        try:
+            totals = processing.run_worker(
+                workers=workers,
+                once=options['once'],
+                poll_interval=options['poll_interval'],
+                log=log,
+            )
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('⚠️  Stopped'))
+            return
+        
+        self.stdout.write(self.style.SUCCESS(f'✅ Processed {totals["done"]} resources ({totals["failed"]} failed)'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from academics import search
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for academic resources'
+
+    def handle(self, *args, **options):
+        vendor = search.get_vendor()
+        if vendor != 'postgresql' and not search.fts5_available():
+            self.stdout.write(
+                self.style.WARNING(f'⚠️  No full-text index available on {vendor}; search falls back to icontains')
+            )
+            return
+        
+        self.stdout.write(f'🔎 Rebuilding search index ({vendor})...')
+        indexed = search.index_resources()
+        self.stdout.write(self.style.SUCCESS(f'✅ Indexed {indexed} academic resources'))
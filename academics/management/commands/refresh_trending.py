@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from academics import trending
+
+
+class Command(BaseCommand):
+    help = 'Fold download rows still pending into the trending buckets and prune old buckets'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=trending.REFRESH_BATCH_SIZE)
+        parser.add_argument('--no-prune', action='store_true', help=f'Keep buckets older than {trending.RETENTION.days} days')
+
+    def handle(self, *args, **options):
+        self.stdout.write('📈 Refreshing trending buckets...')
+        processed = trending.refresh(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Aggregated {processed} downloads'))
+        
+        if not options['no_prune']:
+            deleted = trending.prune()
+            self.stdout.write(f'🧹 Pruned {deleted} buckets older than {trending.RETENTION.days} days')
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:47
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='resourcedownload',
+            name='downloaded_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0003_resourcedownload_downloaded_at_default'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='academicresource',
+            index=models.Index(fields=['is_approved', '-is_featured', '-created_at', '-id'], name='academics_resource_listing'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+POSTGRES_FORWARD = [
+    "CREATE INDEX IF NOT EXISTS academics_resource_search_gin "
+    "ON academics_academicresource USING gin (search_vector)",
+    "UPDATE academics_academicresource r SET search_vector = "
+    "setweight(to_tsvector('english', coalesce(r.title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(s.code, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(r.author, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(s.name, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(sc.name, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(r.description, '')), 'C') "
+    "FROM academics_subject s JOIN academics_scheme sc ON sc.id = s.scheme_id "
+    "WHERE s.id = r.subject_id",
+]
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS academics_resource_fts USING fts5("
+    "title, description, author, subject_code, subject_name, scheme_name, "
+    "tokenize = 'unicode61')",
+    "INSERT INTO academics_resource_fts "
+    "(rowid, title, description, author, subject_code, subject_name, scheme_name) "
+    "SELECT r.id, r.title, r.description, r.author, s.code, s.name, sc.name "
+    "FROM academics_academicresource r "
+    "JOIN academics_subject s ON s.id = r.subject_id "
+    "JOIN academics_scheme sc ON sc.id = s.scheme_id",
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        statements = POSTGRES_FORWARD
+    elif vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cursor.fetchone()[0]:
+                return
+        statements = SQLITE_FORWARD
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX IF EXISTS academics_resource_search_gin")
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS academics_resource_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0004_academicresource_listing_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='academicresource',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
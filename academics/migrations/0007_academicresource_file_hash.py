@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0006_resourceuploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='academicresource',
+            name='file_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+    ]
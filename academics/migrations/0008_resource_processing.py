@@ -0,0 +1,93 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:55
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+SQLITE_FTS_COLUMNS = "title, description, author, subject_code, subject_name, scheme_name"
+
+SQLITE_POPULATE = (
+    "INSERT INTO academics_resource_fts (rowid, {columns}) "
+    "SELECT r.id, r.title, r.description, r.author, s.code, s.name, sc.name{extra} "
+    "FROM academics_academicresource r "
+    "JOIN academics_subject s ON s.id = r.subject_id "
+    "JOIN academics_scheme sc ON sc.id = s.scheme_id"
+)
+
+
+def _rebuild_fts(schema_editor, with_body):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'academics_resource_fts'"
+        )
+        if cursor.fetchone() is None:
+            return
+    columns = SQLITE_FTS_COLUMNS + (', body' if with_body else '')
+    schema_editor.execute("DROP TABLE academics_resource_fts")
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE academics_resource_fts USING fts5({columns}, tokenize = 'unicode61')"
+    )
+    schema_editor.execute(
+        SQLITE_POPULATE.format(columns=columns, extra=', r.extracted_text' if with_body else '')
+    )
+
+
+def add_fts_body(apps, schema_editor):
+    _rebuild_fts(schema_editor, with_body=True)
+
+
+def remove_fts_body(apps, schema_editor):
+    _rebuild_fts(schema_editor, with_body=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0007_academicresource_file_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='academicresource',
+            name='extracted_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='academicresource',
+            name='page_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='academicresource',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='academicresource',
+            name='thumbnail',
+            field=models.ImageField(blank=True, null=True, upload_to='academics/thumbnails/'),
+        ),
+        migrations.CreateModel(
+            name='ResourceProcessingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('locked_by', models.CharField(blank=True, max_length=100)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('resource', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='processing_jobs', to='academics.academicresource')),
+            ],
+            options={
+                'ordering': ['run_after', 'id'],
+                'indexes': [models.Index(fields=['status', 'run_after'], name='academics_r_status_b22188_idx')],
+            },
+        ),
+        migrations.RunPython(add_fts_body, remove_fts_body),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.4 on 2026-10-18 05:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0009_academicresource_moderation_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResourceActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semester', models.PositiveIntegerField()),
+                ('category', models.CharField(choices=[('notes', 'Notes'), ('textbook', 'Textbooks'), ('pyq', 'Previous Year Questions'), ('regulations', 'Regulations'), ('syllabus', 'Syllabus')], max_length=20)),
+                ('bucket_start', models.DateTimeField()),
+                ('downloads', models.PositiveIntegerField(default=0)),
+                ('views', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-bucket_start'],
+            },
+        ),
+        migrations.AddField(
+            model_name='resourcedownload',
+            name='is_aggregated',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='resourcedownload',
+            index=models.Index(condition=models.Q(('is_aggregated', False)), fields=['id'], name='academics_download_pending'),
+        ),
+        migrations.AddField(
+            model_name='resourceactivity',
+            name='resource',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='academics.academicresource'),
+        ),
+        migrations.AddField(
+            model_name='resourceactivity',
+            name='subject',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='resource_activity', to='academics.subject'),
+        ),
+        migrations.AddIndex(
+            model_name='resourceactivity',
+            index=models.Index(fields=['bucket_start', 'semester'], name='academics_r_bucket__443b95_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resourceactivity',
+            index=models.Index(fields=['bucket_start', 'subject'], name='academics_r_bucket__baa51b_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='resourceactivity',
+            unique_together={('resource', 'bucket_start')},
+        ),
+    ]
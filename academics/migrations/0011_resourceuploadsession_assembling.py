@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0010_resource_activity'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='resourceuploadsession',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('assembling', 'Assembling'), ('completed', 'Completed'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+    ]
@@ -1,6 +1,9 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import FileExtensionValidator
+from django.utils import timezone
+import uuid
 # from students.models import Student  # Temporarily disabled during migration
 
 User = get_user_model()
@@ -99,6 +102,13 @@ class AcademicResource(models.Model):
         help_text="Upload only PDF files. Maximum file size: 15MB. Only PDF format is supported for academic resources."
     )
     file_size = models.BigIntegerField(blank=True, null=True)  # in bytes
+    file_hash = models.CharField(max_length=64, blank=True, db_index=True, editable=False)  # SHA-256 of the content
+    
+    # Extracted by the background processing pipeline (see academics.processing)
+    page_count = models.PositiveIntegerField(blank=True, null=True)
+    thumbnail = models.ImageField(upload_to='academics/thumbnails/', blank=True, null=True)
+    extracted_text = models.TextField(blank=True, editable=False)
+    processed_at = models.DateTimeField(blank=True, null=True)
 
     def clean(self):
         super().clean()
@@ -157,6 +167,9 @@ class AcademicResource(models.Model):
     is_featured = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
     
+    # Full-text search document (PostgreSQL only, GIN indexed; see academics.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -167,6 +180,8 @@ class AcademicResource(models.Model):
             models.Index(fields=['uploaded_by']),
             models.Index(fields=['category', 'module_number']),
             models.Index(fields=['exam_type', 'exam_year']),
+            models.Index(fields=['is_approved', '-is_featured', '-created_at', '-id'], name='academics_resource_listing'),
+            models.Index(fields=['is_approved', 'is_active', '-created_at', '-id'], name='academics_resource_moderation'),
         ]
     
     def __str__(self):
@@ -181,8 +196,13 @@ class AcademicResource(models.Model):
             return f"{status} {self.title} - {self.subject.name}"
     
     def save(self, *args, **kwargs):
-        # Set file size if file exists
-        if self.file:
+        # Hash new uploads and reuse an identical stored blob if there is one
+        if self.file and not self.file._committed:
+            from .dedup import deduplicate_upload
+            deduplicate_upload(self)
+        
+        # Set file size for new uploads; avoid hitting (remote) storage on every save
+        if self.file and (self.file_size is None or not self.file._committed):
             self.file_size = self.file.size
         super().save(*args, **kwargs)
     
@@ -206,12 +226,122 @@ class ResourceDownload(models.Model):
     
     resource = models.ForeignKey(AcademicResource, on_delete=models.CASCADE, related_name='downloads')
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='downloads')
-    downloaded_at = models.DateTimeField(auto_now_add=True)
+    downloaded_at = models.DateTimeField(default=timezone.now, editable=False)
     ip_address = models.GenericIPAddressField(blank=True, null=True)
+    is_aggregated = models.BooleanField(default=False, editable=False)  # folded into ResourceActivity
     
     class Meta:
         unique_together = ['resource', 'user', 'downloaded_at']
         ordering = ['-downloaded_at']
+        indexes = [
+            models.Index(fields=['id'], condition=models.Q(is_aggregated=False), name='academics_download_pending'),
+        ]
         
     def __str__(self):
         return f"{self.user.username} downloaded {self.resource.title}"
+
+
+class ResourceActivity(models.Model):
+    """Hourly download/view totals per resource, feeding the trending index"""
+    
+    resource = models.ForeignKey(AcademicResource, on_delete=models.CASCADE, related_name='activity')
+    # Copied from the resource so trending scopes need no joins
+    subject = models.ForeignKey(Subject, on_delete=models.CASCADE, related_name='resource_activity')
+    semester = models.PositiveIntegerField()
+    category = models.CharField(max_length=20, choices=ACADEMIC_CATEGORIES)
+    
+    bucket_start = models.DateTimeField()
+    downloads = models.PositiveIntegerField(default=0)
+    views = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['resource', 'bucket_start']
+        ordering = ['-bucket_start']
+        indexes = [
+            models.Index(fields=['bucket_start', 'semester']),
+            models.Index(fields=['bucket_start', 'subject']),
+        ]
+    
+    def __str__(self):
+        return f"{self.resource_id} @ {self.bucket_start}: {self.downloads} downloads, {self.views} views"
+
+
+class ResourceUploadSession(models.Model):
+    """Resumable chunked upload of an academic resource PDF"""
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('assembling', 'Assembling'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    uploaded_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='resource_upload_sessions')
+    
+    # File being uploaded
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    checksum = models.CharField(max_length=64, blank=True, help_text="Expected SHA-256 of the whole file (hex)")
+    
+    # AcademicResource fields applied on completion
+    metadata = models.JSONField(default=dict)
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    error = models.TextField(blank=True)
+    resource = models.ForeignKey(AcademicResource, on_delete=models.SET_NULL, null=True, blank=True, related_name='upload_sessions')
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.filename} ({self.status})"
+    
+    @property
+    def total_chunks(self):
+        return max(1, -(-self.total_size // self.chunk_size))
+    
+    def expected_chunk_size(self, index):
+        if index < self.total_chunks - 1:
+            return self.chunk_size
+        return self.total_size - self.chunk_size * (self.total_chunks - 1)
+
+
+class ResourceProcessingJob(models.Model):
+    """Queued background processing (page count, text, thumbnail) of a resource PDF"""
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    resource = models.ForeignKey(AcademicResource, on_delete=models.CASCADE, related_name='processing_jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['run_after', 'id']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+    
+    def __str__(self):
+        return f"Processing {self.resource_id} ({self.status})"
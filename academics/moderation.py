@@ -0,0 +1,67 @@
+"""
+Bulk moderation of uploaded academic resources.
+
+Approving or rejecting any number of resources is one locking SELECT of
+the ids that are still pending plus one UPDATE, inside one transaction.
+Rejected resources are deactivated rather than deleted. Bulk updates do not
+fire model signals, so the catalog is invalidated here; approval is not
+part of the search document, so the search index needs no refresh.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from . import catalog
+from .models import AcademicResource
+
+ACTIONS = ('approve', 'reject')
+MAX_BATCH_SIZE = 5000
+
+PENDING_FIELDS = [
+    'id', 'title', 'description', 'file', 'file_size', 'file_hash', 'thumbnail',
+    'page_count', 'module_number', 'exam_type', 'exam_year', 'author',
+    'created_at', 'category', 'subject__name', 'subject__code',
+    'uploaded_by__first_name', 'uploaded_by__last_name',
+]
+PENDING_ORDERING = ['-created_at', '-id']
+
+
+def pending_resources():
+    return AcademicResource.objects.filter(is_approved=False, is_active=True)
+
+
+def parse_ids(value):
+    """Validate a list of resource ids from a request body; raises ValueError"""
+    if not isinstance(value, list) or not value:
+        raise ValueError('ids must be a non-empty list')
+    if len(value) > MAX_BATCH_SIZE:
+        raise ValueError(f'At most {MAX_BATCH_SIZE} ids can be moderated at once')
+    try:
+        return {int(resource_id) for resource_id in value}
+    except (TypeError, ValueError):
+        raise ValueError('ids must be integers')
+
+
+def moderate(resource_ids, action, moderator):
+    """
+    Approve or reject pending resources. Returns ``(updated_ids, skipped_ids)``;
+    skipped ids do not exist or were already moderated.
+    """
+    if action not in ACTIONS:
+        raise ValueError(f'action must be one of: {", ".join(ACTIONS)}')
+
+    resource_ids = set(resource_ids)
+    with transaction.atomic():
+        updated_ids = list(
+            pending_resources().filter(pk__in=resource_ids)
+            .select_for_update().order_by().values_list('id', flat=True)
+        )
+        if updated_ids:
+            if action == 'approve':
+                changes = {'is_approved': True, 'approved_by': moderator, 'approved_at': timezone.now()}
+            else:
+                changes = {'is_active': False}
+            AcademicResource.objects.filter(pk__in=updated_ids).update(**changes)
+            if action == 'approve':
+                transaction.on_commit(catalog.invalidate)
+
+    return sorted(updated_ids), sorted(resource_ids - set(updated_ids))
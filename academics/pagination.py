@@ -0,0 +1,89 @@
+"""
+Keyset (cursor) pagination for ``.values()`` querysets.
+
+Pages are addressed by the sort key of the last row seen instead of an
+OFFSET, so every page is a bounded index range scan no matter how deep the
+client has paged.
+"""
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q
+
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def get_page_size(request, default=None, maximum=MAX_PAGE_SIZE):
+    default = default or settings.REST_FRAMEWORK.get('PAGE_SIZE', 20)
+    try:
+        page_size = int(request.GET.get('page_size', default))
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(page_size, maximum))
+
+
+def encode_cursor(values):
+    payload = json.dumps(values, default=str, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, model, ordering):
+    """Decode a cursor into typed values matching ``ordering``"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+    if not isinstance(values, list) or len(values) != len(ordering):
+        raise InvalidCursor('Invalid cursor')
+
+    decoded = []
+    for value, field_name in zip(values, ordering):
+        field = model._meta.get_field(field_name.lstrip('-'))
+        try:
+            decoded.append(field.to_python(value))
+        except Exception:
+            raise InvalidCursor('Invalid cursor')
+    return decoded
+
+
+def keyset_filter(ordering, values):
+    """
+    Build the "rows after this key" condition for a multi-column ordering,
+    e.g. for ('-a', '-b'): a < x OR (a = x AND b < y).
+    """
+    condition = Q()
+    for i, field_name in enumerate(ordering):
+        name = field_name.lstrip('-')
+        lookup = 'lt' if field_name.startswith('-') else 'gt'
+        clause = Q(**{f'{name}__{lookup}': values[i]})
+        for prev_name, prev_value in zip(ordering[:i], values[:i]):
+            clause &= Q(**{prev_name.lstrip('-'): prev_value})
+        condition |= clause
+    return condition
+
+
+def paginate(queryset, ordering, cursor=None, page_size=20):
+    """
+    Return ``(rows, next_cursor)`` for a ``.values()`` queryset.
+
+    ``ordering`` must end in a unique column (normally ``-id``) and every
+    ordering column must be included in the selected values.
+    """
+    queryset = queryset.order_by(*ordering)
+    if cursor:
+        values = decode_cursor(cursor, queryset.model, ordering)
+        queryset = queryset.filter(keyset_filter(ordering, values))
+
+    rows = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor([last[name.lstrip('-')] for name in ordering])
+    return rows, next_cursor
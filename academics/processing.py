@@ -0,0 +1,265 @@
+"""
+Background processing of academic resource PDFs.
+
+Creating an ``AcademicResource`` queues a ``ResourceProcessingJob`` row in
+the same transaction (see ``academics.signals``); the database is the queue,
+so no broker is needed. ``python manage.py process_resources`` claims jobs
+and hands each PDF to a process pool, which extracts the page count, the
+full text and a first-page JPEG thumbnail. Results are written back to the
+resource and its search document is refreshed.
+
+Jobs are claimed with a conditional UPDATE, so any number of worker
+processes can poll the same table. While a batch runs, the worker refreshes
+``locked_at`` on its unfinished jobs every ``HEARTBEAT_INTERVAL``, so only
+a job whose worker died (no heartbeat for ``LOCK_TIMEOUT``) is reclaimed,
+however long a PDF takes; failures are retried with backoff up to
+``MAX_ATTEMPTS``.
+"""
+import io
+import os
+import shutil
+import socket
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import timedelta
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .downloads import get_local_path, signed_file_url
+
+MAX_ATTEMPTS = 3
+LOCK_TIMEOUT = timedelta(minutes=10)
+HEARTBEAT_INTERVAL = timedelta(minutes=1)
+MAX_TEXT_LENGTH = 500_000
+THUMBNAIL_WIDTH = 400
+COPY_BUFFER_SIZE = 64 * 1024
+
+
+def get_worker_count():
+    return getattr(settings, 'ACADEMICS_PROCESSING_WORKERS', 2)
+
+
+def enqueue(resource_id):
+    from .models import ResourceProcessingJob
+
+    return ResourceProcessingJob.objects.create(resource_id=resource_id)
+
+
+def claimable():
+    """Jobs that are due, or running on a worker that stopped heartbeating (see ``heartbeat``)"""
+    now = timezone.now()
+    return Q(status='pending', run_after__lte=now) | Q(status='running', locked_at__lt=now - LOCK_TIMEOUT)
+
+
+def heartbeat(jobs):
+    """Refresh the lock on jobs this worker is still running"""
+    from .models import ResourceProcessingJob
+
+    ResourceProcessingJob.objects.filter(
+        pk__in=[job.pk for job in jobs], status='running', locked_by=jobs[0].locked_by
+    ).update(locked_at=timezone.now())
+
+
+def claim_jobs(worker_id, limit):
+    """Atomically take up to ``limit`` jobs for this worker"""
+    from .models import ResourceProcessingJob
+
+    candidates = list(
+        ResourceProcessingJob.objects.filter(claimable()).order_by('run_after', 'id')
+        .values_list('id', flat=True)[:limit * 2]
+    )
+    claimed = []
+    for job_id in candidates:
+        if len(claimed) >= limit:
+            break
+        # Only one worker's UPDATE can match a still-claimable row
+        updated = ResourceProcessingJob.objects.filter(claimable(), pk=job_id).update(
+            status='running',
+            locked_by=worker_id,
+            locked_at=timezone.now(),
+            attempts=F('attempts') + 1,
+        )
+        if updated:
+            claimed.append(job_id)
+
+    return list(
+        ResourceProcessingJob.objects.filter(pk__in=claimed)
+        .select_related('resource')
+        .defer('resource__extracted_text', 'resource__search_vector')
+    )
+
+
+def extract_pdf(path):
+    """Page count, text and thumbnail JPEG bytes of a PDF (runs in a pool process)"""
+    import pypdfium2 as pdfium
+
+    pdf = pdfium.PdfDocument(path)
+    try:
+        page_count = len(pdf)
+        parts = []
+        length = 0
+        for index in range(page_count):
+            page = pdf[index]
+            text = page.get_textpage().get_text_range()
+            parts.append(text)
+            length += len(text)
+            if length >= MAX_TEXT_LENGTH:
+                break
+
+        thumbnail = None
+        if page_count:
+            page = pdf[0]
+            image = page.render(scale=THUMBNAIL_WIDTH / page.get_width()).to_pil().convert('RGB')
+            buffer = io.BytesIO()
+            image.save(buffer, 'JPEG', quality=80, optimize=True)
+            thumbnail = buffer.getvalue()
+    finally:
+        pdf.close()
+
+    # PostgreSQL text columns cannot hold NUL bytes
+    text = '\n'.join(parts)[:MAX_TEXT_LENGTH].replace('\x00', '')
+    return {'page_count': page_count, 'text': text, 'thumbnail': thumbnail}
+
+
+def local_copy(field_file, target):
+    """Path of a local copy of a stored file, streaming remote files to ``target``"""
+    path = get_local_path(field_file)
+    if path is not None:
+        return path
+    with urlopen(signed_file_url(field_file), timeout=60) as response, open(target, 'wb') as out:
+        shutil.copyfileobj(response, out, COPY_BUFFER_SIZE)
+    return target
+
+
+def save_results(resource, page_count, text, thumbnail_name):
+    from . import search
+    from .models import AcademicResource
+
+    # update() rather than save(): no re-queue, and the catalog is unaffected
+    AcademicResource.objects.filter(pk=resource.pk).update(
+        page_count=page_count,
+        extracted_text=text,
+        thumbnail=thumbnail_name or '',
+        processed_at=timezone.now(),
+    )
+    search.index_resources(resource_ids=[resource.pk])
+
+
+def copy_from_duplicate(resource):
+    """Reuse the results of an already processed resource with identical content"""
+    from .models import AcademicResource
+
+    if not resource.file_hash:
+        return False
+    original = (
+        AcademicResource.objects.filter(file_hash=resource.file_hash, processed_at__isnull=False)
+        .exclude(pk=resource.pk)
+        .values('page_count', 'extracted_text', 'thumbnail')
+        .first()
+    )
+    if original is None:
+        return False
+    save_results(resource, original['page_count'], original['extracted_text'], original['thumbnail'])
+    return True
+
+
+def store_result(resource, result):
+    thumbnail_name = None
+    if result['thumbnail']:
+        thumbnail_name = resource.thumbnail.field.storage.save(
+            f"academics/thumbnails/{resource.file_hash or resource.pk}.jpg",
+            ContentFile(result['thumbnail']),
+        )
+    save_results(resource, result['page_count'], result['text'], thumbnail_name)
+
+
+def finish_job(job):
+    job.status = 'done'
+    job.error = ''
+    job.save(update_fields=['status', 'error', 'updated_at'])
+
+
+def fail_job(job, error):
+    """Retry with exponential backoff until MAX_ATTEMPTS, then give up"""
+    job.refresh_from_db(fields=['attempts'])
+    job.error = str(error)[:2000]
+    if job.attempts >= MAX_ATTEMPTS:
+        job.status = 'failed'
+    else:
+        job.status = 'pending'
+        job.run_after = timezone.now() + timedelta(minutes=2 ** job.attempts)
+    job.save(update_fields=['status', 'error', 'run_after', 'updated_at'])
+
+
+def process_batch(jobs, pool, workdir):
+    """Process claimed jobs, extracting in ``pool``; returns (done, failed)"""
+    done = failed = 0
+    futures = {}
+    interval = HEARTBEAT_INTERVAL.total_seconds()
+    next_beat = time.monotonic() + interval
+    for index, job in enumerate(jobs):
+        if time.monotonic() >= next_beat:
+            # Downloading remote PDFs can take a while too
+            heartbeat(jobs[index:] + list(futures.values()))
+            next_beat = time.monotonic() + interval
+        try:
+            if copy_from_duplicate(job.resource):
+                finish_job(job)
+                done += 1
+                continue
+            path = local_copy(job.resource.file, os.path.join(workdir, f'{job.pk}.pdf'))
+            futures[pool.submit(extract_pdf, path)] = job
+        except Exception as e:
+            fail_job(job, e)
+            failed += 1
+
+    pending = set(futures)
+    while pending:
+        finished, pending = wait(pending, timeout=max(next_beat - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+        for future in finished:
+            job = futures[future]
+            try:
+                store_result(job.resource, future.result())
+                finish_job(job)
+                done += 1
+            except Exception as e:
+                fail_job(job, e)
+                failed += 1
+        if pending and time.monotonic() >= next_beat:
+            heartbeat([futures[future] for future in pending])
+            next_beat = time.monotonic() + interval
+    return done, failed
+
+
+def run_worker(workers=None, once=False, poll_interval=5, log=None):
+    """
+    Claim and process jobs until stopped. With ``once`` the worker exits
+    when the queue is empty (handy for cron).
+    """
+    workers = workers or get_worker_count()
+    worker_id = f'{socket.gethostname()}:{os.getpid()}'
+    totals = {'done': 0, 'failed': 0}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while True:
+            close_old_connections()
+            jobs = claim_jobs(worker_id, workers)
+            if not jobs:
+                if once:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            with tempfile.TemporaryDirectory() as workdir:
+                done, failed = process_batch(jobs, pool, workdir)
+            totals['done'] += done
+            totals['failed'] += failed
+            if log:
+                log(done, failed)
+    return totals
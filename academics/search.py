@@ -0,0 +1,213 @@
+"""
+Full-text search for academic resources.
+
+* PostgreSQL: ``AcademicResource.search_vector`` (GIN indexed) holds a
+  weighted document - title and subject code (A), author, subject and
+  scheme name (B), description (C), extracted PDF text (D) - ranked with
+  ``ts_rank``.
+* SQLite: an FTS5 virtual table ``academics_resource_fts`` whose rowid is
+  the resource id, ranked with ``bm25``.
+* Any other backend falls back to ``icontains`` matching.
+
+Every query term is matched as a prefix, so "EE3" finds EE301, EE302, ...
+The index is kept in sync by signals (see ``academics.signals``) and can be
+rebuilt with ``python manage.py rebuild_search_index``.
+"""
+import re
+
+from django.db import connection
+from django.db.models import F, FloatField, OuterRef, Q, Subquery, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'academics_resource_fts'
+MAX_TERMS = 10
+
+# bm25() weights for (title, description, author, subject_code, subject_name, scheme_name, body)
+FTS_WEIGHTS = '10.0, 2.0, 4.0, 10.0, 5.0, 3.0, 1.0'
+
+
+def parse_terms(query):
+    """Split a user query into safe lowercase word tokens"""
+    return re.findall(r'\w+', (query or '').lower())[:MAX_TERMS]
+
+
+def get_vendor():
+    return connection.vendor
+
+
+def fts5_available():
+    if connection.vendor != 'sqlite':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE]
+        )
+        return cursor.fetchone() is not None
+
+
+# PostgreSQL ------------------------------------------------------------------
+
+def search_document():
+    """Weighted tsvector expression for AcademicResource rows (usable in UPDATE)"""
+    from django.contrib.postgres.search import SearchVector
+    from .models import Subject
+
+    subject = Subject.objects.filter(pk=OuterRef('subject_id')).order_by()
+    return (
+        SearchVector('title', weight='A', config='english')
+        + SearchVector(Subquery(subject.values('code')[:1]), weight='A', config='simple')
+        + SearchVector('author', weight='B', config='english')
+        + SearchVector(Subquery(subject.values('name')[:1]), weight='B', config='english')
+        + SearchVector(Subquery(subject.values('scheme__name')[:1]), weight='B', config='simple')
+        + SearchVector('description', weight='C', config='english')
+        + SearchVector('extracted_text', weight='D', config='english')
+    )
+
+
+def postgres_query(terms):
+    from django.contrib.postgres.search import SearchQuery
+
+    raw = ' & '.join(f'{term}:*' for term in terms)
+    return SearchQuery(raw, search_type='raw', config='english')
+
+
+# SQLite FTS5 -----------------------------------------------------------------
+
+def fts_match(terms):
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _fts_reindex(where_sql='', params=()):
+    from .models import AcademicResource, Scheme, Subject
+
+    resource_table = AcademicResource._meta.db_table
+    subject_table = Subject._meta.db_table
+    scheme_table = Scheme._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid IN ('
+            f'SELECT r.id FROM {resource_table} r '
+            f'JOIN {subject_table} s ON s.id = r.subject_id {where_sql})',
+            params,
+        )
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} '
+            f'(rowid, title, description, author, subject_code, subject_name, scheme_name, body) '
+            f'SELECT r.id, r.title, r.description, r.author, s.code, s.name, sc.name, r.extracted_text '
+            f'FROM {resource_table} r '
+            f'JOIN {subject_table} s ON s.id = r.subject_id '
+            f'JOIN {scheme_table} sc ON sc.id = s.scheme_id {where_sql}',
+            params,
+        )
+
+
+# Index maintenance -----------------------------------------------------------
+
+def index_resources(resource_ids=None, subject_id=None, scheme_id=None):
+    """
+    (Re)index resources selected by id, subject or scheme; with no
+    arguments the whole index is rebuilt.
+    """
+    from .models import AcademicResource
+
+    vendor = get_vendor()
+    if vendor == 'postgresql':
+        resources = AcademicResource.objects.all()
+        if resource_ids is not None:
+            resources = resources.filter(pk__in=resource_ids)
+        if subject_id is not None:
+            resources = resources.filter(subject_id=subject_id)
+        if scheme_id is not None:
+            resources = resources.filter(subject__scheme_id=scheme_id)
+        return resources.update(search_vector=search_document())
+
+    if not fts5_available():
+        return 0
+
+    if resource_ids is None and subject_id is None and scheme_id is None:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        _fts_reindex()
+    elif resource_ids is not None:
+        resource_ids = list(resource_ids)
+        if not resource_ids:
+            return 0
+        placeholders = ', '.join(['%s'] * len(resource_ids))
+        _fts_reindex(f'WHERE r.id IN ({placeholders})', resource_ids)
+    elif subject_id is not None:
+        _fts_reindex('WHERE r.subject_id = %s', [subject_id])
+    else:
+        _fts_reindex('WHERE s.scheme_id = %s', [scheme_id])
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT COUNT(*) FROM {FTS_TABLE}')
+        return cursor.fetchone()[0]
+
+
+def remove_resource(resource_id):
+    if get_vendor() == 'sqlite' and fts5_available():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [resource_id])
+
+
+# Querying --------------------------------------------------------------------
+
+def _icontains(terms):
+    condition = Q()
+    for term in terms:
+        condition &= (
+            Q(title__icontains=term)
+            | Q(description__icontains=term)
+            | Q(author__icontains=term)
+            | Q(subject__code__istartswith=term)
+            | Q(subject__name__icontains=term)
+        )
+    return condition
+
+
+def filter_resources(queryset, query):
+    """Restrict an AcademicResource queryset to rows matching ``query``"""
+    terms = parse_terms(query)
+    if not terms:
+        return queryset.none()
+
+    vendor = get_vendor()
+    if vendor == 'postgresql':
+        return queryset.filter(search_vector=postgres_query(terms))
+    if fts5_available():
+        return queryset.filter(
+            pk__in=RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [fts_match(terms)])
+        )
+    return queryset.filter(_icontains(terms))
+
+
+def rank_resources(queryset, query):
+    """Filter by ``query`` and order by relevance (best first) as ``rank``"""
+    terms = parse_terms(query)
+    if not terms:
+        return queryset.none()
+
+    vendor = get_vendor()
+    if vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchRank
+
+        search_query = postgres_query(terms)
+        return queryset.filter(search_vector=search_query).annotate(
+            rank=SearchRank(F('search_vector'), search_query)
+        ).order_by('-rank', '-id')
+
+    if fts5_available():
+        from .models import AcademicResource
+
+        match = fts_match(terms)
+        # bm25() is lower-is-better; negate it so rank is higher-is-better everywhere
+        rank = RawSQL(
+            f'SELECT -bm25({FTS_TABLE}, {FTS_WEIGHTS}) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND rowid = {AcademicResource._meta.db_table}.id',
+            [match],
+            output_field=FloatField(),
+        )
+        return filter_resources(queryset, query).annotate(rank=rank).order_by('-rank', '-id')
+
+    return queryset.filter(_icontains(terms)).annotate(
+        rank=Value(0.0, output_field=FloatField())
+    ).order_by('-is_featured', '-created_at', '-id')
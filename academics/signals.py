@@ -0,0 +1,55 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import catalog, processing, search
+from .models import Scheme, Subject, AcademicResource
+
+
+@receiver(post_save, sender=AcademicResource)
+def index_academic_resource(sender, instance, raw=False, **kwargs):
+    """Keep the search index in sync with resource edits"""
+    if raw:
+        return
+    search.index_resources(resource_ids=[instance.pk])
+
+
+@receiver(post_save, sender=AcademicResource)
+def queue_resource_processing(sender, instance, created=False, raw=False, **kwargs):
+    """Extract page count, text and thumbnail in the background (same transaction as the upload)"""
+    if raw or not created or not instance.file:
+        return
+    processing.enqueue(instance.pk)
+
+
+@receiver(post_delete, sender=AcademicResource)
+def unindex_academic_resource(sender, instance, **kwargs):
+    search.remove_resource(instance.pk)
+
+
+@receiver(post_save, sender=Subject)
+def reindex_subject_resources(sender, instance, created=False, raw=False, **kwargs):
+    """Subject code/name are part of every resource document"""
+    if raw or created:
+        return
+    search.index_resources(subject_id=instance.pk)
+
+
+@receiver(post_save, sender=Scheme)
+def reindex_scheme_resources(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    search.index_resources(scheme_id=instance.pk)
+
+
+@receiver(post_save, sender=Scheme)
+@receiver(post_delete, sender=Scheme)
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+@receiver(post_save, sender=AcademicResource)
+@receiver(post_delete, sender=AcademicResource)
+def invalidate_catalog(sender, raw=False, **kwargs):
+    """Rebuild the cached catalog tree only after the change is committed"""
+    if raw:
+        return
+    transaction.on_commit(catalog.invalidate)
@@ -0,0 +1,199 @@
+"""
+Trending academic resources.
+
+Downloads and views are folded into hourly ``ResourceActivity`` buckets
+when the write-behind counters flush (see ``academics.counters``), so
+anonymous downloads count as much as signed-in ones. ``ResourceDownload``
+rows are per-user history and are written already aggregated; ``refresh()``
+only folds in rows left pending from before downloads were bucketed at
+flush time. A resource's score is the sum of its buckets in the window,
+each weighted by exponential decay on its age, so the last few hours count
+more than last week.
+
+Scores are one GROUP BY over the buckets (never over raw downloads) and are
+cached per window and scope for ``CACHE_TIMEOUT`` seconds.
+"""
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Sum, Value, When
+from django.utils import timezone
+
+WINDOWS = {
+    'day': timedelta(days=1),
+    'week': timedelta(days=7),
+    'month': timedelta(days=30),
+}
+HALF_LIVES = {
+    'day': timedelta(hours=6),
+    'week': timedelta(days=2),
+    'month': timedelta(days=7),
+}
+DECAY_STEPS = 24
+DOWNLOAD_WEIGHT = 3
+VIEW_WEIGHT = 1
+REFRESH_BATCH_SIZE = 5000
+RETENTION = timedelta(days=90)
+CACHE_TIMEOUT = 300
+MAX_LIMIT = 50
+
+
+def bucket_for(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def add_activity(increments):
+    """Apply ``{(resource_id, bucket_start): (downloads, views)}`` to the buckets"""
+    from .models import AcademicResource, ResourceActivity
+
+    if not increments:
+        return
+    resources = {
+        row['id']: row
+        for row in AcademicResource.objects.filter(pk__in={key[0] for key in increments}).values(
+            'id', 'subject_id', 'subject__semester', 'category'
+        )
+    }
+    keys = [key for key in increments if key[0] in resources]
+
+    # Insert missing buckets with zero counts, then increment in place, so
+    # concurrent writers never lose an increment to an insert conflict
+    ResourceActivity.objects.bulk_create(
+        [
+            ResourceActivity(
+                resource_id=resource_id,
+                subject_id=resources[resource_id]['subject_id'],
+                semester=resources[resource_id]['subject__semester'],
+                category=resources[resource_id]['category'],
+                bucket_start=bucket_start,
+            )
+            for resource_id, bucket_start in keys
+        ],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+
+    by_delta = defaultdict(list)
+    for resource_id, bucket_start in keys:
+        downloads, views = increments[(resource_id, bucket_start)]
+        by_delta[(bucket_start, downloads, views)].append(resource_id)
+    for (bucket_start, downloads, views), resource_ids in by_delta.items():
+        ResourceActivity.objects.filter(bucket_start=bucket_start, resource_id__in=resource_ids).update(
+            downloads=F('downloads') + downloads,
+            views=F('views') + views,
+        )
+
+
+def record_activity(download_counts, view_counts):
+    """Add flushed download and view counts to the current hour's buckets"""
+    bucket_start = bucket_for(timezone.now())
+    add_activity({
+        (resource_id, bucket_start): (download_counts.get(resource_id, 0), view_counts.get(resource_id, 0))
+        for resource_id in set(download_counts) | set(view_counts)
+        if download_counts.get(resource_id) or view_counts.get(resource_id)
+    })
+
+
+def refresh(batch_size=REFRESH_BATCH_SIZE, max_batches=None):
+    """Fold ResourceDownload rows still pending into the buckets; returns rows processed"""
+    from .models import ResourceDownload
+
+    processed = batches = 0
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            # skip_locked lets concurrent refreshers take disjoint batches (ignored on SQLite)
+            rows = list(
+                ResourceDownload.objects.filter(is_aggregated=False)
+                .select_for_update(skip_locked=True)
+                .order_by('id')
+                .values_list('id', 'resource_id', 'downloaded_at')[:batch_size]
+            )
+            if not rows:
+                break
+            counts = Counter((resource_id, bucket_for(downloaded_at)) for _, resource_id, downloaded_at in rows)
+            add_activity({key: (count, 0) for key, count in counts.items()})
+            ResourceDownload.objects.filter(pk__in=[row[0] for row in rows]).update(is_aggregated=True)
+        processed += len(rows)
+        batches += 1
+        if len(rows) < batch_size:
+            break
+    return processed
+
+
+def prune(retention=RETENTION):
+    from .models import ResourceActivity
+
+    deleted, _ = ResourceActivity.objects.filter(bucket_start__lt=timezone.now() - retention).delete()
+    return deleted
+
+
+def decay_weight(window, now):
+    """Step-wise exponential decay on bucket age, evaluated in the database"""
+    step = WINDOWS[window] / DECAY_STEPS
+    half_life = HALF_LIVES[window]
+    return Case(
+        *[
+            When(bucket_start__gte=now - step * (k + 1), then=Value(0.5 ** (step * k / half_life)))
+            for k in range(DECAY_STEPS)
+        ],
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def compute_trending(window, scope, limit):
+    from .models import ResourceActivity
+
+    now = timezone.now()
+    activity = ResourceActivity.objects.filter(
+        bucket_start__gte=now - WINDOWS[window],
+        resource__is_approved=True,
+        resource__is_active=True,
+    )
+    if scope.get('category'):
+        activity = activity.filter(category=scope['category'])
+    if scope.get('semester'):
+        activity = activity.filter(semester=scope['semester'])
+    if scope.get('subject'):
+        activity = activity.filter(subject_id=scope['subject'])
+    if scope.get('scheme'):
+        activity = activity.filter(subject__scheme_id=scope['scheme'])
+
+    weight = decay_weight(window, now)
+    rows = (
+        activity.order_by()
+        .values('resource_id')
+        .annotate(
+            score=Sum((F('downloads') * DOWNLOAD_WEIGHT + F('views') * VIEW_WEIGHT) * weight),
+            downloads=Sum('downloads'),
+            views=Sum('views'),
+        )
+        .order_by('-score', '-resource_id')[:limit]
+    )
+    return [
+        {
+            'resource_id': row['resource_id'],
+            'score': round(row['score'], 3),
+            'downloads': row['downloads'],
+            'views': row['views'],
+        }
+        for row in rows
+    ]
+
+
+def get_trending(window='week', scope=None, limit=20):
+    """
+    Ranked ``[{resource_id, score, downloads, views}]`` for a window and a
+    scope (category, scheme, semester, subject), cached.
+    """
+    scope = {name: value for name, value in (scope or {}).items() if value}
+    key = 'academics:trending:%s:%s:%s' % (
+        window, limit, ':'.join(f'{name}={scope[name]}' for name in sorted(scope))
+    )
+    ranking = cache.get(key)
+    if ranking is None:
+        ranking = compute_trending(window, scope, limit)
+        cache.set(key, ranking, timeout=CACHE_TIMEOUT)
+    return ranking
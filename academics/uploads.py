@@ -0,0 +1,266 @@
+"""
+Resumable chunked uploads for academic resources.
+
+A client creates an upload session with the resource metadata, PUTs the
+file in fixed-size chunks (in any order, retrying any that fail) and then
+completes the session. Each chunk is written to its own part file under
+``ACADEMICS_UPLOAD_TEMP_DIR``, so a chunk request only holds a worker for
+the time it takes to receive one chunk and the received set survives
+worker restarts. On completion the parts are streamed into one file while
+the SHA-256 is computed, the PDF magic bytes are checked and only then is
+the ``AcademicResource`` created.
+
+Completion first claims the session with a conditional UPDATE from
+``pending`` to ``assembling``, so a retried or concurrent complete can never
+assemble the same session twice; it gets the resource back once the session
+is completed. A claim whose worker died is taken over after
+``ASSEMBLY_TIMEOUT``.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ACADEMIC_CATEGORIES, AcademicResource, ResourceUploadSession, Subject
+
+MAX_FILE_SIZE = 15 * 1024 * 1024
+PDF_MAGIC = b'%PDF-'
+COPY_BUFFER_SIZE = 64 * 1024
+ASSEMBLY_TIMEOUT = timedelta(minutes=10)
+
+
+class UploadError(Exception):
+    pass
+
+
+class UploadInProgress(UploadError):
+    pass
+
+
+def get_temp_root():
+    return str(getattr(settings, 'ACADEMICS_UPLOAD_TEMP_DIR', os.path.join(settings.BASE_DIR, 'tmp_uploads')))
+
+
+def get_chunk_size():
+    return getattr(settings, 'ACADEMICS_UPLOAD_CHUNK_SIZE', 1024 * 1024)
+
+
+def get_session_ttl():
+    return timedelta(hours=getattr(settings, 'ACADEMICS_UPLOAD_SESSION_TTL_HOURS', 24))
+
+
+def session_dir(session):
+    return os.path.join(get_temp_root(), str(session.id))
+
+
+def part_path(session, index):
+    return os.path.join(session_dir(session), f'{index:05d}.part')
+
+
+def validate_metadata(data):
+    """
+    Validate AcademicResource fields shared by direct and chunked uploads.
+    Returns a dict of cleaned values; raises UploadError.
+    """
+    title = (data.get('title') or '').strip()
+    if not title:
+        raise UploadError('title is required')
+
+    category = data.get('category')
+    if category not in dict(ACADEMIC_CATEGORIES):
+        raise UploadError(f'category must be one of: {", ".join(dict(ACADEMIC_CATEGORIES))}')
+
+    try:
+        subject = Subject.objects.only('id').get(pk=int(data.get('subject')))
+    except (TypeError, ValueError, Subject.DoesNotExist):
+        raise UploadError('A valid subject is required')
+
+    def optional_int(name, default=None):
+        value = data.get(name)
+        if value in (None, ''):
+            return default
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise UploadError(f'{name} must be an integer')
+
+    return {
+        'title': title,
+        'description': data.get('description', ''),
+        'category': category,
+        'subject_id': subject.pk,
+        'module_number': optional_int('module_number', 1),
+        'exam_type': data.get('exam_type', ''),
+        'exam_year': optional_int('exam_year'),
+        'author': data.get('author', ''),
+    }
+
+
+def validate_file_info(filename, size):
+    if not filename or not filename.lower().endswith('.pdf'):
+        raise UploadError('Only PDF files are allowed. Please upload a PDF document.')
+    if size <= 0:
+        raise UploadError('File is empty')
+    if size > MAX_FILE_SIZE:
+        raise UploadError('File size must be less than 15MB. Please compress the file or use a smaller document.')
+
+
+def received_chunks(session):
+    """Indices of chunks already stored for a session"""
+    try:
+        names = os.listdir(session_dir(session))
+    except FileNotFoundError:
+        return []
+    return sorted(int(name.split('.')[0]) for name in names if name.endswith('.part'))
+
+
+def write_chunk(session, index, stream):
+    """Stream one chunk from ``stream`` into its part file"""
+    if session.status != 'pending':
+        raise UploadError(f'Upload is {session.status}')
+    if session.expires_at < timezone.now():
+        raise UploadError('Upload session has expired')
+    if not 0 <= index < session.total_chunks:
+        raise UploadError(f'Chunk index must be between 0 and {session.total_chunks - 1}')
+
+    expected = session.expected_chunk_size(index)
+    os.makedirs(session_dir(session), exist_ok=True)
+    final_path = part_path(session, index)
+    # A unique temp file per request: the same chunk may arrive twice at once
+    fd, temp_path = tempfile.mkstemp(dir=session_dir(session), prefix=f'{index:05d}.', suffix='.tmp')
+
+    written = 0
+    first_bytes = b''
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            while True:
+                data = stream.read(COPY_BUFFER_SIZE)
+                if not data:
+                    break
+                written += len(data)
+                if written > expected:
+                    raise UploadError(f'Chunk {index} must be {expected} bytes')
+                if index == 0 and len(first_bytes) < len(PDF_MAGIC):
+                    first_bytes += data[:len(PDF_MAGIC)]
+                f.write(data)
+        if written != expected:
+            raise UploadError(f'Chunk {index} must be {expected} bytes, got {written}')
+        if index == 0 and not first_bytes.startswith(PDF_MAGIC):
+            raise UploadError('File is not a valid PDF document')
+        # Atomic rename: a part file is either complete or absent
+        os.replace(temp_path, final_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return written
+
+
+def claimable():
+    """Sessions waiting for completion, or stuck assembling on a worker that died"""
+    return Q(status='pending') | Q(status='assembling', updated_at__lt=timezone.now() - ASSEMBLY_TIMEOUT)
+
+
+def claim(session):
+    """Move the session to ``assembling``; only one caller's UPDATE can match"""
+    claimed = ResourceUploadSession.objects.filter(claimable(), pk=session.pk).update(
+        status='assembling', updated_at=timezone.now()
+    )
+    session.refresh_from_db(fields=['status', 'error', 'resource', 'updated_at'])
+    return bool(claimed)
+
+
+def complete_upload(session):
+    """
+    Assemble the parts, verify them and create the AcademicResource.
+    Returns ``(resource, created)``; completing a completed session returns
+    its resource again.
+    """
+    if session.status == 'completed' and session.resource_id:
+        return session.resource, False
+    if session.status not in ('pending', 'assembling'):
+        raise UploadError(f'Upload is {session.status}')
+
+    if not claim(session):
+        if session.status == 'completed' and session.resource_id:
+            return session.resource, False
+        if session.status == 'assembling':
+            raise UploadInProgress('Upload is already being completed')
+        raise UploadError(f'Upload is {session.status}')
+
+    try:
+        missing = sorted(set(range(session.total_chunks)) - set(received_chunks(session)))
+        if missing:
+            raise UploadError(f'Missing chunks: {missing[:20]}')
+        resource = assemble(session)
+    except Exception:
+        # Unless assembly failed the session, hand it back so the client can retry
+        ResourceUploadSession.objects.filter(pk=session.pk, status='assembling').update(
+            status='pending', updated_at=timezone.now()
+        )
+        session.refresh_from_db(fields=['status', 'updated_at'])
+        raise
+    discard_parts(session)
+    return resource, True
+
+
+def assemble(session):
+    """Join the parts of a claimed session and create its resource"""
+    fd, assembled_path = tempfile.mkstemp(dir=session_dir(session), suffix='.pdf')
+    digest = hashlib.sha256()
+    with os.fdopen(fd, 'wb') as out:
+        for index in range(session.total_chunks):
+            with open(part_path(session, index), 'rb') as part:
+                while True:
+                    data = part.read(COPY_BUFFER_SIZE)
+                    if not data:
+                        break
+                    digest.update(data)
+                    out.write(data)
+
+    with open(assembled_path, 'rb') as f:
+        if f.read(len(PDF_MAGIC)) != PDF_MAGIC:
+            fail_session(session, 'File is not a valid PDF document')
+    if os.path.getsize(assembled_path) != session.total_size:
+        fail_session(session, 'Assembled file size does not match the declared size')
+    checksum = digest.hexdigest()
+    if session.checksum and session.checksum.lower() != checksum:
+        fail_session(session, 'Checksum mismatch: the file was corrupted in transit')
+
+    with open(assembled_path, 'rb') as f, transaction.atomic():
+        resource = AcademicResource(
+            uploaded_by_id=session.uploaded_by_id,
+            file_size=session.total_size,
+            file_hash=checksum,
+            **session.metadata,
+        )
+        resource.file = File(f, name=os.path.basename(session.filename))
+        resource.save()
+
+        session.status = 'completed'
+        session.resource = resource
+        session.save(update_fields=['status', 'resource', 'updated_at'])
+    return resource
+
+
+def fail_session(session, message):
+    """Mark the session failed, drop its parts and raise UploadError"""
+    session.status = 'failed'
+    session.error = message
+    session.save(update_fields=['status', 'error', 'updated_at'])
+    discard_parts(session)
+    raise UploadError(message)
+
+
+def discard_parts(session):
+    shutil.rmtree(session_dir(session), ignore_errors=True)
+
+
+def new_session_expiry():
+    return timezone.now() + get_session_ttl()
@@ -10,6 +10,9 @@ urlpatterns = [
     path('subjects/', views.subjects_by_scheme_semester, name='subjects_by_scheme_semester'),
     path('subjects/create/', views.create_subject, name='create_subject'),
     
+    # Catalog tree (schemes → semesters → subjects)
+    path('catalog/', views.academic_catalog, name='academic_catalog'),
+    
     # Academic Categories endpoints
     path('categories/', views.academic_categories_list, name='academic_categories_list'),
     path('categories/<str:category_type>/', views.category_detail, name='category_detail'),
@@ -19,8 +22,20 @@ urlpatterns = [
     path('resources/<int:pk>/', views.academic_resource_detail, name='academic_resource_detail'),
     path('resources/<int:pk>/download/', views.download_academic_resource, name='download_academic_resource'),
     path('resources/upload/', views.upload_academic_resource, name='upload_academic_resource'),
+    path('resources/counters/', views.resource_counter_stats, name='resource_counter_stats'),
+    path('resources/trending/', views.trending_resources, name='trending_resources'),
+    
+    # Resumable chunked uploads
+    path('uploads/', views.create_upload_session, name='create_upload_session'),
+    path('uploads/<uuid:session_id>/', views.upload_session_detail, name='upload_session_detail'),
+    path('uploads/<uuid:session_id>/chunks/<int:index>/', views.upload_chunk, name='upload_chunk'),
+    path('uploads/<uuid:session_id>/complete/', views.complete_upload_session, name='complete_upload_session'),
+    
+    # Full-text search
+    path('search/', views.academic_search, name='academic_search'),
     
     # Unverified notes (staff only)
     path('unverified-notes/', views.unverified_notes, name='unverified_notes'),
     path('approve-note/<int:pk>/', views.approve_note, name='approve_note'),
+    path('moderate-notes/', views.moderate_notes, name='moderate_notes'),
 ]
@@ -2,16 +2,25 @@ from django.shortcuts import render
 from django.http import JsonResponse, HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
+from django.db.models import Q, Case, When, Value, F, Func, IntegerField, Subquery
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 import os
 import json
+from io import BytesIO
 
-from .models import Scheme, Subject, AcademicResource
+from .models import Scheme, Subject, AcademicResource, ResourceUploadSession, ACADEMIC_CATEGORIES
+from .downloads import serve_file
+from . import catalog, counters, dedup, moderation, search, trending
+from .pagination import InvalidCursor, get_page_size, paginate
+from .uploads import (
+    UploadError, UploadInProgress, complete_upload, discard_parts, new_session_expiry, received_chunks,
+    validate_file_info, validate_metadata, write_chunk, get_chunk_size as get_upload_chunk_size,
+)
 
 
 @api_view(['GET'])
@@ -61,7 +70,7 @@ def subjects_by_scheme_semester(request):
     if not scheme_id or not semester:
         return Response({'error': 'Both scheme and semester are required'}, status=status.HTTP_400_BAD_REQUEST)
     
-    subjects = Subject.objects.filter(scheme_id=scheme_id, semester=semester).order_by('name')
+    subjects = Subject.objects.filter(scheme_id=scheme_id, semester=semester).select_related('scheme').order_by('name')
     subjects_data = []
     for subject in subjects:
         subjects_data.append({
@@ -74,6 +83,23 @@ def subjects_by_scheme_semester(request):
     return Response(subjects_data)
 
 
+@api_view(['GET'])
+@permission_classes([])
+def academic_catalog(request):
+    """Whole Scheme → Semester → Subject tree with resource counts, cached with ETag support"""
+    etag, data = catalog.get_catalog()
+    
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+        return not_modified
+    
+    response = Response(data)
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, no-cache'
+    return response
+
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def create_subject(request):
@@ -139,91 +165,282 @@ def category_detail(request, category_type):
         return Response({'error': 'Category not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
+RESOURCE_LIST_FIELDS = [
+    'id', 'title', 'description', 'file', 'file_size', 'module_number',
+    'exam_type', 'exam_year', 'author', 'download_count', 'created_at',
+    'updated_at', 'category', 'is_featured', 'thumbnail', 'page_count',
+    'subject__name', 'subject__code',
+    'uploaded_by__first_name', 'uploaded_by__last_name',
+]
+RESOURCE_LIST_ORDERING = ['-is_featured', '-created_at', '-id']
+CATEGORY_NAMES = dict(ACADEMIC_CATEGORIES)
+
+
+def file_urls(names):
+    """Build file/thumbnail URLs for many stored names using a single storage instance (no per-row I/O)"""
+    storage = AcademicResource._meta.get_field('file').storage
+    return {name: storage.url(name) for name in names if name}
+
+
+def filter_resources_by_params(resources, params):
+    """Apply category/scheme/subject/semester query params; raises ValueError on bad ids"""
+    # Legacy clients send category_type
+    category = params.get('category') or params.get('category_type')
+    if category:
+        resources = resources.filter(category=category)
+    
+    scheme_id = params.get('scheme')
+    subject_id = params.get('subject')
+    semester = params.get('semester')
+    
+    if scheme_id:
+        resources = resources.filter(subject__scheme_id=int(scheme_id))
+    if subject_id:
+        resources = resources.filter(subject_id=int(subject_id))
+    if semester:
+        resources = resources.filter(subject__semester=int(semester))
+    return resources
+
+
+def serialize_resource_row(row, urls):
+    """Build the public resource payload from a RESOURCE_LIST_FIELDS row"""
+    return {
+        'id': row['id'],
+        'title': row['title'],
+        'description': row['description'],
+        'file': urls.get(row['file'], ''),
+        'file_size': row['file_size'],
+        'thumbnail': urls.get(row['thumbnail']),
+        'page_count': row['page_count'],
+        'module_number': row['module_number'],
+        'exam_type': row['exam_type'],
+        'exam_year': row['exam_year'],
+        'author': row['author'],
+        'download_count': row['download_count'],
+        'created_at': row['created_at'],
+        'updated_at': row['updated_at'],
+        'category': row['category'],
+        'category_name': CATEGORY_NAMES.get(row['category'], row['category']),
+        'subject_name': row['subject__name'],
+        'subject_code': row['subject__code'],
+        'is_featured': row['is_featured'],
+        'uploaded_by_name': f"{row['uploaded_by__first_name']} {row['uploaded_by__last_name']}",
+    }
+
+
 @api_view(['GET'])
 @permission_classes([])  # Remove authentication requirement
 def academic_resources_list(request):
-    """List academic resources with filtering"""
-    resources = AcademicResource.objects.filter(is_approved=True).select_related('subject', 'uploaded_by')
+    """List approved academic resources with filtering and cursor pagination"""
+    resources = AcademicResource.objects.filter(is_approved=True, is_active=True)
     
-    # Filter by category type
-    category_type = request.GET.get('category_type')
-    if category_type:
-        resources = resources.filter(category__category_type=category_type)
+    try:
+        resources = filter_resources_by_params(resources, request.GET)
+    except ValueError:
+        return Response({'error': 'scheme, subject and semester must be integers'}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Filter by other parameters
-    scheme_id = request.GET.get('scheme')
-    subject_id = request.GET.get('subject')
-    semester = request.GET.get('semester')
-    search = request.GET.get('search')
+    query = request.GET.get('search')
+    if query:
+        resources = search.filter_resources(resources, query)
     
-    if scheme_id:
-        resources = resources.filter(scheme_id=scheme_id)
-    if subject_id:
-        resources = resources.filter(subject_id=subject_id)
-    if semester:
-        resources = resources.filter(semester=semester)
-    if search:
-        resources = resources.filter(
-            Q(title__icontains=search) | 
-            Q(description__icontains=search)
+    try:
+        rows, next_cursor = paginate(
+            resources.values(*RESOURCE_LIST_FIELDS),
+            RESOURCE_LIST_ORDERING,
+            cursor=request.GET.get('cursor'),
+            page_size=get_page_size(request),
         )
+    except InvalidCursor:
+        return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    urls = file_urls(name for row in rows for name in (row['file'], row['thumbnail']))
+    resources_data = [serialize_resource_row(row, urls) for row in rows]
+    return Response({
+        'results': resources_data,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([])
+def trending_resources(request):
+    """Trending approved resources for a window (day/week/month), optionally scoped"""
+    window = request.GET.get('window', 'week')
+    if window not in trending.WINDOWS:
+        return Response({'error': f'window must be one of: {", ".join(trending.WINDOWS)}'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    category = request.GET.get('category')
+    if category and category not in CATEGORY_NAMES:
+        return Response({'error': f'category must be one of: {", ".join(CATEGORY_NAMES)}'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        scope = {
+            'category': category,
+            'scheme': int(request.GET['scheme']) if request.GET.get('scheme') else None,
+            'semester': int(request.GET['semester']) if request.GET.get('semester') else None,
+            'subject': int(request.GET['subject']) if request.GET.get('subject') else None,
+        }
+        limit = max(1, min(int(request.GET.get('limit', 20)), trending.MAX_LIMIT))
+    except ValueError:
+        return Response({'error': 'scheme, semester, subject and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    ranking = trending.get_trending(window, scope, limit)
+    rows = {
+        row['id']: row
+        for row in AcademicResource.objects.filter(
+            pk__in=[entry['resource_id'] for entry in ranking], is_approved=True, is_active=True
+        ).values(*RESOURCE_LIST_FIELDS)
+    }
+    urls = file_urls(name for row in rows.values() for name in (row['file'], row['thumbnail']))
     
+    results = []
+    for entry in ranking:
+        row = rows.get(entry['resource_id'])
+        if row is None:  # Removed or unapproved since the ranking was cached
+            continue
+        data = serialize_resource_row(row, urls)
+        data['trending'] = {
+            'score': entry['score'],
+            'downloads': entry['downloads'],
+            'views': entry['views'],
+        }
+        results.append(data)
+    
+    return Response({
+        'window': window,
+        'results': results,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([])
+def academic_search(request):
+    """Ranked full-text search over approved resources, plus matching subjects and schemes"""
+    query = request.GET.get('q', '').strip()
+    terms = search.parse_terms(query)
+    if not terms:
+        return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    resources = AcademicResource.objects.filter(is_approved=True, is_active=True)
+    try:
+        resources = filter_resources_by_params(resources, request.GET)
+        page = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        return Response({'error': 'scheme, subject, semester and page must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+    page_size = get_page_size(request)
+    
+    offset = (page - 1) * page_size
+    rows = list(
+        search.rank_resources(resources, query)
+        .values(*RESOURCE_LIST_FIELDS, 'rank')[offset:offset + page_size + 1]
+    )
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    urls = file_urls(name for row in rows for name in (row['file'], row['thumbnail']))
     resources_data = []
-    for resource in resources:
-        resources_data.append({
-            'id': resource.id,
-            'title': resource.title,
-            'description': resource.description,
-            'file': resource.file.url if resource.file else '',
-            'file_size': resource.file_size,
-            'module_number': resource.module_number,
-            'exam_type': resource.exam_type,
-            'exam_year': resource.exam_year,
-            'author': resource.author,
-            'download_count': resource.download_count,
-            'created_at': resource.created_at,
-            'updated_at': resource.updated_at,
-            'category': resource.category.category_type,
-            'category_name': resource.category.name,
-            'subject_name': resource.subject.name,
-            'subject_code': resource.subject.code,
-            'is_featured': resource.is_featured,
-            'uploaded_by_name': f"{resource.uploaded_by.first_name} {resource.uploaded_by.last_name}",
-        })
-    return Response(resources_data)
+    for row in rows:
+        data = serialize_resource_row(row, urls)
+        data['rank'] = row['rank']
+        resources_data.append(data)
+    
+    # Subjects and schemes are small tables; rank exact and prefix code matches first
+    subjects = Subject.objects.filter(is_active=True)
+    for term in terms:
+        subjects = subjects.filter(Q(code__istartswith=term) | Q(name__icontains=term))
+    subjects = subjects.annotate(
+        rank=Case(
+            When(code__iexact=terms[0], then=Value(3)),
+            When(code__istartswith=terms[0], then=Value(2)),
+            default=Value(1),
+        )
+    ).order_by('-rank', 'code').values('id', 'name', 'code', 'semester', 'scheme_id', 'scheme__name')[:10]
+    
+    schemes = Scheme.objects.all()
+    for term in terms:
+        schemes = schemes.filter(Q(name__icontains=term) | Q(description__icontains=term))
+    schemes = schemes.values('id', 'name', 'year', 'is_active')[:5]
+    
+    return Response({
+        'query': query,
+        'resources': {
+            'results': resources_data,
+            'page': page,
+            'has_more': has_more,
+        },
+        'subjects': [
+            {
+                'id': subject['id'],
+                'name': subject['name'],
+                'code': subject['code'],
+                'semester': subject['semester'],
+                'scheme_id': subject['scheme_id'],
+                'scheme_name': subject['scheme__name'],
+            }
+            for subject in subjects
+        ],
+        'schemes': list(schemes),
+    })
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def unverified_notes(request):
-    """List unverified notes (staff only)"""
+    """List unverified notes, oldest last, with cursor pagination (staff only)"""
     if not request.user.is_staff:
         return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
     
-    resources = AcademicResource.objects.filter(is_approved=False).select_related('subject', 'uploaded_by').order_by('-created_at')
+    # Queue length as an uncorrelated scalar subquery: counted in the page query itself
+    queue_count = Subquery(
+        moderation.pending_resources().order_by()
+        .annotate(count=Func(F('id'), function='COUNT')).values('count'),
+        output_field=IntegerField(),
+    )
+    try:
+        rows, next_cursor = paginate(
+            moderation.pending_resources().annotate(queue_count=queue_count)
+            .values(*moderation.PENDING_FIELDS, 'queue_count'),
+            moderation.PENDING_ORDERING,
+            cursor=request.GET.get('cursor'),
+            page_size=get_page_size(request),
+        )
+    except InvalidCursor:
+        return Response({'error': 'Invalid cursor'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if rows:
+        count = rows[0]['queue_count']
+    else:
+        count = moderation.pending_resources().count() if request.GET.get('cursor') else 0
     
+    urls = file_urls(name for row in rows for name in (row['file'], row['thumbnail']))
+    duplicates = dedup.duplicates_for(rows)
     resources_data = []
-    for resource in resources:
+    for row in rows:
         resources_data.append({
-            'id': resource.id,
-            'title': resource.title,
-            'description': resource.description,
-            'file': resource.file.url if resource.file else '',
-            'file_size': resource.file_size,
-            'module_number': resource.module_number,
-            'exam_type': resource.exam_type,
-            'exam_year': resource.exam_year,
-            'author': resource.author,
-            'created_at': resource.created_at,
-            'category': resource.category.category_type,
-            'category_name': resource.category.name,
-            'subject_name': resource.subject.name,
-            'subject_code': resource.subject.code,
-            'uploaded_by_name': f"{resource.uploaded_by.first_name} {resource.uploaded_by.last_name}",
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'],
+            'file': urls.get(row['file'], ''),
+            'file_size': row['file_size'],
+            'thumbnail': urls.get(row['thumbnail']),
+            'page_count': row['page_count'],
+            'module_number': row['module_number'],
+            'exam_type': row['exam_type'],
+            'exam_year': row['exam_year'],
+            'author': row['author'],
+            'created_at': row['created_at'],
+            'category': row['category'],
+            'category_name': CATEGORY_NAMES.get(row['category'], row['category']),
+            'subject_name': row['subject__name'],
+            'subject_code': row['subject__code'],
+            'uploaded_by_name': f"{row['uploaded_by__first_name']} {row['uploaded_by__last_name']}",
+            'file_hash': row['file_hash'],
+            'duplicates': duplicates.get(row['id'], []),
         })
     return Response({
         'unverified_notes': resources_data,
-        'count': resources.count()
+        'count': count,
+        'next_cursor': next_cursor,
+        'has_more': next_cursor is not None,
     })
 
 
@@ -234,32 +451,54 @@ def approve_note(request, pk):
     if not request.user.is_staff:
         return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
     
-    try:
-        resource = AcademicResource.objects.get(pk=pk, is_approved=False)
-        resource.is_approved = True
-        resource.approved_by = request.user
-        resource.approved_at = timezone.now()
-        resource.save()
-        
-        return Response({
-            'message': 'Note approved successfully',
-            'resource_id': resource.id
-        })
-    except AcademicResource.DoesNotExist:
+    updated_ids, _ = moderation.moderate([pk], 'approve', request.user)
+    if not updated_ids:
         return Response({'error': 'Note not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    return Response({
+        'message': 'Note approved successfully',
+        'resource_id': pk
+    })
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def moderate_notes(request):
+    """Approve or reject many unverified notes in one transaction (staff only)"""
+    if not request.user.is_staff:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    action = request.data.get('action')
+    if action not in moderation.ACTIONS:
+        return Response({'error': f'action must be one of: {", ".join(moderation.ACTIONS)}'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        resource_ids = moderation.parse_ids(request.data.get('ids'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    updated_ids, skipped_ids = moderation.moderate(resource_ids, action, request.user)
+    return Response({
+        'message': f"{len(updated_ids)} notes {'approved' if action == 'approve' else 'rejected'}",
+        'action': action,
+        'updated': updated_ids,
+        'skipped': skipped_ids,
+    })
 
 
 @api_view(['GET'])
 def academic_resource_detail(request, pk):
     """Get single academic resource"""
     try:
-        resource = AcademicResource.objects.get(pk=pk, is_approved=True)
+        resource = AcademicResource.objects.defer('extracted_text', 'search_vector').get(pk=pk, is_approved=True)
+        counters.record_view(resource.pk)
         resource_data = {
             'id': resource.id,
             'title': resource.title,
             'description': resource.description,
             'file': resource.file.url if resource.file else None,
             'file_size': resource.file_size,
+            'thumbnail': resource.thumbnail.url if resource.thumbnail else None,
+            'page_count': resource.page_count,
             'module_number': resource.module_number,
             'exam_type': resource.exam_type,
             'exam_year': resource.exam_year,
@@ -276,43 +515,24 @@ def academic_resource_detail(request, pk):
 @permission_classes([IsAuthenticated])
 def upload_academic_resource(request):
     """Upload new academic resource"""
-    # Simple validation and creation
-    required_fields = ['title', 'category', 'file']
-    for field in required_fields:
-        if field not in request.data:
-            return Response({'error': f'{field} is required'}, status=status.HTTP_400_BAD_REQUEST)
+    help_text = 'Upload only PDF files. Maximum file size: 15MB. Only PDF format is supported for academic resources.'
     
     # File validation
     uploaded_file = request.FILES.get('file')
     if not uploaded_file:
         return Response({'error': 'No file uploaded'}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Check file extension
-    if not uploaded_file.name.lower().endswith('.pdf'):
-        return Response({
-            'error': 'Only PDF files are allowed. Please upload a PDF document.',
-            'help_text': 'Upload only PDF files. Maximum file size: 15MB. Only PDF format is supported for academic resources.'
-        }, status=status.HTTP_400_BAD_REQUEST)
-    
-    # Check file size (15MB limit)
-    if uploaded_file.size > 15 * 1024 * 1024:
-        return Response({
-            'error': 'File size must be less than 15MB. Please compress the file or use a smaller document.',
-            'help_text': 'Upload only PDF files. Maximum file size: 15MB. Only PDF format is supported for academic resources.'
-        }, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        validate_file_info(uploaded_file.name, uploaded_file.size)
+        fields = validate_metadata(request.data)
+    except UploadError as e:
+        return Response({'error': str(e), 'help_text': help_text}, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        category = AcademicCategory.objects.get(id=request.data['category'])
         resource = AcademicResource.objects.create(
-            title=request.data['title'],
-            description=request.data.get('description', ''),
-            category=category,
             file=uploaded_file,
             uploaded_by=request.user,
-            module_number=request.data.get('module_number', 1),
-            exam_type=request.data.get('exam_type', ''),
-            exam_year=request.data.get('exam_year'),
-            author=request.data.get('author', '')
+            **fields
         )
         return Response({'id': resource.id, 'message': 'Resource uploaded successfully'}, 
                        status=status.HTTP_201_CREATED)
@@ -320,6 +540,113 @@ def upload_academic_resource(request):
         return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
+def upload_session_data(session):
+    received = received_chunks(session) if session.status == 'pending' else []
+    return {
+        'id': str(session.id),
+        'filename': session.filename,
+        'total_size': session.total_size,
+        'chunk_size': session.chunk_size,
+        'total_chunks': session.total_chunks,
+        'received_chunks': received,
+        'missing_chunks': sorted(set(range(session.total_chunks)) - set(received)) if session.status == 'pending' else [],
+        'status': session.status,
+        'error': session.error,
+        'resource_id': session.resource_id,
+        'expires_at': session.expires_at,
+    }
+
+
+def get_upload_session(request, session_id):
+    try:
+        return ResourceUploadSession.objects.get(pk=session_id, uploaded_by=request.user)
+    except ResourceUploadSession.DoesNotExist:
+        return None
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def create_upload_session(request):
+    """Start a resumable chunked upload (metadata + filename, total_size, optional sha256 checksum)"""
+    try:
+        total_size = int(request.data.get('total_size', 0))
+    except (TypeError, ValueError):
+        return Response({'error': 'total_size must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    filename = os.path.basename(request.data.get('filename') or '')
+    checksum = (request.data.get('checksum') or '').lower()
+    if checksum and (len(checksum) != 64 or any(c not in '0123456789abcdef' for c in checksum)):
+        return Response({'error': 'checksum must be a hex SHA-256 digest'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        validate_file_info(filename, total_size)
+        fields = validate_metadata(request.data)
+    except UploadError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    session = ResourceUploadSession.objects.create(
+        uploaded_by=request.user,
+        filename=filename,
+        total_size=total_size,
+        chunk_size=get_upload_chunk_size(),
+        checksum=checksum,
+        metadata=fields,
+        expires_at=new_session_expiry(),
+    )
+    return Response(upload_session_data(session), status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def upload_session_detail(request, session_id):
+    """Upload progress (received/missing chunks) or abort the upload"""
+    session = get_upload_session(request, session_id)
+    if session is None:
+        return Response({'error': 'Upload session not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    if request.method == 'DELETE':
+        discard_parts(session)
+        session.delete()
+        return Response({'message': 'Upload cancelled'})
+    
+    return Response(upload_session_data(session))
+
+
+@api_view(['PUT'])
+@permission_classes([IsAuthenticated])
+def upload_chunk(request, session_id, index):
+    """Receive one chunk as the raw request body"""
+    session = get_upload_session(request, session_id)
+    if session is None:
+        return Response({'error': 'Upload session not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    try:
+        received = write_chunk(session, index, request.stream or BytesIO())
+    except UploadError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({'index': index, 'received_bytes': received})
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def complete_upload_session(request, session_id):
+    """Assemble, verify and create the resource"""
+    session = get_upload_session(request, session_id)
+    if session is None:
+        return Response({'error': 'Upload session not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    try:
+        resource, created = complete_upload(session)
+    except UploadInProgress as e:
+        return Response({'error': str(e), 'upload': upload_session_data(session)}, status=status.HTTP_409_CONFLICT)
+    except UploadError as e:
+        return Response({'error': str(e), 'upload': upload_session_data(session)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({'id': resource.id, 'message': 'Resource uploaded successfully'},
+                   status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([])  # Remove authentication requirement
 def download_academic_resource(request, pk):
@@ -330,23 +657,26 @@ def download_academic_resource(request, pk):
         if not resource.file:
             return Response({'error': 'File not found'}, status=status.HTTP_404_NOT_FOUND)
         
-        # Increment download count
-        resource.download_count += 1
-        resource.save()
+        def increment_download_count():
+            counters.record_download(resource.pk, request.user, request.META.get('REMOTE_ADDR'))
         
-        # Get the file path
-        file_path = resource.file.path
-        
-        if not os.path.exists(file_path):
+        # Stream the file (or redirect to remote storage); 304s and resumed ranges are not counted
+        response = serve_file(request, resource.file, on_download=increment_download_count)
+        if response is None:
             return Response({'error': 'File not found on disk'}, status=status.HTTP_404_NOT_FOUND)
-        
-        # Open and serve the file
-        with open(file_path, 'rb') as f:
-            response = HttpResponse(f.read(), content_type='application/octet-stream')
-            response['Content-Disposition'] = f'attachment; filename="{os.path.basename(file_path)}"'
-            return response
+        return response
             
     except AcademicResource.DoesNotExist:
         return Response({'error': 'Resource not found'}, status=status.HTTP_404_NOT_FOUND)
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def resource_counter_stats(request):
+    """Write-behind counter metrics: pending increments, flush lag, drops (staff only)"""
+    if not request.user.is_staff:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    return Response(counters.get_stats())
@@ -0,0 +1,34 @@
+"""
+System checks for settings that several apps depend on.
+
+The academics catalog, the cached event endpoints, feedback analytics and
+QR check-in markers invalidate or deduplicate through Django's cache. With
+a per-process backend (``LocMemCache``) each gunicorn worker has its own
+copy, so an edit handled by one worker never reaches the others. This is
+a deployment check (``python manage.py check --deploy``, run by the
+container before gunicorn starts): outside DEBUG a per-process cache is an
+error. A single ``runserver`` process is fine with the default
+local-memory cache.
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+PER_PROCESS_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def has_shared_cache():
+    return settings.CACHES['default']['BACKEND'] not in PER_PROCESS_BACKENDS
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    if settings.DEBUG or has_shared_cache():
+        return []
+    return [Error(
+        'The default cache is not shared between worker processes.',
+        hint='Set REDIS_URL, or CACHE_BACKEND=database and run `python manage.py createcachetable`.',
+        id='eesa_backend.E001',
+    )]
@@ -155,6 +155,104 @@ else:
     STATIC_ROOT = BASE_DIR / 'staticfiles'
     MEDIA_URL = '/media/'
 
+# Cache shared by every worker process. The academics catalog, the cached
+# event endpoints, feedback analytics and check-in scan markers are all
+# invalidated through it, so a per-process cache would let workers serve stale
+# data (see eesa_backend.checks). Set REDIS_URL to use Redis; otherwise the
+# database cache table is used (`python manage.py createcachetable`).
+# CACHE_BACKEND=locmem is only suitable for a single runserver process.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'redis' if REDIS_URL else ('locmem' if DEBUG else 'database'))
+if CACHE_BACKEND == 'redis':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+elif CACHE_BACKEND == 'database':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'django_cache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Academic resource downloads
+# Set to 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache/lighttpd) to let the
+# web server stream local files instead of a gunicorn worker
+ACADEMICS_DOWNLOAD_OFFLOAD = os.environ.get('ACADEMICS_DOWNLOAD_OFFLOAD', '')
+ACADEMICS_DOWNLOAD_ACCEL_PREFIX = os.environ.get('ACADEMICS_DOWNLOAD_ACCEL_PREFIX', '/protected-media/')
+ACADEMICS_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Write-behind download/view counters for academic resources
+# BACKEND: 'cache' (one journal in Redis shared by every worker; flush with
+# `python manage.py flush_resource_counters` from cron), the default with
+# REDIS_URL, or 'memory' (a buffer per worker process). With 'memory' each
+# worker flushes its own buffer, the flush command only sees its own
+# process, and a worker that is killed loses its buffered increments, so
+# it is meant for single-process development. The database cache is not
+# used for this: every increment would be a database write again.
+ACADEMICS_COUNTERS = {
+    'BACKEND': os.environ.get('ACADEMICS_COUNTER_BACKEND', 'cache' if CACHE_BACKEND == 'redis' else 'memory'),
+    'FLUSH_THRESHOLD': 100,
+    'FLUSH_INTERVAL': 30,  # seconds
+    'MAX_PENDING': 10000,
+}
+
+# Resumable chunked uploads for academic resources
+ACADEMICS_UPLOAD_TEMP_DIR = os.environ.get('ACADEMICS_UPLOAD_TEMP_DIR', str(BASE_DIR / 'tmp_uploads'))
+ACADEMICS_UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+ACADEMICS_UPLOAD_SESSION_TTL_HOURS = 24
+
+# Background PDF processing (page count, text, thumbnail); run
+# `python manage.py process_resources` as a separate worker process
+ACADEMICS_PROCESSING_WORKERS = int(os.environ.get('ACADEMICS_PROCESSING_WORKERS', 2))
+
+# Freshness (seconds) of the cached public event endpoints; changes to events
+# invalidate them immediately, so these only bound time-dependent fields
+EVENTS_CACHE_TTLS = {
+    'event_stats': int(os.environ.get('EVENTS_STATS_CACHE_TTL', 300)),
+    'upcoming_events': int(os.environ.get('EVENTS_UPCOMING_CACHE_TTL', 60)),
+    'featured_events': int(os.environ.get('EVENTS_FEATURED_CACHE_TTL', 300)),
+}
+
+# QR check-in: scans are queued as CheckInScan rows and attendance is written
+# in batches; run `python manage.py flush_check_ins` from cron for leftovers
+EVENTS_CHECKIN = {
+    'FLUSH_THRESHOLD': 50,
+    'FLUSH_INTERVAL': 5,  # seconds
+}
+
+# Certificate PDF rendering processes for `python manage.py generate_certificates`
+EVENTS_CERTIFICATE_WORKERS = int(os.environ.get('EVENTS_CERTIFICATE_WORKERS', 2))
+
+# Email (console backend unless configured; use locmem for local testing)
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'django.core.mail.backends.console.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = int(os.environ.get('EMAIL_PORT', 587))
+EMAIL_HOST_USER = os.environ.get('EMAIL_HOST_USER', '')
+EMAIL_HOST_PASSWORD = os.environ.get('EMAIL_HOST_PASSWORD', '')
+EMAIL_USE_TLS = os.environ.get('EMAIL_USE_TLS', 'True').lower() == 'true'
+EMAIL_TIMEOUT = int(os.environ.get('EMAIL_TIMEOUT', 30))
+DEFAULT_FROM_EMAIL = os.environ.get('DEFAULT_FROM_EMAIL', 'EESA <noreply@eesa.com>')
+
+# Event notification outbox; run `python manage.py send_notifications` as a worker
+EVENTS_NOTIFICATIONS = {
+    'RATE_LIMIT': float(os.environ.get('EVENTS_EMAIL_RATE_LIMIT', 10)),  # messages/second per worker
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 5,
+}
+
+# Parallel fetches from remote storage when exporting a drive's resumes as a ZIP
+PLACEMENTS_RESUME_FETCH_THREADS = int(os.environ.get('PLACEMENTS_RESUME_FETCH_THREADS', 4))
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -2,12 +2,16 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
-from django.http import HttpResponse
+from django.http import StreamingHttpResponse
 from django.db.models import Count, Sum, Q
 from django.utils import timezone
 
-import csv
-from .models import Event, EventRegistration, EventSpeaker, EventSchedule
+from .models import CertificateRun, Event, EventNotification, EventRegistration, EventSpeaker, EventSchedule
+from django.db import transaction
+from . import analytics, caching, certificates, notifications
+from .bulk import export_rows
+from .counts import update_registrations
+from .registration import cancel_registration, cancel_registrations, capacity_changed
 
 
 class EventScheduleInline(admin.TabularInline):
@@ -40,9 +44,9 @@ class EventAdmin(admin.ModelAdmin):
         'payment_required', 'created_by'
     ]
     search_fields = ['title', 'description', 'location', 'venue']
-    readonly_fields = ['created_by', 'created_at', 'updated_at', 'spots_remaining']
+    readonly_fields = ['created_by', 'created_at', 'updated_at', 'spots_remaining', 'attended_count', 'paid_count']
     inlines = [EventSpeakerInline, EventScheduleInline]
-    actions = ['mark_as_featured', 'mark_as_published', 'mark_as_cancelled', 'export_registrations_csv']
+    actions = ['mark_as_featured', 'mark_as_published', 'mark_as_cancelled', 'export_registrations_csv', 'generate_certificates']
     
     fieldsets = (
         ('Basic Information', {
@@ -55,7 +59,7 @@ class EventAdmin(admin.ModelAdmin):
             'fields': ('location', 'venue', 'address', 'is_online', 'meeting_link')
         }),
         ('Registration Settings', {
-            'fields': ('registration_required', 'max_participants', 'spots_remaining')
+            'fields': ('registration_required', 'max_participants', 'waitlist_enabled', 'spots_remaining', 'attended_count', 'paid_count')
         }),
         ('Payment Settings', {
             'fields': ('registration_fee', 'payment_required', 'payment_qr_code', 'payment_upi_id', 'payment_instructions')
@@ -66,6 +70,9 @@ class EventAdmin(admin.ModelAdmin):
         ('Media', {
             'fields': ('banner_image', 'event_flyer')
         }),
+        ('Certificates', {
+            'fields': ('certificate_template', 'certificate_name_position')
+        }),
         ('Settings', {
             'fields': ('is_active', 'is_featured')
         }),
@@ -76,9 +83,7 @@ class EventAdmin(admin.ModelAdmin):
     )
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('created_by').annotate(
-            registration_count_annotation=Count('registrations')
-        )
+        return super().get_queryset(request).select_related('created_by')
     
     def start_date_formatted(self, obj):
         return obj.start_date.strftime('%Y-%m-%d %H:%M')
@@ -101,92 +106,84 @@ class EventAdmin(admin.ModelAdmin):
     is_featured_indicator.short_description = 'Featured'
     
     def registration_count(self, obj):
-        # Use annotation if available, otherwise use model property
-        count = getattr(obj, 'registration_count_annotation', None)
-        if count is None:
-            count = obj.registration_count
-        
+        count = obj.registration_count
         if obj.max_participants:
             return f"{count}/{obj.max_participants}"
         return str(count)
     registration_count.short_description = 'Registrations'
     
     def mark_as_featured(self, request, queryset):
-        queryset.update(is_featured=True)
+        queryset.update(is_featured=True, updated_at=timezone.now())
+        transaction.on_commit(caching.invalidate)
         self.message_user(request, f'{queryset.count()} events marked as featured.')
     mark_as_featured.short_description = 'Mark selected events as featured'
     
     def mark_as_published(self, request, queryset):
-        queryset.update(status='published')
+        queryset.update(status='published', updated_at=timezone.now())
+        transaction.on_commit(caching.invalidate)
+        analytics.invalidate_on_commit(*queryset.values_list('pk', flat=True))
         self.message_user(request, f'{queryset.count()} events published.')
     mark_as_published.short_description = 'Publish selected events'
     
     def mark_as_cancelled(self, request, queryset):
-        queryset.update(status='cancelled')
-        self.message_user(request, f'{queryset.count()} events cancelled.')
+        """Cancel and queue a cancellation email to everyone registered"""
+        with transaction.atomic():
+            events = list(queryset.exclude(status='cancelled'))
+            queryset.filter(pk__in=[event.pk for event in events]).update(status='cancelled', updated_at=timezone.now())
+            for event in events:
+                event.status = 'cancelled'
+                notifications.queue(event, 'cancellation', user=request.user)
+        transaction.on_commit(caching.invalidate)
+        analytics.invalidate_on_commit(*[event.pk for event in events])
+        self.message_user(request, f'{len(events)} events cancelled; registrants will be notified.')
     mark_as_cancelled.short_description = 'Cancel selected events'
     
     def export_registrations_csv(self, request, queryset):
         """Export registrations for selected events to CSV"""
-        response = HttpResponse(content_type='text/csv')
+        # One query over all selected events, streamed in chunks
+        registrations = EventRegistration.objects.filter(event__in=queryset)
+        response = StreamingHttpResponse(export_rows(registrations), content_type='text/csv')
         response['Content-Disposition'] = 'attachment; filename="event_registrations.csv"'
-        
-        writer = csv.writer(response)
-        writer.writerow([
-            'Event Title', 'Name', 'Email', 'Mobile', 'Institution', 'Department',
-            'Year of Study', 'Organization', 'Designation', 'Payment Status',
-            'Payment Amount', 'Payment Date', 'Attended', 'Certificate Issued',
-            'Registered Date'
-        ])
-        
-        for event in queryset:
-            for registration in event.registrations.all():
-                writer.writerow([
-                    event.title,
-                    registration.name,
-                    registration.email,
-                    registration.mobile_number,
-                    registration.institution or '',
-                    registration.department or '',
-                    registration.year_of_study or '',
-                    registration.organization or '',
-                    registration.designation or '',
-                    registration.get_payment_status_display(),
-                    float(registration.payment_amount) if registration.payment_amount else 0,
-                    registration.payment_date.strftime('%Y-%m-%d %H:%M') if registration.payment_date else '',
-                    'Yes' if registration.attended else 'No',
-                    'Yes' if registration.certificate_issued else 'No',
-                    registration.registered_at.strftime('%Y-%m-%d %H:%M')
-                ])
-        
         return response
     
     export_registrations_csv.short_description = 'Export registrations to CSV'
     
+    def generate_certificates(self, request, queryset):
+        """Queue certificate runs; `python manage.py generate_certificates` renders them"""
+        queued = 0
+        for event in queryset:
+            run, created = certificates.start_run(event, user=request.user)
+            queued += created
+        self.message_user(request, f'{queued} certificate runs queued.')
+    generate_certificates.short_description = 'Generate certificates for attendees'
+    
     def save_model(self, request, obj, form, change):
-        """Auto-populate created_by field"""
+        """Auto-populate created_by field; Event.save() leaves the registration counters alone"""
         if not change:  # If creating new object
             obj.created_by = request.user
         super().save_model(request, obj, form, change)
+        if change:
+            capacity_changed(obj.pk)
+            notifications.event_changed(obj, form.changed_data, user=request.user)
 
 
 @admin.register(EventRegistration)
 class EventRegistrationAdmin(admin.ModelAdmin):
     list_display = [
-        'name', 'email', 'event', 'payment_status', 'payment_amount',
+        'name', 'email', 'event', 'status', 'payment_status', 'payment_amount',
         'attended', 'certificate_issued', 'registered_at'
     ]
     list_filter = [
-        'event', 'payment_status', 'attended', 'certificate_issued',
+        'event', 'status', 'payment_status', 'attended', 'certificate_issued',
         'registered_at', 'institution', 'department'
     ]
     search_fields = ['name', 'email', 'mobile_number', 'institution', 'organization']
-    readonly_fields = ['registered_at', 'updated_at']
+    readonly_fields = ['registered_at', 'updated_at', 'certificate_file', 'certificate_generated_at']
     actions = ['mark_as_attended', 'mark_certificates_issued', 'verify_payment']
     
     fieldsets = (
         ('Event Registration', {
-            'fields': ('event', 'registered_at')
+            'fields': ('event', 'status', 'registered_at')
         }),
         ('Personal Information', {
             'fields': ('name', 'email', 'mobile_number')
@@ -207,7 +204,7 @@ class EventRegistrationAdmin(admin.ModelAdmin):
             'fields': ('dietary_requirements', 'special_needs')
         }),
         ('Attendance & Certificates', {
-            'fields': ('attended', 'certificate_issued')
+            'fields': ('attended', 'certificate_issued', 'certificate_file', 'certificate_generated_at')
         }),
         ('Metadata', {
             'fields': ('updated_at',),
@@ -215,9 +212,16 @@ class EventRegistrationAdmin(admin.ModelAdmin):
         })
     )
     
+    def delete_model(self, request, obj):
+        """Deleting a confirmed registration promotes the waitlist"""
+        cancel_registration(obj)
+    
+    def delete_queryset(self, request, queryset):
+        cancel_registrations(queryset)
+    
     def mark_as_attended(self, request, queryset):
-        queryset.update(attended=True)
-        self.message_user(request, f'{queryset.count()} registrations marked as attended.')
+        updated = update_registrations(queryset, attended=True)
+        self.message_user(request, f'{updated} registrations marked as attended.')
     mark_as_attended.short_description = 'Mark as attended'
     
     def mark_certificates_issued(self, request, queryset):
@@ -226,11 +230,57 @@ class EventRegistrationAdmin(admin.ModelAdmin):
     mark_certificates_issued.short_description = 'Mark certificates as issued'
     
     def verify_payment(self, request, queryset):
-        queryset.update(payment_status='paid', payment_verified_by=request.user, payment_date=timezone.now())
-        self.message_user(request, f'{queryset.count()} payments verified.')
+        updated = update_registrations(
+            queryset, payment_status='paid', payment_verified_by=request.user, payment_date=timezone.now()
+        )
+        self.message_user(request, f'{updated} payments verified.')
     verify_payment.short_description = 'Verify payment'
 
 
+@admin.register(CertificateRun)
+class CertificateRunAdmin(admin.ModelAdmin):
+    list_display = ['event', 'status', 'reissue', 'progress_display', 'failed', 'created_by', 'created_at', 'finished_at']
+    list_filter = ['status', 'reissue']
+    search_fields = ['event__title']
+    list_select_related = ['event', 'created_by']
+    readonly_fields = [
+        'event', 'status', 'reissue', 'total', 'generated', 'failed', 'last_error',
+        'locked_by', 'locked_at', 'created_by', 'created_at', 'started_at', 'finished_at'
+    ]
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def progress_display(self, obj):
+        return f"{obj.generated}/{obj.total} ({obj.progress}%)"
+    progress_display.short_description = 'Progress'
+
+
+@admin.register(EventNotification)
+class EventNotificationAdmin(admin.ModelAdmin):
+    list_display = ['subject', 'event', 'kind', 'recipient_count', 'sent', 'pending', 'failed', 'created_at']
+    list_filter = ['kind', 'created_at']
+    search_fields = ['subject', 'event__title']
+    readonly_fields = ['event', 'kind', 'subject', 'body', 'recipient_count', 'created_by', 'created_at']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('event').annotate(
+            **notifications.status_counts('deliveries', 'deliveries__')
+        )
+    
+    def sent(self, obj):
+        return obj.sent
+    
+    def pending(self, obj):
+        return obj.pending + obj.sending
+    
+    def failed(self, obj):
+        return obj.failed
+
+
 # EventSpeaker and EventSchedule removed from admin - managed through Event inlines only
 
 
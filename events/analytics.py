@@ -0,0 +1,106 @@
+"""
+Feedback analytics per event: rating distributions and means, a
+recommendation score, and the response rate against attendance.
+
+Everything comes from one aggregate query over ``Event`` joined to its
+feedback (``attended_count`` is already a column, see ``events.counts``), for
+one event or for many at once. Results are cached per event, for
+``COMPLETED_TIMEOUT`` seconds once an event is completed and
+``RUNNING_TIMEOUT`` seconds otherwise. New feedback, event edits and
+attendance changes delete the event's entry; the finite timeouts bound
+staleness should a deletion be missed.
+
+``recommend_score`` is the share of "yes" minus the share of "no" answers to
+the yes/no ``would_recommend`` question. It is not a Net Promoter Score,
+which needs a 0-10 scale.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Avg, Count, Q
+
+RATING_FIELDS = {
+    'overall': 'overall_rating',
+    'content': 'content_rating',
+    'organization': 'organization_rating',
+}
+RATING_VALUES = range(1, 6)
+RUNNING_TIMEOUT = 60
+COMPLETED_TIMEOUT = 60 * 60
+MAX_EVENTS = 200
+
+
+def cache_key(event_id):
+    return f'events:feedback:{event_id}'
+
+
+def invalidate(*event_ids):
+    cache.delete_many([cache_key(event_id) for event_id in event_ids])
+
+
+def invalidate_on_commit(*event_ids):
+    transaction.on_commit(lambda: invalidate(*event_ids))
+
+
+def aggregates():
+    """Annotations on Event computing every figure over its feedback rows"""
+    annotations = {
+        'responses': Count('feedback'),
+        'recommend_yes': Count('feedback', filter=Q(feedback__would_recommend=True)),
+    }
+    for name, field in RATING_FIELDS.items():
+        annotations[f'{name}_mean'] = Avg(f'feedback__{field}')
+        for value in RATING_VALUES:
+            annotations[f'{name}_{value}'] = Count('feedback', filter=Q(**{f'feedback__{field}': value}))
+    return annotations
+
+
+def build(row):
+    responses = row['responses']
+    recommend_no = responses - row['recommend_yes']
+    return {
+        'event_id': row['id'],
+        'title': row['title'],
+        'status': row['status'],
+        'responses': responses,
+        'attended': row['attended_count'],
+        'response_rate': round(100 * responses / row['attended_count'], 1) if row['attended_count'] else None,
+        'ratings': {
+            name: {
+                'mean': round(row[f'{name}_mean'], 2) if row[f'{name}_mean'] is not None else None,
+                'distribution': {str(value): row[f'{name}_{value}'] for value in RATING_VALUES},
+            }
+            for name in RATING_FIELDS
+        },
+        'would_recommend': row['recommend_yes'],
+        'recommend_score': round(100 * (row['recommend_yes'] - recommend_no) / responses) if responses else None,
+    }
+
+
+def compute(event_ids):
+    """``{event_id: analytics}`` for the given events, in one query"""
+    from .models import Event
+
+    rows = (
+        Event.objects.filter(pk__in=event_ids)
+        .order_by()
+        .values('id', 'title', 'status', 'attended_count')
+        .annotate(**aggregates())
+    )
+    return {row['id']: build(row) for row in rows}
+
+
+def get_analytics(event_ids):
+    """Cached analytics for many events; only the misses are computed, together"""
+    event_ids = list(dict.fromkeys(event_ids))
+    found = cache.get_many([cache_key(event_id) for event_id in event_ids])
+    results = {event_id: found[cache_key(event_id)] for event_id in event_ids if cache_key(event_id) in found}
+
+    missing = [event_id for event_id in event_ids if event_id not in results]
+    if missing:
+        computed = compute(missing)
+        completed = {cache_key(event_id): data for event_id, data in computed.items() if data['status'] == 'completed'}
+        running = {cache_key(event_id): data for event_id, data in computed.items() if data['status'] != 'completed'}
+        cache.set_many(completed, timeout=COMPLETED_TIMEOUT)
+        cache.set_many(running, timeout=RUNNING_TIMEOUT)
+        results.update(computed)
+    return results
@@ -0,0 +1,206 @@
+"""
+Bulk registration import and streaming export.
+
+Imports validate every row up front (per-row errors are reported, never
+raised), then insert the valid rows with ``bulk_create`` one batch at a
+time. Each batch runs under the same ``Event`` row lock as the registration
+engine, so seats, duplicate emails and the denormalized counters stay
+consistent with concurrent online registrations.
+
+Exports stream CSV rows straight from a single query over all selected
+events, fetched in chunks, so memory stays flat however large the event.
+"""
+import csv
+
+from django.db import transaction
+from django.db.models.functions import Lower
+from rest_framework.exceptions import ValidationError
+
+from .counts import COUNTERS, TRACKED_FIELDS, apply_deltas, contribution
+from .models import EventRegistration
+from .registration import lock_event
+from .serializers import EventRegistrationCreateSerializer
+
+IMPORT_BATCH_SIZE = 1000
+EXPORT_CHUNK_SIZE = 2000
+REQUIRED_HEADERS = ['name', 'email', 'mobile_number']
+OPTIONAL_HEADERS = [
+    'institution', 'department', 'year_of_study',
+    'organization', 'designation',
+    'dietary_requirements', 'special_needs'
+]
+
+EXPORT_HEADERS = [
+    'Event Title', 'Name', 'Email', 'Mobile', 'Institution', 'Department',
+    'Year of Study', 'Organization', 'Designation', 'Status', 'Payment Status',
+    'Payment Amount', 'Payment Date', 'Attended', 'Certificate Issued',
+    'Registered Date'
+]
+EXPORT_FIELDS = [
+    'event__title', 'name', 'email', 'mobile_number', 'institution', 'department',
+    'year_of_study', 'organization', 'designation', 'status', 'payment_status',
+    'payment_amount', 'payment_date', 'attended', 'certificate_issued',
+    'registered_at'
+]
+
+
+def normalize_header(header):
+    """'Mobile Number' / 'mobile-number' -> 'mobile_number'"""
+    return '_'.join((header or '').strip().lower().replace('-', ' ').split())
+
+
+def read_csv(csv_file):
+    """Rows of an uploaded CSV as dicts keyed by normalized header"""
+    lines = (line.decode('utf-8-sig') for line in csv_file)
+    reader = csv.reader(lines)
+    headers = [normalize_header(header) for header in next(reader, [])]
+    missing = [header for header in REQUIRED_HEADERS if header not in headers]
+    return headers, missing, (dict(zip(headers, row)) for row in reader)
+
+
+def clean_row(row):
+    return {
+        field: str(row[field]).strip()
+        for field in REQUIRED_HEADERS + OPTIONAL_HEADERS
+        if row.get(field) not in (None, '')
+    }
+
+
+def validate_rows(rows):
+    """Returns ``([(row_number, validated_data)], [{'row', 'errors'}])``; duplicates within the file are errors"""
+    # One serializer instance for every row, so its fields are only built once
+    validator = EventRegistrationCreateSerializer()
+    valid, errors = [], []
+    seen = set()
+    for row_number, row in enumerate(rows, start=1):
+        try:
+            data = validator.run_validation(clean_row(row))
+        except ValidationError as e:
+            errors.append({'row': row_number, 'errors': e.detail})
+            continue
+        email = data['email'].lower()
+        if email in seen:
+            errors.append({'row': row_number, 'errors': {'email': ['Duplicate email in this file']}})
+            continue
+        seen.add(email)
+        valid.append((row_number, data))
+    return valid, errors
+
+
+def import_batch(event_id, batch):
+    """Insert one batch under the event lock; returns ``(created, errors)``"""
+    with transaction.atomic():
+        event = lock_event(event_id)
+        # Emails are compared case-insensitively, against the event and within the batch
+        emails = {data['email'].lower() for _, data in batch}
+        taken = set(
+            EventRegistration.objects.filter(event_id=event_id)
+            .annotate(email_lower=Lower('email'))
+            .filter(email_lower__in=emails)
+            .values_list('email_lower', flat=True)
+        )
+
+        free_seats = None
+        if event.max_participants:
+            free_seats = max(event.max_participants - event.registration_count, 0)
+
+        created, errors = [], []
+        batch_emails = set()
+        for row_number, data in batch:
+            email = data['email'].lower()
+            if email in taken:
+                errors.append({'row': row_number, 'errors': {'email': ['Already registered for this event']}})
+                continue
+            if email in batch_emails:
+                errors.append({'row': row_number, 'errors': {'email': ['Duplicate email in this file']}})
+                continue
+            batch_emails.add(email)
+
+            registration_status = 'confirmed'
+            if free_seats is not None:
+                if free_seats > 0:
+                    free_seats -= 1
+                elif event.waitlist_enabled:
+                    registration_status = 'waitlisted'
+                else:
+                    errors.append({'row': row_number, 'errors': {'event': ['Event is full']}})
+                    continue
+            # bulk_create skips save(), which would fill in the fee
+            created.append(EventRegistration(
+                event_id=event_id, status=registration_status, payment_amount=event.registration_fee, **data
+            ))
+
+        # bulk_create skips save(), so the counters are bumped here
+        EventRegistration.objects.bulk_create(created)
+        deltas = dict.fromkeys(COUNTERS, 0)
+        for registration in created:
+            values = {field: getattr(registration, field) for field in TRACKED_FIELDS}
+            for counter, value in contribution(values).items():
+                deltas[counter] += value
+        apply_deltas(event_id, deltas)
+    return created, errors
+
+
+def import_registrations(event_id, rows, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Validate and insert registration rows (dicts of EventRegistration fields).
+    Returns ``{total_records, successful_imports, confirmed, waitlisted, failed_imports, errors}``.
+    """
+    valid, errors = validate_rows(rows)
+    total_records = len(valid) + len(errors)
+    confirmed = waitlisted = 0
+    for start in range(0, len(valid), batch_size):
+        created, batch_errors = import_batch(event_id, valid[start:start + batch_size])
+        errors += batch_errors
+        for registration in created:
+            if registration.status == 'confirmed':
+                confirmed += 1
+            else:
+                waitlisted += 1
+
+    errors.sort(key=lambda error: error['row'])
+    return {
+        'total_records': total_records,
+        'successful_imports': confirmed + waitlisted,
+        'confirmed': confirmed,
+        'waitlisted': waitlisted,
+        'failed_imports': len(errors),
+        'errors': errors,
+    }
+
+
+class Echo:
+    """File-like object whose write() returns the line, for csv.writer in a generator"""
+    def write(self, value):
+        return value
+
+
+def export_rows(registrations):
+    """Yield CSV lines (header first) for a registration queryset, in chunks"""
+    payment_labels = dict(EventRegistration.PAYMENT_STATUS)
+    status_labels = dict(EventRegistration.STATUS_CHOICES)
+    writer = csv.writer(Echo())
+
+    yield writer.writerow(EXPORT_HEADERS)
+    rows = registrations.order_by('event__start_date', 'event_id', 'registered_at', 'id').values_list(*EXPORT_FIELDS)
+    for (event_title, name, email, mobile_number, institution, department, year_of_study, organization,
+         designation, registration_status, payment_status, payment_amount, payment_date, attended,
+         certificate_issued, registered_at) in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield writer.writerow([
+            event_title,
+            name,
+            email,
+            mobile_number,
+            institution or '',
+            department or '',
+            year_of_study or '',
+            organization or '',
+            designation or '',
+            status_labels.get(registration_status, registration_status),
+            payment_labels.get(payment_status, payment_status),
+            float(payment_amount) if payment_amount else 0,
+            payment_date.strftime('%Y-%m-%d %H:%M') if payment_date else '',
+            'Yes' if attended else 'No',
+            'Yes' if certificate_issued else 'No',
+            registered_at.strftime('%Y-%m-%d %H:%M')
+        ])
@@ -0,0 +1,124 @@
+"""
+Response cache for the public event endpoints (stats, upcoming, featured).
+
+Entries carry their own expiry and are stored with a much longer cache
+timeout, so an expired entry is still available: the first request after
+expiry takes a short lock (``cache.add``) and recomputes while every other
+request keeps serving the stale value, instead of all workers hitting the
+database at once. On a cold miss (nothing cached, or evicted) the lock
+holder computes while the others wait up to ``COLD_WAIT`` for its value,
+then compute without storing. Changes to events or registrations bump a
+generation number (see ``events.signals``), which marks every entry stale
+at once; this needs the cache to be shared by all workers (see
+``eesa_backend.checks``).
+
+Hits, misses and stale serves are counted per endpoint in this worker's
+memory, so a cached read costs no writes, and reported by ``get_stats()``.
+"""
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+
+GENERATION_KEY = 'events:cache:generation'
+STALE_TIMEOUT = 24 * 60 * 60
+LOCK_TIMEOUT = 30
+COLD_WAIT = 2  # seconds a cold miss waits for the lock holder's value
+POLL_INTERVAL = 0.05
+DEFAULT_TTLS = {
+    'event_stats': 300,
+    'upcoming_events': 60,
+    'featured_events': 300,
+}
+OUTCOMES = ('hit', 'miss', 'stale')
+
+_counts = Counter()
+_counts_lock = threading.Lock()
+
+
+def get_ttl(name):
+    return getattr(settings, 'EVENTS_CACHE_TTLS', {}).get(name, DEFAULT_TTLS.get(name, 60))
+
+
+def invalidate():
+    """Mark every cached endpoint stale; the next reader recomputes"""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.add(GENERATION_KEY, 1, timeout=None)
+
+
+def record(name, outcome):
+    with _counts_lock:
+        _counts[(name, outcome)] += 1
+
+
+def store(key, value, ttl, generation):
+    cache.set(
+        key,
+        {'value': value, 'expires_at': time.time() + ttl, 'generation': generation},
+        timeout=STALE_TIMEOUT,
+    )
+
+
+def get_or_compute(name, compute, variant=''):
+    """Return the cached value for an endpoint, recomputing it at most once at a time"""
+    key = f'events:cache:{name}:{variant}'
+    found = cache.get_many([key, GENERATION_KEY])
+    entry = found.get(key)
+    generation = found.get(GENERATION_KEY, 0)
+
+    if entry is not None and entry['generation'] == generation and entry['expires_at'] > time.time():
+        record(name, 'hit')
+        return entry['value']
+
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, 1, timeout=LOCK_TIMEOUT):
+        if entry is not None:
+            # Another worker is recomputing; the stale value is good enough meanwhile
+            record(name, 'stale')
+            return entry['value']
+        fresh = wait_for(key, generation)
+        if fresh is not None:
+            record(name, 'hit')
+            return fresh['value']
+        # The lock holder is slow; answer this request without racing it to store
+        record(name, 'miss')
+        return compute()
+
+    record(name, 'miss')
+    try:
+        value = compute()
+        store(key, value, get_ttl(name), generation)
+    finally:
+        cache.delete(lock_key)
+    return value
+
+
+def wait_for(key, generation):
+    """Poll for the entry another worker is computing; None after ``COLD_WAIT``"""
+    deadline = time.monotonic() + COLD_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None and entry['generation'] == generation:
+            return entry
+    return None
+
+
+def get_stats():
+    """This worker's lookups per endpoint"""
+    with _counts_lock:
+        values = dict(_counts)
+    stats = {}
+    for name in DEFAULT_TTLS:
+        counts = {outcome: values.get((name, outcome), 0) for outcome in OUTCOMES}
+        lookups = sum(counts.values())
+        stats[name] = {
+            **counts,
+            'ttl': get_ttl(name),
+            'hit_rate': round((counts['hit'] + counts['stale']) / lookups, 3) if lookups else None,
+        }
+    return stats
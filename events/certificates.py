@@ -0,0 +1,278 @@
+"""
+Participation certificates for attended registrations.
+
+Each certificate is a one-page PDF rendered with Pillow: the participant's
+name printed on the event's ``certificate_template`` image, or a plain
+layout when the event has none. Files are stored under deterministic names
+(``events/certificates/<event>/<registration>.pdf``), so reissuing
+overwrites instead of piling up copies.
+
+Bulk generation is tracked by a ``CertificateRun`` row. ``python manage.py
+generate_certificates`` claims runs (a conditional UPDATE, like
+``academics.processing``), renders in a process pool and stores the PDFs
+from a small thread pool. Every chunk is committed with one ``UPDATE``
+setting ``certificate_issued`` and the file names, plus a progress update on
+the run. A registration counts as done once ``certificate_generated_at``
+is set (for a reissue: set after the run was created), so an interrupted
+run resumes where it stopped.
+"""
+import io
+import os
+import socket
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import timedelta
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections
+from django.db.models import CharField, Case, F, Q, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+CHUNK_SIZE = 100
+STORE_THREADS = 4
+LOCK_TIMEOUT = timedelta(minutes=10)
+PAGE_SIZE = (1754, 1240)  # A4 landscape at 150 dpi
+RESOLUTION = 150
+
+
+def get_worker_count():
+    return getattr(settings, 'EVENTS_CERTIFICATE_WORKERS', 2)
+
+
+def certificate_path(event_id, registration_id):
+    return f'events/certificates/{event_id}/{registration_id}.pdf'
+
+
+def load_template(event):
+    """Template image bytes, read once per run and shipped to the pool processes"""
+    if not event.certificate_template:
+        return None
+    with event.certificate_template.open('rb') as template:
+        return template.read()
+
+
+def get_layout(event):
+    return {
+        'title': event.title,
+        'date': timezone.localtime(event.start_date).strftime('%d %B %Y'),
+        'name_position': event.certificate_name_position,
+    }
+
+
+@lru_cache(maxsize=16)
+def get_font(size):
+    from PIL import ImageFont
+
+    return ImageFont.load_default(size=size)
+
+
+def draw_centered(draw, width, y, text, size, fill):
+    font = get_font(size)
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    draw.text(((width - (right - left)) / 2, y - (bottom - top) / 2), text, font=font, fill=fill)
+
+
+def render_certificate(name, template, layout):
+    """PDF bytes of one certificate (runs in a pool process)"""
+    from PIL import Image, ImageDraw
+
+    if template is not None:
+        image = Image.open(io.BytesIO(template)).convert('RGB')
+        draw = ImageDraw.Draw(image)
+        width, height = image.size
+        draw_centered(draw, width, height * layout['name_position'] / 100, name, width // 18, (20, 20, 20))
+    else:
+        image = Image.new('RGB', PAGE_SIZE, 'white')
+        draw = ImageDraw.Draw(image)
+        width, height = image.size
+        margin = width // 30
+        draw.rectangle([margin, margin, width - margin, height - margin], outline=(30, 60, 120), width=8)
+        draw_centered(draw, width, height * 0.22, 'Certificate of Participation', width // 20, (30, 60, 120))
+        draw_centered(draw, width, height * 0.36, 'This is to certify that', width // 45, (60, 60, 60))
+        draw_centered(draw, width, height * layout['name_position'] / 100, name, width // 18, (20, 20, 20))
+        draw_centered(draw, width, height * 0.64, f"participated in {layout['title']}", width // 40, (60, 60, 60))
+        draw_centered(draw, width, height * 0.72, f"held on {layout['date']}", width // 45, (60, 60, 60))
+
+    buffer = io.BytesIO()
+    image.save(buffer, 'PDF', resolution=RESOLUTION)
+    return buffer.getvalue()
+
+
+_worker_template = None
+_worker_layout = None
+
+
+def init_worker(template, layout):
+    global _worker_template, _worker_layout
+    _worker_template, _worker_layout = template, layout
+
+
+def render_in_worker(registration_id, name):
+    return registration_id, render_certificate(name, _worker_template, _worker_layout)
+
+
+def store_certificate(event_id, registration_id, pdf):
+    """Save under the deterministic name, replacing an earlier issue"""
+    from .models import EventRegistration
+
+    storage = EventRegistration._meta.get_field('certificate_file').storage
+    name = certificate_path(event_id, registration_id)
+    if storage.exists(name):
+        storage.delete(name)
+    return storage.save(name, ContentFile(pdf))
+
+
+def mark_issued(stored):
+    """One UPDATE for a chunk of ``{registration_id: file name}``"""
+    from .models import EventRegistration
+
+    if not stored:
+        return
+    EventRegistration.objects.filter(pk__in=list(stored)).update(
+        certificate_file=Case(
+            *[When(pk=registration_id, then=Value(name)) for registration_id, name in stored.items()],
+            output_field=CharField(),
+        ),
+        certificate_issued=True,
+        certificate_generated_at=timezone.now(),
+    )
+
+
+def issue_certificate(registration):
+    """Render and store a single certificate in-process"""
+    event = registration.event
+    pdf = render_certificate(registration.name, load_template(event), get_layout(event))
+    name = store_certificate(event.pk, registration.pk, pdf)
+    mark_issued({registration.pk: name})
+    registration.refresh_from_db(fields=['certificate_file', 'certificate_issued', 'certificate_generated_at'])
+    return registration
+
+
+def eligible_registrations(event_id):
+    from .models import EventRegistration
+
+    return EventRegistration.objects.filter(event_id=event_id, status='confirmed', attended=True)
+
+
+def pending_registrations(run):
+    registrations = eligible_registrations(run.event_id)
+    if run.reissue:
+        return registrations.filter(
+            Q(certificate_generated_at__isnull=True) | Q(certificate_generated_at__lt=run.created_at)
+        )
+    return registrations.filter(certificate_generated_at__isnull=True)
+
+
+def start_run(event, user=None, reissue=False):
+    """The event's unfinished run (a failed one is queued again), or a new one; returns ``(run, created)``"""
+    from .models import CertificateRun
+
+    active = CertificateRun.objects.filter(event=event, status__in=['pending', 'running', 'failed']).first()
+    if active is not None:
+        if active.status == 'failed':
+            active.status = 'pending'
+            active.save(update_fields=['status'])
+        return active, False
+    run = CertificateRun.objects.create(event=event, reissue=reissue, created_by=user)
+    run.total = pending_registrations(run).count()
+    run.save(update_fields=['total'])
+    return run, True
+
+
+def claimable():
+    """Runs that are queued, or held by a worker that stopped heartbeating"""
+    now = timezone.now()
+    return Q(status='pending') | Q(status='running', locked_at__lt=now - LOCK_TIMEOUT)
+
+
+def claim_run(run_id, worker_id):
+    """Atomically take a run; resuming resizes it to what is left"""
+    from .models import CertificateRun
+
+    now = timezone.now()
+    claimed = CertificateRun.objects.filter(claimable(), pk=run_id).update(
+        status='running', locked_by=worker_id, locked_at=now, started_at=Coalesce('started_at', Value(now))
+    )
+    if not claimed:
+        return None
+    run = CertificateRun.objects.select_related('event').get(pk=run_id)
+    run.total = run.generated + pending_registrations(run).count()
+    run.failed = 0
+    run.last_error = ''
+    run.save(update_fields=['total', 'failed', 'last_error'])
+    return run
+
+
+def generate(run, workers=None, chunk_size=CHUNK_SIZE, log=None):
+    """Render every pending certificate of a claimed run; returns the run"""
+    from .models import CertificateRun
+
+    workers = workers or get_worker_count()
+    template, layout = load_template(run.event), get_layout(run.event)
+    last_pk = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(template, layout)) as pool, \
+                ThreadPoolExecutor(max_workers=STORE_THREADS) as store_pool:
+            while True:
+                close_old_connections()
+                rows = list(
+                    pending_registrations(run).filter(pk__gt=last_pk).order_by('pk').values_list('pk', 'name')[:chunk_size]
+                )
+                if not rows:
+                    break
+                last_pk = rows[-1][0]
+
+                errors = []
+                renders = [pool.submit(render_in_worker, registration_id, name) for registration_id, name in rows]
+                saves = {}
+                for registration_id, future in zip((row[0] for row in rows), renders):
+                    try:
+                        _, pdf = future.result()
+                    except Exception as e:
+                        errors.append(f'Registration {registration_id}: {e}')
+                        continue
+                    saves[registration_id] = store_pool.submit(store_certificate, run.event_id, registration_id, pdf)
+
+                stored = {}
+                for registration_id, future in saves.items():
+                    try:
+                        stored[registration_id] = future.result()
+                    except Exception as e:
+                        errors.append(f'Registration {registration_id}: {e}')
+                mark_issued(stored)
+
+                # Progress doubles as the heartbeat that keeps the claim
+                CertificateRun.objects.filter(pk=run.pk).update(
+                    generated=F('generated') + len(stored),
+                    failed=F('failed') + len(errors),
+                    last_error=errors[-1][:2000] if errors else F('last_error'),
+                    locked_at=timezone.now(),
+                )
+                if log:
+                    log(len(stored), len(errors))
+    except KeyboardInterrupt:
+        # Stopped by hand: leave it queued so the next worker resumes it
+        CertificateRun.objects.filter(pk=run.pk).update(status='pending', locked_by='')
+        raise
+    except Exception as e:
+        CertificateRun.objects.filter(pk=run.pk).update(status='failed', last_error=str(e)[:2000], locked_by='')
+        raise
+
+    CertificateRun.objects.filter(pk=run.pk).update(status='done', finished_at=timezone.now(), locked_by='')
+    run.refresh_from_db()
+    return run
+
+
+def run_pending(workers=None, chunk_size=CHUNK_SIZE, log=None):
+    """Process every claimable run, oldest first; returns the finished runs"""
+    from .models import CertificateRun
+
+    worker_id = f'{socket.gethostname()}:{os.getpid()}'
+    finished = []
+    for run_id in CertificateRun.objects.filter(claimable()).order_by('created_at').values_list('pk', flat=True):
+        run = claim_run(run_id, worker_id)
+        if run is not None:
+            finished.append(generate(run, workers=workers, chunk_size=chunk_size, log=log))
+    return finished
@@ -0,0 +1,314 @@
+"""
+QR-code check-in for event attendance.
+
+Every confirmed registration gets a ticket token, ``"<event>.<registration>"``
+signed with the project's SECRET_KEY (``django.core.signing``), which the
+frontend renders as a QR code. Scanning at the gate verifies the signature,
+reads the registration's status by primary key (cancelled and waitlisted
+tickets are turned away) and queues the scan as a ``CheckInScan`` row.
+
+The scan row is the durable queue: it is committed before the gate is told
+``checked_in``, so a worker that dies or is recycled loses nothing, and its
+one-per-registration constraint answers repeat scans from any worker.
+Attendance itself is written in batches (one ``UPDATE`` per flush, counters
+kept in step through ``events.counts``) from every queued scan, whichever
+worker took it. A worker flushes after ``FLUSH_THRESHOLD`` of its own scans,
+on its first scan after ``FLUSH_INTERVAL`` seconds and at exit; ``python
+manage.py flush_check_ins`` writes whatever is left.
+
+Scanner devices that lost connectivity upload their queued scans with
+``sync_scans()``, which is written through immediately and reports a result
+per scan.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+logger = logging.getLogger(__name__)
+
+SALT = 'events.checkin'
+DEFAULTS = {
+    'FLUSH_THRESHOLD': 50,
+    'FLUSH_INTERVAL': 5,
+    'FLUSH_BATCH_SIZE': 1000,
+}
+# Scan statuses that must not be let in, with the reason shown at the gate
+REJECTED = {
+    'not_registered': 'Registration was cancelled',
+    'not_confirmed': 'Registration is on the waitlist',
+}
+
+
+class InvalidTicket(Exception):
+    pass
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'EVENTS_CHECKIN', {}))
+    return config
+
+
+def make_token(registration):
+    return signing.Signer(salt=SALT).sign(f'{registration.event_id}.{registration.pk}')
+
+
+def read_token(token):
+    """``(event_id, registration_id)`` from a scanned token; raises InvalidTicket"""
+    try:
+        event_id, registration_id = signing.Signer(salt=SALT).unsign(str(token).strip()).split('.')
+        return int(event_id), int(registration_id)
+    except (signing.BadSignature, ValueError):
+        raise InvalidTicket('Invalid ticket')
+
+
+def record_attendance(registration_ids):
+    """Mark confirmed registrations as attended in one batch; returns rows updated"""
+    from .counts import update_registrations
+    from .models import EventRegistration
+
+    if not registration_ids:
+        return 0
+    return update_registrations(
+        EventRegistration.objects.filter(pk__in=registration_ids, status='confirmed', attended=False),
+        attended=True,
+        updated_at=timezone.now(),
+    )
+
+
+def write_queued(limit):
+    """Write the attendance of up to ``limit`` queued scans; returns ``(scans, recorded)``"""
+    from .models import CheckInScan
+
+    with transaction.atomic():
+        # Workers flushing at the same time take disjoint batches
+        scans = list(
+            CheckInScan.objects.select_for_update(skip_locked=True)
+            .filter(processed_at__isnull=True)
+            .values_list('pk', 'registration_id')[:limit]
+        )
+        if not scans:
+            return 0, 0
+        recorded = record_attendance([registration_id for _, registration_id in scans])
+        CheckInScan.objects.filter(pk__in=[pk for pk, _ in scans]).update(processed_at=timezone.now())
+    return len(scans), recorded
+
+
+class CheckInFlusher:
+    """Decides when this worker writes the queued scans, and counts what it did"""
+
+    def __init__(self, config):
+        self.config = config
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._since_flush = 0
+        self._last_flush = time.monotonic()
+        self.metrics = {
+            'scans': 0,
+            'repeat_scans': 0,
+            'invalid_scans': 0,
+            'rejected_scans': 0,
+            'flushes': 0,
+            'recorded': 0,
+            'last_flush_at': None,
+            'last_flush_duration': 0.0,
+        }
+
+    def count(self, metric):
+        with self._lock:
+            self.metrics[metric] += 1
+
+    def scanned(self):
+        with self._lock:
+            self.metrics['scans'] += 1
+            self._since_flush += 1
+        if self.should_flush():
+            self.flush()
+
+    def should_flush(self):
+        if self._since_flush >= self.config['FLUSH_THRESHOLD']:
+            return True
+        return self._since_flush and time.monotonic() - self._last_flush >= self.config['FLUSH_INTERVAL']
+
+    def flush(self):
+        """Write every queued scan in batches; returns registrations marked attended"""
+        # Only one thread per worker flushes at a time; the scans stay queued meanwhile
+        if not self._flush_lock.acquire(blocking=False):
+            return 0
+        try:
+            with self._lock:
+                self._since_flush = 0
+                self._last_flush = time.monotonic()
+            started = time.monotonic()
+            total = 0
+            try:
+                while True:
+                    scans, recorded = write_queued(self.config['FLUSH_BATCH_SIZE'])
+                    total += recorded
+                    if scans < self.config['FLUSH_BATCH_SIZE']:
+                        break
+            except Exception:
+                # The scans are still queued; the next flush retries them
+                logger.exception('Failed to record event check-ins')
+            with self._lock:
+                self.metrics['flushes'] += 1
+                self.metrics['recorded'] += total
+                self.metrics['last_flush_at'] = timezone.now()
+                self.metrics['last_flush_duration'] = round(time.monotonic() - started, 4)
+            return total
+        finally:
+            self._flush_lock.release()
+
+    def stats(self):
+        from .models import CheckInScan
+
+        with self._lock:
+            metrics = dict(self.metrics)
+        oldest = (
+            CheckInScan.objects.filter(processed_at__isnull=True)
+            .order_by('scanned_at').values_list('scanned_at', flat=True).first()
+        )
+        return {
+            'pending_check_ins': CheckInScan.objects.filter(processed_at__isnull=True).count(),
+            'pending_age': round((timezone.now() - oldest).total_seconds(), 4) if oldest else 0.0,
+            **metrics,
+        }
+
+
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def get_flusher():
+    global _flusher
+    if _flusher is None:
+        with _flusher_lock:
+            if _flusher is None:
+                _flusher = CheckInFlusher(get_config())
+                atexit.register(_flusher.flush)
+    return _flusher
+
+
+def check_in(token, event_id=None):
+    """
+    Verify a scanned ticket and queue its attendance write. Returns
+    ``{status, registration_id, event_id}`` where status is ``checked_in``,
+    ``already_checked_in``, ``not_registered`` (cancelled) or
+    ``not_confirmed`` (waitlisted); raises InvalidTicket.
+    """
+    from .models import CheckInScan, EventRegistration
+
+    flusher = get_flusher()
+    try:
+        ticket_event_id, registration_id = read_token(token)
+        if event_id is not None and ticket_event_id != int(event_id):
+            raise InvalidTicket('Ticket is for a different event')
+    except InvalidTicket:
+        flusher.count('invalid_scans')
+        raise
+
+    result = {'registration_id': registration_id, 'event_id': ticket_event_id}
+    registration = (
+        EventRegistration.objects.filter(pk=registration_id, event_id=ticket_event_id)
+        .values('status', 'attended').first()
+    )
+    if registration is None or registration['status'] != 'confirmed':
+        flusher.count('rejected_scans')
+        return {**result, 'status': 'not_registered' if registration is None else 'not_confirmed'}
+    if registration['attended']:
+        # Marked attended some other way (admin, offline sync)
+        flusher.count('repeat_scans')
+        return {**result, 'status': 'already_checked_in', 'first_scanned_at': None}
+
+    scanned_at = timezone.now()
+    try:
+        with transaction.atomic():
+            CheckInScan.objects.create(registration_id=registration_id, scanned_at=scanned_at)
+    except IntegrityError:
+        # Scanned before (by any worker), or deleted since the status was read
+        first_scanned_at = (
+            CheckInScan.objects.filter(registration_id=registration_id).values_list('scanned_at', flat=True).first()
+        )
+        if first_scanned_at is None:
+            flusher.count('rejected_scans')
+            return {**result, 'status': 'not_registered'}
+        flusher.count('repeat_scans')
+        return {**result, 'status': 'already_checked_in', 'first_scanned_at': first_scanned_at}
+
+    flusher.scanned()
+    return {**result, 'status': 'checked_in', 'first_scanned_at': scanned_at}
+
+
+def sync_scans(scans, event_id=None):
+    """
+    Write through a batch of offline scans (``[{token, scanned_at}]``) and
+    return one result per scan, in order: ``checked_in``,
+    ``already_checked_in``, ``not_registered`` or ``invalid``.
+    """
+    from .models import CheckInScan, EventRegistration
+
+    results = []
+    tickets = {}
+    for index, scan in enumerate(scans):
+        token = scan.get('token') if isinstance(scan, dict) else scan
+        try:
+            ticket_event_id, registration_id = read_token(token)
+            if event_id is not None and ticket_event_id != int(event_id):
+                raise InvalidTicket('Ticket is for a different event')
+        except InvalidTicket as e:
+            results.append({'index': index, 'status': 'invalid', 'error': str(e)})
+            continue
+        scanned_at = parse_datetime(str(scan.get('scanned_at') or '')) if isinstance(scan, dict) else None
+        results.append({'index': index, 'registration_id': registration_id, 'event_id': ticket_event_id})
+        tickets.setdefault(registration_id, scanned_at or timezone.now())
+
+    # One read for the whole batch: which tickets are still confirmed, and already attended or scanned
+    attended = dict(
+        EventRegistration.objects.filter(pk__in=list(tickets), status='confirmed').values_list('pk', 'attended')
+    )
+    queued = set(CheckInScan.objects.filter(registration_id__in=list(attended)).values_list('registration_id', flat=True))
+    new = {
+        registration_id for registration_id, was_attended in attended.items()
+        if not was_attended and registration_id not in queued
+    }
+    now = timezone.now()
+    with transaction.atomic():
+        record_attendance(new)
+        # Later live scans of these tickets are reported as repeats
+        CheckInScan.objects.bulk_create(
+            [
+                CheckInScan(registration_id=registration_id, scanned_at=tickets[registration_id], processed_at=now)
+                for registration_id in attended if registration_id not in queued
+            ],
+            ignore_conflicts=True,
+        )
+
+    counted = set()
+    for result in results:
+        registration_id = result.get('registration_id')
+        if registration_id is None:
+            continue
+        if registration_id not in attended:
+            result['status'] = 'not_registered'
+        elif registration_id in new and registration_id not in counted:
+            result['status'] = 'checked_in'
+            counted.add(registration_id)
+        else:
+            result['status'] = 'already_checked_in'
+    return results
+
+
+def flush():
+    """Write queued check-ins now; returns registrations marked attended"""
+    return get_flusher().flush()
+
+
+def get_stats():
+    return get_flusher().stats()
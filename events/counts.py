@@ -0,0 +1,173 @@
+"""
+Denormalized registration counters on ``Event``.
+
+``registration_count`` (confirmed registrations), ``attended_count`` and
+``paid_count`` are kept in step with ``EventRegistration`` rows by applying
+deltas with ``F()`` updates in the same transaction as the change. Every
+writer locks the ``Event`` row before touching its registrations (the same
+order the registration engine uses), so counters never race and writers
+never deadlock. ``Event.save()`` leaves the counter columns out of its
+UPDATE, so editing an event never writes back counts it loaded earlier.
+Queryset-level changes must go through
+``update_registrations`` / ``delete_registrations``;
+``python manage.py reconcile_event_counts`` repairs any drift.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from . import analytics, caching
+
+# counter column -> (registration field, value that counts)
+COUNTERS = {
+    'registration_count': ('status', 'confirmed'),
+    'attended_count': ('attended', True),
+    'paid_count': ('payment_status', 'paid'),
+}
+TRACKED_FIELDS = [field for field, _ in COUNTERS.values()]
+
+
+def contribution(values):
+    """Which counters a registration with these field values adds to"""
+    if values is None:
+        return {counter: 0 for counter in COUNTERS}
+    return {counter: int(values[field] == value) for counter, (field, value) in COUNTERS.items()}
+
+
+def diff(before, after):
+    old, new = contribution(before), contribution(after)
+    return {counter: new[counter] - old[counter] for counter in COUNTERS}
+
+
+def apply_deltas(event_id, deltas):
+    changes = {counter: F(counter) + delta for counter, delta in deltas.items() if delta}
+    if changes:
+        from .models import Event
+
+        Event.objects.filter(pk=event_id).update(**changes)
+        # Bulk updates bypass signals; cached event lists and analytics show these counts
+        transaction.on_commit(caching.invalidate)
+        if 'attended_count' in changes:
+            analytics.invalidate_on_commit(event_id)
+
+
+def lock_events(event_ids):
+    from .models import Event
+
+    return list(Event.objects.select_for_update().filter(pk__in=event_ids).order_by('pk').values_list('pk', flat=True))
+
+
+def save_registration(registration, save):
+    """Run ``save()`` for a registration and apply its counter deltas atomically"""
+    from .models import EventRegistration
+
+    with transaction.atomic():
+        lock_events([registration.event_id])
+        before = None
+        if registration.pk:
+            before = EventRegistration.objects.select_for_update().filter(pk=registration.pk).values(
+                'event_id', *TRACKED_FIELDS
+            ).first()
+        save()
+        after = {field: getattr(registration, field) for field in TRACKED_FIELDS}
+
+        if before is not None and before['event_id'] != registration.event_id:
+            # Moved to another event
+            lock_events([before['event_id']])
+            apply_deltas(before['event_id'], diff(before, None))
+            before = None
+        apply_deltas(registration.event_id, diff(before, after))
+
+
+def delete_registration(registration, delete):
+    from .models import EventRegistration
+
+    with transaction.atomic():
+        lock_events([registration.event_id])
+        before = EventRegistration.objects.select_for_update().filter(pk=registration.pk).values(
+            *TRACKED_FIELDS
+        ).first()
+        result = delete()
+        apply_deltas(registration.event_id, diff(before, None))
+    return result
+
+
+def update_registrations(queryset, **changes):
+    """``queryset.update(**changes)`` that keeps the event counters in step; returns rows updated"""
+    from .models import EventRegistration
+
+    with transaction.atomic():
+        lock_events(set(queryset.values_list('event_id', flat=True)))
+        rows = list(queryset.select_for_update().values('id', 'event_id', *TRACKED_FIELDS))
+        if not rows:
+            return 0
+
+        deltas = defaultdict(lambda: defaultdict(int))
+        for row in rows:
+            for counter, delta in diff(row, {**row, **changes}).items():
+                deltas[row['event_id']][counter] += delta
+
+        EventRegistration.objects.filter(pk__in=[row['id'] for row in rows]).update(**changes)
+        for event_id, event_deltas in deltas.items():
+            apply_deltas(event_id, event_deltas)
+    return len(rows)
+
+
+def delete_registrations(queryset):
+    """``queryset.delete()`` that keeps the event counters in step; returns rows deleted"""
+    from .models import EventRegistration
+
+    with transaction.atomic():
+        lock_events(set(queryset.values_list('event_id', flat=True)))
+        rows = list(queryset.select_for_update().values('id', 'event_id', *TRACKED_FIELDS))
+        deltas = defaultdict(lambda: defaultdict(int))
+        for row in rows:
+            for counter, delta in diff(row, None).items():
+                deltas[row['event_id']][counter] += delta
+
+        EventRegistration.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        for event_id, event_deltas in deltas.items():
+            apply_deltas(event_id, event_deltas)
+    return len(rows)
+
+
+def actual_counts():
+    """Counter values recomputed from EventRegistration, as annotations on Event"""
+    return {
+        f'actual_{counter}': Count('registrations', filter=Q(**{f'registrations__{field}': value}))
+        for counter, (field, value) in COUNTERS.items()
+    }
+
+
+def reconcile(event_ids=None, dry_run=False):
+    """Recompute counters from the registrations; returns ``[(event_id, {counter: (stored, actual)})]``"""
+    from .models import Event
+
+    events = Event.objects.all()
+    if event_ids:
+        events = events.filter(pk__in=event_ids)
+
+    drift = []
+    rows = events.order_by('pk').annotate(**actual_counts()).values('pk', *COUNTERS, *[f'actual_{c}' for c in COUNTERS])
+    for row in rows.iterator(chunk_size=500):
+        wrong = {
+            counter: (row[counter], row[f'actual_{counter}'])
+            for counter in COUNTERS
+            if row[counter] != row[f'actual_{counter}']
+        }
+        if wrong:
+            drift.append((row['pk'], wrong))
+
+    if not dry_run:
+        for event_id, wrong in drift:
+            with transaction.atomic():
+                # Recount under the lock so concurrent writers are not overwritten
+                lock_events([event_id])
+                actual = Event.objects.filter(pk=event_id).annotate(**actual_counts()).values(
+                    *[f'actual_{c}' for c in COUNTERS]
+                ).first()
+                Event.objects.filter(pk=event_id).update(
+                    **{counter: actual[f'actual_{counter}'] for counter in COUNTERS}
+                )
+    return drift
@@ -0,0 +1,188 @@
+"""
+iCalendar (``.ics``) feeds: every published event, one event type, or a
+single event with its schedule sessions and speakers.
+
+Calendar clients poll these feeds constantly, so each feed has a validator,
+the latest ``updated_at`` plus the row count, taken with one aggregate query.
+It becomes the ``ETag`` and ``Last-Modified`` of the response, which lets
+unchanged polls be answered with 304 Not Modified without building anything.
+Rendered feeds are cached under their validator, so any event edit gives new
+cache keys and stale entries just expire. Building a feed on a cache miss is
+one more query; the per-event feed joins the schedule and speakers into the
+event rows.
+
+Schedule and speaker changes touch their event's ``updated_at`` (see
+``events.signals``) so that they move the validator too.
+"""
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db.models import Count, F, Max
+from django.utils import timezone
+
+CACHE_TIMEOUT = 60 * 60 * 24
+MAX_AGE = 300  # seconds clients may reuse a feed before revalidating
+DESCRIPTION_LENGTH = 2000
+PRODID = '-//EESA//Events//EN'
+UID_DOMAIN = 'eesa'
+
+EVENT_FIELDS = [
+    'id', 'title', 'description', 'event_type', 'status', 'start_date', 'end_date',
+    'location', 'venue', 'address', 'is_online', 'meeting_link', 'updated_at',
+]
+SESSION_FIELDS = {
+    'schedule__id': 'session_id',
+    'schedule__title': 'session_title',
+    'schedule__description': 'session_description',
+    'schedule__start_time': 'session_start',
+    'schedule__end_time': 'session_end',
+    'schedule__venue_details': 'session_venue',
+    'schedule__speaker__name': 'speaker_name',
+    'schedule__speaker__title': 'speaker_title',
+    'schedule__speaker__organization': 'speaker_organization',
+}
+
+
+def published_events():
+    from .models import Event
+
+    return Event.objects.filter(status='published', is_active=True)
+
+
+def get_validator(queryset):
+    """``(version, last_modified)`` of the rows in ``queryset``; an empty feed has no Last-Modified"""
+    state = queryset.order_by().aggregate(last_modified=Max('updated_at'), count=Count('id'))
+    if state['last_modified'] is None:
+        return 'empty', None
+    version = f"{state['last_modified'].timestamp():.6f}-{state['count']}"
+    return hashlib.md5(version.encode()).hexdigest(), state['last_modified']
+
+
+def escape(text):
+    """TEXT value escaping from RFC 5545 section 3.3.11"""
+    return (
+        str(text).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n').replace('\r', '\\n')
+    )
+
+
+def fold(line):
+    """Split a content line into 75-octet pieces without breaking UTF-8 sequences"""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line
+    pieces, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Continuation bytes look like 0b10xxxxxx; back up to a character boundary
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        pieces.append(encoded[start:end].decode())
+        start, limit = end, 74  # continuation lines start with a space
+    return '\r\n '.join(pieces)
+
+
+def format_datetime(value):
+    return value.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def event_location(row):
+    if row['is_online']:
+        return row['meeting_link'] or 'Online'
+    return ', '.join(part for part in [row['venue'], row['location'], row['address']] if part)
+
+
+def event_component(row):
+    lines = [
+        'BEGIN:VEVENT',
+        f"UID:event-{row['id']}@{UID_DOMAIN}",
+        f"DTSTAMP:{format_datetime(row['updated_at'])}",
+        f"LAST-MODIFIED:{format_datetime(row['updated_at'])}",
+        f"DTSTART:{format_datetime(row['start_date'])}",
+        f"DTEND:{format_datetime(row['end_date'])}",
+        f"SUMMARY:{escape(row['title'])}",
+        f"DESCRIPTION:{escape(row['description'][:DESCRIPTION_LENGTH])}",
+        f"LOCATION:{escape(event_location(row))}",
+        f"CATEGORIES:{escape(row['event_type'])}",
+        'STATUS:CONFIRMED',
+    ]
+    if row['is_online'] and row['meeting_link']:
+        lines.append(f"URL:{row['meeting_link']}")
+    lines.append('END:VEVENT')
+    return lines
+
+
+def session_datetime(event_start, time):
+    """Schedule times have no date; sessions fall on the event's (local) start day"""
+    day = timezone.localtime(event_start).date()
+    return timezone.make_aware(datetime.combine(day, time))
+
+
+def session_component(event, row):
+    speaker = ''
+    if row['speaker_name']:
+        details = ', '.join(part for part in [row['speaker_title'], row['speaker_organization']] if part)
+        speaker = f"{row['speaker_name']} ({details})" if details else row['speaker_name']
+    description = '\n\n'.join(part for part in [
+        f'Speaker: {speaker}' if speaker else '',
+        row['session_description'] or '',
+        f"Part of {event['title']}",
+    ] if part)
+    location = row['session_venue'] or event_location(event)
+
+    return [
+        'BEGIN:VEVENT',
+        f"UID:session-{row['session_id']}@{UID_DOMAIN}",
+        f"DTSTAMP:{format_datetime(event['updated_at'])}",
+        f"DTSTART:{format_datetime(session_datetime(event['start_date'], row['session_start']))}",
+        f"DTEND:{format_datetime(session_datetime(event['start_date'], row['session_end']))}",
+        f"SUMMARY:{escape(row['session_title'])}",
+        f"DESCRIPTION:{escape(description[:DESCRIPTION_LENGTH])}",
+        f"LOCATION:{escape(location)}",
+        f"RELATED-TO:event-{event['id']}@{UID_DOMAIN}",
+        'STATUS:CONFIRMED',
+        'END:VEVENT',
+    ]
+
+
+def render_calendar(name, components):
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{escape(name)}',
+    ]
+    for component in components:
+        lines.extend(component)
+    lines.append('END:VCALENDAR')
+    return '\r\n'.join(fold(line) for line in lines) + '\r\n'
+
+
+def build_events_feed(queryset, name):
+    rows = queryset.order_by('start_date').values(*EVENT_FIELDS)
+    return render_calendar(name, (event_component(row) for row in rows))
+
+
+def build_event_feed(queryset):
+    """One event plus its sessions: a single LEFT JOIN, one row per session"""
+    rows = list(
+        queryset.order_by('schedule__start_time', 'schedule__id')
+        .values(*EVENT_FIELDS, **{alias: F(field) for field, alias in SESSION_FIELDS.items()})
+    )
+    event = rows[0]
+    components = [event_component(event)]
+    components.extend(session_component(event, row) for row in rows if row['session_id'] is not None)
+    return render_calendar(event['title'], components)
+
+
+def get_body(scope, version, build):
+    """The rendered feed for this version; ``build`` only runs on a cache miss"""
+    key = f'events:ics:{scope}:{version}'
+    body = cache.get(key)
+    if body is None:
+        body = build()
+        cache.set(key, body, CACHE_TIMEOUT)
+    return body
@@ -0,0 +1,93 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from events import checkin, views
+from events.models import Event, EventRegistration
+
+User = get_user_model()
+
+TARGET_RATE = 50
+
+
+class Command(BaseCommand):
+    help = 'Measure gate check-in throughput (scans/second per worker) against per-scan save()'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scans',
+            type=int,
+            default=1000,
+            help='Number of simulated scans per run (one registration each)',
+        )
+
+    def handle(self, *args, **options):
+        scans = options['scans']
+
+        self.stdout.write(f'🚀 Benchmarking {scans} check-ins per run...')
+
+        # Everything runs in a transaction that is rolled back, so the
+        # benchmark leaves no events, registrations or attendance behind.
+        with transaction.atomic():
+            staff = User.objects.create(username=f'checkin-benchmark-{time.time_ns()}', is_staff=True)
+            legacy_rate = self.run_legacy(self.make_registrations(staff, scans))
+            buffered_rate = self.run_buffered(self.make_registrations(staff, scans))
+            endpoint_rate = self.run_endpoint(self.make_registrations(staff, scans), staff)
+            transaction.set_rollback(True)
+
+        self.stdout.write(f'🐢 get() + save() per scan:   {legacy_rate:,.0f} scans/s')
+        self.stdout.write(f'⚡ queued scan + batching:    {buffered_rate:,.0f} scans/s')
+        self.stdout.write(f'🌐 POST /check-in/ end to end: {endpoint_rate:,.0f} scans/s')
+        if endpoint_rate >= TARGET_RATE:
+            self.stdout.write(self.style.SUCCESS(f'✅ Meets the {TARGET_RATE} scans/s per worker target'))
+        else:
+            self.stdout.write(self.style.WARNING(f'⚠️  Below the {TARGET_RATE} scans/s per worker target'))
+
+    def make_registrations(self, staff, count):
+        now = timezone.now()
+        event = Event.objects.create(
+            title='Check-in benchmark', description='', event_type='cultural', status='published',
+            start_date=now, end_date=now + timedelta(hours=8), location='Gate', created_by=staff,
+        )
+        EventRegistration.objects.bulk_create([
+            EventRegistration(event=event, name=f'Guest {i}', email=f'guest{i}@example.com', mobile_number='9999999999')
+            for i in range(count)
+        ])
+        return list(EventRegistration.objects.filter(event=event).order_by('pk'))
+
+    def run_legacy(self, registrations):
+        """The original mark_attended path: load the row and save() it on every scan"""
+        started = time.perf_counter()
+        for registration in registrations:
+            registration = EventRegistration.objects.get(pk=registration.pk)
+            registration.attended = True
+            registration.save()
+        return len(registrations) / (time.perf_counter() - started)
+
+    def run_buffered(self, registrations):
+        """Ticket verification, queued scans and batched writes, including the final flush"""
+        tokens = [checkin.make_token(registration) for registration in registrations]
+        checkin.flush()
+        started = time.perf_counter()
+        for token in tokens:
+            checkin.check_in(token)
+        checkin.flush()
+        return len(tokens) / (time.perf_counter() - started)
+
+    def run_endpoint(self, registrations, staff):
+        """Full request cycle through the check-in view, as a gate scanner would hit it"""
+        factory = APIRequestFactory()
+        tokens = [checkin.make_token(registration) for registration in registrations]
+        checkin.flush()
+        started = time.perf_counter()
+        for token in tokens:
+            request = factory.post('/api/events/check-in/', {'token': token}, format='json')
+            force_authenticate(request, user=staff)
+            views.check_in(request)
+        checkin.flush()
+        return len(tokens) / (time.perf_counter() - started)
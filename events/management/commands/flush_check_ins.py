@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from events import checkin
+
+
+class Command(BaseCommand):
+    help = 'Write the attendance of queued QR check-in scans (run from cron)'
+
+    def handle(self, *args, **options):
+        recorded = checkin.flush()
+        self.stdout.write(self.style.SUCCESS(f'✅ Marked {recorded} registrations as attended'))
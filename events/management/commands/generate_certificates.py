@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from events import certificates
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Generate participation certificate PDFs for attended registrations (resumes interrupted runs)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='*', type=int, help='Queue a run for these events first (default: only process queued runs)')
+        parser.add_argument('--reissue', action='store_true', help='Regenerate certificates that were already issued')
+        parser.add_argument('--workers', type=int, default=None, help='Rendering processes (default EVENTS_CERTIFICATE_WORKERS)')
+        parser.add_argument('--chunk-size', type=int, default=certificates.CHUNK_SIZE, help='Certificates committed per batch')
+
+    def handle(self, *args, **options):
+        events = Event.objects.in_bulk(options['event_ids'])
+        missing = set(options['event_ids']) - set(events)
+        if missing:
+            raise CommandError(f'Unknown event ids: {", ".join(map(str, sorted(missing)))}')
+
+        for event in events.values():
+            run, created = certificates.start_run(event, reissue=options['reissue'])
+            action = 'Queued' if created else 'Resuming'
+            self.stdout.write(f'📥 {action} run {run.pk} for {event.title} ({run.total} certificates)')
+
+        workers = options['workers'] or certificates.get_worker_count()
+        self.stdout.write(f'⚙️  Generating certificates with {workers} workers...')
+
+        def log(generated, failed):
+            self.stdout.write(f'   generated {generated}, failed {failed}')
+
+        try:
+            runs = certificates.run_pending(workers=workers, chunk_size=options['chunk_size'], log=log)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('⚠️  Stopped; run the command again to resume'))
+            return
+
+        for run in runs:
+            message = f'✅ {run.event.title}: {run.generated}/{run.total} certificates'
+            if run.failed:
+                self.stdout.write(self.style.WARNING(f'{message} ({run.failed} failed, last error: {run.last_error})'))
+            else:
+                self.stdout.write(self.style.SUCCESS(message))
+        if not runs:
+            self.stdout.write('💤 No certificate runs waiting')
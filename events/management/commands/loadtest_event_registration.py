@@ -0,0 +1,96 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.utils import timezone
+
+from events.models import Event
+from events.registration import RegistrationError, register_participant
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Fire concurrent registrations at a throwaway event and verify it is never overbooked'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--registrations', type=int, default=500, help='Number of distinct registrants')
+        parser.add_argument('--threads', type=int, default=50, help='Concurrent database connections')
+        parser.add_argument('--capacity', type=int, default=100, help='max_participants of the test event')
+        parser.add_argument('--waitlist', action='store_true', help='Enable the waitlist on the test event')
+
+    def handle(self, *args, **options):
+        creator = User.objects.filter(is_staff=True).first() or User.objects.first()
+        if creator is None:
+            raise CommandError('Create a user first; the test event needs a creator')
+        if connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING(
+                '⚠️  SQLite serializes writers; expect "database is locked" errors. Run against PostgreSQL for a real load test.'
+            ))
+        
+        now = timezone.now()
+        event = Event.objects.create(
+            title=f'Load test {uuid.uuid4().hex[:8]}',
+            event_type='other',
+            status='published',
+            start_date=now + timedelta(days=1),
+            end_date=now + timedelta(days=1, hours=1),
+            location='Load test',
+            max_participants=options['capacity'],
+            waitlist_enabled=options['waitlist'],
+            created_by=creator,
+        )
+        total = options['registrations']
+        self.stdout.write(
+            f'🚀 {total} registrations (each submitted twice with the same Idempotency-Key) '
+            f'on {options["threads"]} threads, capacity {options["capacity"]}...'
+        )
+        
+        def attempt(i):
+            data = {'name': f'Load {i}', 'email': f'load{i}@example.com', 'mobile_number': '9876543210'}
+            key = f'load-{i}'
+            outcomes = []
+            try:
+                for _ in range(2):
+                    try:
+                        _, created = register_participant(event.pk, data, key)
+                        outcomes.append('created' if created else 'replayed')
+                    except RegistrationError:
+                        outcomes.append('rejected')
+                    except Exception:
+                        outcomes.append('error')
+            finally:
+                connections.close_all()
+            return outcomes
+        
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+                results = [outcome for outcomes in pool.map(attempt, range(total)) for outcome in outcomes]
+            elapsed = time.perf_counter() - started
+            
+            confirmed = event.registrations.filter(status='confirmed').count()
+            waitlisted = event.registrations.filter(status='waitlisted').count()
+            rows = event.registrations.count()
+            
+            self.stdout.write(f'⏱️  {len(results)} requests in {elapsed:.2f}s ({len(results) / elapsed:,.0f}/s)')
+            self.stdout.write(
+                f'📊 created {results.count("created")}, replayed {results.count("replayed")}, '
+                f'rejected {results.count("rejected")}, errors {results.count("error")}'
+            )
+            self.stdout.write(f'🎟️  confirmed {confirmed}/{options["capacity"]}, waitlisted {waitlisted}')
+            
+            if confirmed > options['capacity']:
+                raise CommandError(f'Overbooked: {confirmed} confirmed for {options["capacity"]} seats')
+            event.refresh_from_db(fields=['registration_count'])
+            if event.registration_count != confirmed:
+                raise CommandError(f'registration_count is {event.registration_count} but {confirmed} are confirmed')
+            if rows != results.count('created'):
+                raise CommandError(f'{rows} registrations stored but {results.count("created")} reported created')
+            self.stdout.write(self.style.SUCCESS('✅ No overbooking, no duplicate registrations, counters match'))
+        finally:
+            event.delete()
@@ -0,0 +1,31 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from events import notifications
+from events.models import Event
+
+
+class Command(BaseCommand):
+    help = 'Queue reminder emails for published events starting soon (run from cron)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=24, help='Remind about events starting within this many hours')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        events = Event.objects.filter(
+            status='published',
+            is_active=True,
+            start_date__gt=now,
+            start_date__lte=now + timedelta(hours=options['hours']),
+        ).exclude(notifications__kind='reminder')
+        
+        queued = 0
+        for event in events:
+            notification = notifications.queue(event, 'reminder')
+            self.stdout.write(f'   {event.title}: {notification.recipient_count} recipients')
+            queued += 1
+        
+        self.stdout.write(self.style.SUCCESS(f'✅ Queued reminders for {queued} events'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from events import counts
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized registration/attendance/payment counters on events and fix drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('event_ids', nargs='*', type=int, help='Only these events (default: all)')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it')
+
+    def handle(self, *args, **options):
+        self.stdout.write('🔍 Checking event counters...')
+        drift = counts.reconcile(options['event_ids'], dry_run=options['dry_run'])
+        
+        for event_id, wrong in drift:
+            details = ', '.join(f'{counter} {stored} → {actual}' for counter, (stored, actual) in wrong.items())
+            self.stdout.write(f'   event {event_id}: {details}')
+        
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('✅ All event counters are correct'))
+        elif options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'⚠️  {len(drift)} events have drifted (dry run, nothing changed)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✅ Fixed counters on {len(drift)} events'))
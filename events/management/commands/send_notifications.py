@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from events import notifications
+
+
+class Command(BaseCommand):
+    help = 'Run the worker that emails queued event notifications from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help='Exit when the outbox is empty')
+        parser.add_argument('--poll-interval', type=float, default=5, help='Seconds to sleep when the outbox is empty')
+        parser.add_argument('--batch-size', type=int, default=None, help='Deliveries claimed per batch (default EVENTS_NOTIFICATIONS)')
+        parser.add_argument('--rate', type=float, default=None, help='Messages per second (default EVENTS_NOTIFICATIONS)')
+
+    def handle(self, *args, **options):
+        self.stdout.write('📨 Sending event notifications...')
+        
+        def log(sent, failed):
+            self.stdout.write(f'   sent {sent}, failed {failed}')
+        
+        try:
+            totals = notifications.run_worker(
+                once=options['once'],
+                poll_interval=options['poll_interval'],
+                batch_size=options['batch_size'],
+                rate=options['rate'],
+                log=log,
+            )
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('⚠️  Stopped'))
+            return
+        
+        self.stdout.write(self.style.SUCCESS(f'✅ Sent {totals["sent"]} emails ({totals["failed"]} failed)'))
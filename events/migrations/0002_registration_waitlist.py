@@ -0,0 +1,42 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='eventregistration',
+            unique_together={('event', 'email')},
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='waitlist_enabled',
+            field=models.BooleanField(default=False, help_text='Put registrations beyond max_participants on a waitlist'),
+        ),
+        migrations.AddField(
+            model_name='eventregistration',
+            name='idempotency_key',
+            field=models.CharField(blank=True, editable=False, help_text='Client-supplied key so retried submissions return the original registration', max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='eventregistration',
+            name='status',
+            field=models.CharField(choices=[('confirmed', 'Confirmed'), ('waitlisted', 'Waitlisted')], default='confirmed', max_length=20),
+        ),
+        migrations.AlterUniqueTogether(
+            name='eventregistration',
+            unique_together={('event', 'email'), ('event', 'idempotency_key')},
+        ),
+        migrations.AddIndex(
+            model_name='eventregistration',
+            index=models.Index(fields=['event', 'status', 'registered_at'], name='events_even_event_i_aa7239_idx'),
+        ),
+    ]
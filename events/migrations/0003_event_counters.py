@@ -0,0 +1,49 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:04
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_counts(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    EventRegistration = apps.get_model('events', 'EventRegistration')
+
+    def count(**filters):
+        registrations = (
+            EventRegistration.objects.filter(event=OuterRef('pk'), **filters)
+            .order_by().values('event').annotate(total=Count('id')).values('total')
+        )
+        return Coalesce(Subquery(registrations, output_field=IntegerField()), 0)
+
+    Event.objects.update(
+        registration_count=count(status='confirmed'),
+        attended_count=count(attended=True),
+        paid_count=count(payment_status='paid'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0002_registration_waitlist'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='attended_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='paid_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='registration_count',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Confirmed registrations'),
+        ),
+        migrations.RunPython(populate_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:11
+
+import django.db.models.deletion
+import events.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0003_event_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='certificate_name_position',
+            field=models.PositiveSmallIntegerField(default=50, help_text="Vertical position of the participant's name, in percent of the template height"),
+        ),
+        migrations.AddField(
+            model_name='event',
+            name='certificate_template',
+            field=models.ImageField(blank=True, help_text='Background image for participation certificates; leave blank for a plain certificate', null=True, upload_to=events.models.certificate_template_upload_path),
+        ),
+        migrations.AddField(
+            model_name='eventregistration',
+            name='certificate_file',
+            field=models.FileField(blank=True, editable=False, null=True, upload_to='events/certificates/'),
+        ),
+        migrations.AddField(
+            model_name='eventregistration',
+            name='certificate_generated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='CertificateRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=20)),
+                ('reissue', models.BooleanField(default=False, help_text='Regenerate certificates that were already issued')),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('generated', models.PositiveIntegerField(default=0)),
+                ('failed', models.PositiveIntegerField(default=0)),
+                ('last_error', models.TextField(blank=True, default='')),
+                ('locked_by', models.CharField(blank=True, default='', max_length=100)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='certificate_runs', to=settings.AUTH_USER_MODEL)),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='certificate_runs', to='events.event')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['event', 'status'], name='events_cert_event_i_c50ab4_idx')],
+            },
+        ),
+    ]
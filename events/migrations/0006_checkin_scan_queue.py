@@ -0,0 +1,28 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:37
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0005_notification_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckInScan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scanned_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('processed_at', models.DateTimeField(blank=True, null=True)),
+                ('registration', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='check_in_scan', to='events.eventregistration')),
+            ],
+            options={
+                'ordering': ['scanned_at', 'id'],
+                'indexes': [models.Index(fields=['processed_at', 'scanned_at'], name='events_chec_process_7583b2_idx')],
+            },
+        ),
+    ]
@@ -39,6 +39,20 @@ def speaker_profile_upload_path(instance, filename):
     return f'events/speakers/{event_title.replace(" ", "_")}/{safe_name.replace(" ", "_")}{ext}'
 
 
+def certificate_template_upload_path(instance, filename):
+    """Generate upload path for certificate templates"""
+    import os
+    name, ext = os.path.splitext(filename)
+    safe_title = "".join(c for c in instance.title if c.isalnum() or c in (' ', '-', '_')).rstrip()[:20]
+    return f'events/certificate_templates/{safe_title.replace(" ", "_")}{ext}'
+
+
+class EventQuerySet(models.QuerySet):
+    def for_listing(self):
+        """Join the creator for list views (registration counts are columns on Event)"""
+        return self.select_related('created_by')
+
+
 class Event(models.Model):
     """Comprehensive Event management - created and managed by staff"""
     
@@ -84,6 +98,12 @@ class Event(models.Model):
     # Registration Settings
     registration_required = models.BooleanField(default=True)
     max_participants = models.PositiveIntegerField(blank=True, null=True, help_text="Leave blank for unlimited")
+    waitlist_enabled = models.BooleanField(default=False, help_text="Put registrations beyond max_participants on a waitlist")
+    
+    # Denormalized counters, maintained by events.counts
+    registration_count = models.PositiveIntegerField(default=0, editable=False, help_text="Confirmed registrations")
+    attended_count = models.PositiveIntegerField(default=0, editable=False)
+    paid_count = models.PositiveIntegerField(default=0, editable=False)
     
     # Payment Settings
     registration_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0)
@@ -101,6 +121,15 @@ class Event(models.Model):
     banner_image = models.ImageField(upload_to=event_banner_upload_path, blank=True, null=True)
     event_flyer = models.FileField(upload_to=event_flyer_upload_path, blank=True, null=True)
     
+    # Certificates
+    certificate_template = models.ImageField(
+        upload_to=certificate_template_upload_path, blank=True, null=True,
+        help_text="Background image for participation certificates; leave blank for a plain certificate"
+    )
+    certificate_name_position = models.PositiveSmallIntegerField(
+        default=50, help_text="Vertical position of the participant's name, in percent of the template height"
+    )
+    
     # Management
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='created_events')
     is_active = models.BooleanField(default=True)
@@ -109,6 +138,8 @@ class Event(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = EventQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-start_date']
         indexes = [
@@ -120,6 +151,17 @@ class Event(models.Model):
     def __str__(self):
         return f"{self.title} - {self.start_date.strftime('%Y-%m-%d')}"
     
+    def save(self, *args, **kwargs):
+        # The counters only change through events.counts; saving an edited event
+        # must not write back the values it was loaded with
+        if not self._state.adding and not args and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            from .counts import COUNTERS
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in COUNTERS
+            ]
+        super().save(*args, **kwargs)
+    
     @property
     def is_upcoming(self):
         return self.start_date > timezone.now()
@@ -143,15 +185,11 @@ class Event(models.Model):
             return False
         
         if self.max_participants:
-            current_count = self.registrations.count()
-            return current_count < self.max_participants
+            # A full event still takes registrations onto its waitlist
+            return self.registration_count < self.max_participants or self.waitlist_enabled
         
         return self.is_upcoming
     
-    @property
-    def registration_count(self):
-        return self.registrations.count()
-    
     @property
     def spots_remaining(self):
         if not self.max_participants:
@@ -169,8 +207,18 @@ class EventRegistration(models.Model):
         ('refunded', 'Refunded'),
     ]
     
+    STATUS_CHOICES = [
+        ('confirmed', 'Confirmed'),
+        ('waitlisted', 'Waitlisted'),
+    ]
+    
     # Event
     event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='registrations')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='confirmed')
+    idempotency_key = models.CharField(
+        max_length=64, blank=True, null=True, editable=False,
+        help_text="Client-supplied key so retried submissions return the original registration"
+    )
     
     # Personal Information
     name = models.CharField(max_length=200)
@@ -203,6 +251,8 @@ class EventRegistration(models.Model):
     # Attendance Tracking
     attended = models.BooleanField(default=False)
     certificate_issued = models.BooleanField(default=False)
+    certificate_file = models.FileField(upload_to='events/certificates/', blank=True, null=True, editable=False)
+    certificate_generated_at = models.DateTimeField(blank=True, null=True, editable=False)
     
     # Metadata
     registered_at = models.DateTimeField(auto_now_add=True)
@@ -210,7 +260,10 @@ class EventRegistration(models.Model):
     
     class Meta:
         ordering = ['-registered_at']
-        unique_together = ['event', 'email']
+        unique_together = [['event', 'email'], ['event', 'idempotency_key']]
+        indexes = [
+            models.Index(fields=['event', 'status', 'registered_at']),
+        ]
     
     def __str__(self):
         return f"{self.name} - {self.event.title}"
@@ -219,7 +272,13 @@ class EventRegistration(models.Model):
         # Set payment amount from event if not set
         if not self.payment_amount:
             self.payment_amount = self.event.registration_fee
-        super().save(*args, **kwargs)
+        # Keep the Event counters in step in the same transaction
+        from .counts import save_registration
+        save_registration(self, lambda: super(EventRegistration, self).save(*args, **kwargs))
+    
+    def delete(self, *args, **kwargs):
+        from .counts import delete_registration
+        return delete_registration(self, lambda: super(EventRegistration, self).delete(*args, **kwargs))
 
 
 class EventSpeaker(models.Model):
@@ -305,3 +364,128 @@ class EventFeedback(models.Model):
     def __str__(self):
         return f"Feedback for {self.event.title} by {self.registration.name}"
 
+
+class CertificateRun(models.Model):
+    """Bulk certificate generation for an event, processed by `generate_certificates`"""
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='certificate_runs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    reissue = models.BooleanField(default=False, help_text="Regenerate certificates that were already issued")
+    
+    # Progress
+    total = models.PositiveIntegerField(default=0)
+    generated = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    locked_at = models.DateTimeField(blank=True, null=True)
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='certificate_runs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['event', 'status']),
+        ]
+    
+    def __str__(self):
+        return f"Certificates for {self.event.title} ({self.status})"
+    
+    @property
+    def progress(self):
+        if not self.total:
+            return 100 if self.status == 'done' else 0
+        return round(100 * (self.generated + self.failed) / self.total, 1)
+
+
+class EventNotification(models.Model):
+    """A message to an event's registrants; delivered through NotificationDelivery rows"""
+    
+    KIND_CHOICES = [
+        ('reminder', 'Reminder'),
+        ('venue_change', 'Venue Change'),
+        ('cancellation', 'Cancellation'),
+        ('custom', 'Custom Message'),
+    ]
+    
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, default='custom')
+    subject = models.CharField(max_length=255)
+    body = models.TextField(help_text="{name} is replaced with the registrant's name")
+    recipient_count = models.PositiveIntegerField(default=0)
+    
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='event_notifications')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['event', 'kind']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.subject}"
+
+
+class NotificationDelivery(models.Model):
+    """Outbox row: one email to one registrant, sent by `send_notifications`"""
+    
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
+    notification = models.ForeignKey(EventNotification, on_delete=models.CASCADE, related_name='deliveries')
+    registration = models.ForeignKey(
+        EventRegistration, on_delete=models.SET_NULL, null=True, blank=True, related_name='notification_deliveries'
+    )
+    email = models.EmailField()
+    name = models.CharField(max_length=200, blank=True)
+    
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(blank=True, null=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['run_after', 'id']
+        unique_together = ['notification', 'email']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+    
+    def __str__(self):
+        return f"{self.email} ({self.status})"
+
+
+class CheckInScan(models.Model):
+    """A gate scan of a ticket; queued until its attendance is written in a batch"""
+    
+    registration = models.OneToOneField(EventRegistration, on_delete=models.CASCADE, related_name='check_in_scan')
+    scanned_at = models.DateTimeField(default=timezone.now)
+    processed_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['scanned_at', 'id']
+        indexes = [
+            models.Index(fields=['processed_at', 'scanned_at']),
+        ]
+    
+    def __str__(self):
+        return f"Scan of registration {self.registration_id} ({'written' if self.processed_at else 'queued'})"
@@ -0,0 +1,294 @@
+"""
+Email notifications to event registrants, through a database outbox.
+
+Queuing a notification (a reminder, a venue change, a cancellation or a
+custom message) writes one ``NotificationDelivery`` row per recipient in the
+caller's transaction and returns immediately; nothing is sent inside a web
+request. ``python manage.py send_notifications`` claims pending rows in
+batches (one conditional UPDATE per batch, so several workers can share the
+table), sends them through Django's email backend reusing one SMTP
+connection while there is work, paces itself to ``RATE_LIMIT`` messages per
+second, and retries failures with exponential backoff up to
+``MAX_ATTEMPTS``. Delivery is at least once: a worker that dies mid-batch
+leaves its rows to be reclaimed after ``LOCK_TIMEOUT``. With the console or locmem ``EMAIL_BACKEND`` the whole
+pipeline runs locally.
+"""
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'RATE_LIMIT': 10,  # messages per second per worker
+    'BATCH_SIZE': 50,
+    'MAX_ATTEMPTS': 5,
+}
+LOCK_TIMEOUT = timedelta(minutes=10)
+RECONNECT_DELAY = timedelta(minutes=1)
+QUEUE_CHUNK_SIZE = 1000
+STATUSES = ['pending', 'sending', 'sent', 'failed']
+
+VENUE_FIELDS = ['location', 'venue', 'address', 'is_online', 'meeting_link']
+
+# kind -> (subject, body, registration statuses that receive it); {name} is filled in per recipient
+TEMPLATES = {
+    'reminder': (
+        'Reminder: {title} starts on {date}',
+        'Hi {name},\n\nThis is a reminder that {title} starts on {date} at {place}.\n\nSee you there!',
+        ['confirmed'],
+    ),
+    'venue_change': (
+        'Venue changed: {title}',
+        'Hi {name},\n\nThe venue for {title} on {date} has changed. It will now take place at {place}.',
+        ['confirmed', 'waitlisted'],
+    ),
+    'cancellation': (
+        'Cancelled: {title}',
+        'Hi {name},\n\nWe are sorry to let you know that {title}, scheduled for {date}, has been cancelled.',
+        ['confirmed', 'waitlisted'],
+    ),
+    'custom': ('', '', ['confirmed', 'waitlisted']),
+}
+
+
+def get_config():
+    config = dict(DEFAULTS)
+    config.update(getattr(settings, 'EVENTS_NOTIFICATIONS', {}))
+    return config
+
+
+def event_context(event):
+    if event.is_online:
+        place = event.meeting_link or 'online'
+    else:
+        place = ', '.join(part for part in [event.venue, event.location] if part)
+    return {
+        'name': '{name}',
+        'title': event.title,
+        'date': timezone.localtime(event.start_date).strftime('%d %B %Y, %I:%M %p'),
+        'place': place,
+    }
+
+
+def queue(event, kind, subject=None, body=None, user=None):
+    """Create a notification and its outbox rows; returns the EventNotification"""
+    from .models import EventNotification, NotificationDelivery
+
+    default_subject, default_body, statuses = TEMPLATES[kind]
+    context = event_context(event)
+    with transaction.atomic():
+        notification = EventNotification.objects.create(
+            event=event,
+            kind=kind,
+            subject=subject or default_subject.format(**context),
+            body=body or default_body.format(**context),
+            created_by=user,
+        )
+        recipients = event.registrations.filter(status__in=statuses).order_by('id').values_list('id', 'email', 'name')
+        batch = []
+        for registration_id, email, name in recipients.iterator(chunk_size=QUEUE_CHUNK_SIZE):
+            batch.append(NotificationDelivery(notification=notification, registration_id=registration_id, email=email, name=name))
+            if len(batch) >= QUEUE_CHUNK_SIZE:
+                NotificationDelivery.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        NotificationDelivery.objects.bulk_create(batch, ignore_conflicts=True)
+
+        notification.recipient_count = notification.deliveries.count()
+        notification.save(update_fields=['recipient_count'])
+    return notification
+
+
+def event_changed(event, changed_fields, user=None):
+    """Queue the notification an edit calls for: cancellation, or a venue change of an upcoming event"""
+    if 'status' in changed_fields and event.status == 'cancelled':
+        return queue(event, 'cancellation', user=user)
+    if set(VENUE_FIELDS) & set(changed_fields) and event.status == 'published' and event.start_date > timezone.now():
+        return queue(event, 'venue_change', user=user)
+    return None
+
+
+def claimable():
+    """Deliveries that are due, or stuck on a worker that died mid-batch"""
+    now = timezone.now()
+    return Q(status='pending', run_after__lte=now) | Q(status='sending', locked_at__lt=now - LOCK_TIMEOUT)
+
+
+def claim(worker_id, limit):
+    """Atomically take up to ``limit`` deliveries with one UPDATE"""
+    from .models import NotificationDelivery
+
+    token = f'{worker_id}:{uuid.uuid4().hex[:8]}'
+    candidates = list(
+        NotificationDelivery.objects.filter(claimable()).order_by('run_after', 'id').values_list('id', flat=True)[:limit]
+    )
+    if not candidates:
+        return []
+    # Rows another worker claimed in the meantime no longer match claimable()
+    NotificationDelivery.objects.filter(claimable(), pk__in=candidates).update(
+        status='sending', locked_by=token, locked_at=timezone.now(), attempts=F('attempts') + 1
+    )
+    return list(
+        NotificationDelivery.objects.filter(locked_by=token, status='sending').select_related('notification')
+    )
+
+
+def build_message(delivery, connection):
+    notification = delivery.notification
+    return EmailMessage(
+        subject=notification.subject,
+        body=notification.body.replace('{name}', delivery.name or 'there'),
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[delivery.email],
+        connection=connection,
+    )
+
+
+class RateLimiter:
+    """Spaces calls at least ``1 / rate`` seconds apart"""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0
+        self.next_at = 0.0
+
+    def wait(self):
+        now = time.monotonic()
+        if self.next_at > now:
+            time.sleep(self.next_at - now)
+        self.next_at = max(now, self.next_at) + self.interval
+
+
+def record_failure(delivery, error, max_attempts):
+    """Retry with exponential backoff until max_attempts, then give up"""
+    from .models import NotificationDelivery
+
+    changes = {'error': str(error)[:2000], 'locked_by': ''}
+    if delivery.attempts >= max_attempts:
+        changes['status'] = 'failed'
+    else:
+        changes['status'] = 'pending'
+        changes['run_after'] = timezone.now() + timedelta(minutes=2 ** delivery.attempts)
+    NotificationDelivery.objects.filter(pk=delivery.pk).update(**changes)
+
+
+def defer(deliveries, error):
+    """Hand claimed deliveries that were never attempted back to the queue, without using up an attempt"""
+    from .models import NotificationDelivery
+
+    NotificationDelivery.objects.filter(pk__in=[delivery.pk for delivery in deliveries], status='sending').update(
+        status='pending', locked_by='', attempts=F('attempts') - 1, error=str(error)[:2000],
+        run_after=timezone.now() + RECONNECT_DELAY,
+    )
+
+
+def send_batch(deliveries, connection, limiter, max_attempts):
+    """Send claimed deliveries over an open connection; returns (sent, failed)"""
+    from .models import NotificationDelivery
+
+    sent, failed = [], 0
+    try:
+        for index, delivery in enumerate(deliveries):
+            limiter.wait()
+            try:
+                if not connection.send_messages([build_message(delivery, connection)]):
+                    raise RuntimeError('Email backend did not accept the message')
+                sent.append(delivery.pk)
+            except Exception as e:
+                logger.warning('Failed to send notification delivery %s: %s', delivery.pk, e)
+                record_failure(delivery, e, max_attempts)
+                failed += 1
+                # The SMTP session may be broken; start a fresh one for the next message
+                connection.close()
+                try:
+                    connection.open()
+                except Exception as e:
+                    logger.warning('Could not reconnect to the email server: %s', e)
+                    defer(deliveries[index + 1:], e)
+                    break
+    finally:
+        # Whatever happens, messages already handed to the server must not be sent again
+        NotificationDelivery.objects.filter(pk__in=sent).update(
+            status='sent', sent_at=timezone.now(), error='', locked_by=''
+        )
+    return len(sent), failed
+
+
+def run_worker(once=False, poll_interval=5, batch_size=None, rate=None, log=None):
+    """
+    Send outbox rows until stopped. The SMTP connection stays open while
+    there is work and is closed whenever the queue runs dry.
+    """
+    config = get_config()
+    batch_size = batch_size or config['BATCH_SIZE']
+    limiter = RateLimiter(config['RATE_LIMIT'] if rate is None else rate)
+    worker_id = f'{socket.gethostname()}:{os.getpid()}'
+    connection = get_connection()
+    totals = {'sent': 0, 'failed': 0}
+
+    try:
+        while True:
+            close_old_connections()
+            deliveries = claim(worker_id, batch_size)
+            if not deliveries:
+                connection.close()
+                if once:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            try:
+                connection.open()
+            except Exception as e:
+                logger.warning('Could not connect to the email server: %s', e)
+                defer(deliveries, e)
+                if once:
+                    break
+                time.sleep(poll_interval)
+                continue
+            sent, failed = send_batch(deliveries, connection, limiter, config['MAX_ATTEMPTS'])
+            totals['sent'] += sent
+            totals['failed'] += failed
+            if log:
+                log(sent, failed)
+    finally:
+        connection.close()
+    return totals
+
+
+def status_counts(field='id', prefix=''):
+    return {status: Count(field, filter=Q(**{f'{prefix}status': status})) for status in STATUSES}
+
+
+def delivery_stats(event_ids):
+    """``{event_id: {pending, sending, sent, failed, total}}`` in one query"""
+    from .models import NotificationDelivery
+
+    rows = (
+        NotificationDelivery.objects.filter(notification__event_id__in=event_ids)
+        .values('notification__event_id')
+        .annotate(total=Count('id'), **status_counts())
+        .order_by()
+    )
+    stats = {event_id: {'total': 0, **dict.fromkeys(STATUSES, 0)} for event_id in event_ids}
+    for row in rows:
+        event_id = row.pop('notification__event_id')
+        stats[event_id] = row
+    return stats
+
+
+def notification_stats(event):
+    """The event's notifications with per-status delivery counts, newest first"""
+    return list(
+        event.notifications.annotate(**status_counts('deliveries', 'deliveries__'))
+        .order_by('-created_at')
+        .values('id', 'kind', 'subject', 'recipient_count', 'created_at', *STATUSES)
+    )
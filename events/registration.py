@@ -0,0 +1,165 @@
+"""
+Race-free event registration.
+
+Every registration, cancellation and capacity change for an event runs in a
+transaction holding a row lock on that ``Event`` (``SELECT ... FOR UPDATE``),
+so the seat check and the insert are one atomic step: concurrent requests
+for the same event queue on the lock instead of overbooking it, while
+registrations for different events never wait on each other.
+
+When an event is full and ``waitlist_enabled`` is set, new registrations
+are stored as ``waitlisted``; freeing a seat promotes the oldest waitlisted
+registrations. Clients may send an ``Idempotency-Key`` so that a retried
+submission returns the original registration instead of failing or
+creating a duplicate. Keys are stored hashed together with the submitter's
+email, so a key only ever replays its own submitter's registration, and a
+replay whose name or mobile number differ from the original is a conflict.
+"""
+import hashlib
+
+from django.db import transaction
+from django.utils import timezone
+
+from .counts import delete_registrations, update_registrations
+from .models import Event, EventRegistration
+
+
+class RegistrationError(Exception):
+    pass
+
+
+class RegistrationClosed(RegistrationError):
+    pass
+
+
+class AlreadyRegistered(RegistrationError):
+    pass
+
+
+class ReplayConflict(RegistrationError):
+    pass
+
+
+# Submitted fields that must match the original registration on a replay
+REPLAY_FIELDS = ['name', 'mobile_number']
+
+
+def lock_event(event_id):
+    return Event.objects.select_for_update().get(pk=event_id)
+
+
+def check_open(event):
+    """Registration window checks that do not depend on capacity"""
+    if not event.registration_required or event.status != 'published':
+        raise RegistrationClosed('Registration is closed for this event')
+    if event.registration_deadline and timezone.now() > event.registration_deadline:
+        raise RegistrationClosed('Registration is closed for this event')
+
+
+def scoped_key(idempotency_key, email):
+    """What is stored for an Idempotency-Key: a hash of the key and the submitter's email"""
+    if not idempotency_key or not email:
+        return None
+    return hashlib.sha256(f'{idempotency_key}:{str(email).strip().lower()}'.encode()).hexdigest()
+
+
+def check_replay(registration, data):
+    """Raise ReplayConflict when a replayed submission is not the original one"""
+    for field in REPLAY_FIELDS:
+        if field in data and str(data[field] or '').strip() != str(getattr(registration, field) or '').strip():
+            raise ReplayConflict('Idempotency-Key was already used for a different submission')
+
+
+def find_replay(event_id, idempotency_key, data):
+    """
+    The registration an earlier submission of ``data`` with this key created,
+    if any; raises ReplayConflict when the key was used with other details.
+    """
+    if not hasattr(data, 'get'):
+        return None
+    key = scoped_key(idempotency_key, data.get('email'))
+    if key is None:
+        return None
+    registration = EventRegistration.objects.filter(event_id=event_id, idempotency_key=key).first()
+    if registration is not None:
+        check_replay(registration, data)
+    return registration
+
+
+def register_participant(event_id, data, idempotency_key=None):
+    """
+    Register ``data`` (validated EventRegistration fields) for an event.
+    Returns ``(registration, created)``; raises RegistrationError.
+    """
+    with transaction.atomic():
+        event = lock_event(event_id)
+
+        existing = find_replay(event.pk, idempotency_key, data)
+        if existing is not None:
+            return existing, False
+
+        check_open(event)
+        if event.registrations.filter(email=data['email']).exists():
+            raise AlreadyRegistered('You have already registered for this event')
+
+        registration_status = 'confirmed'
+        # registration_count is maintained in the locked Event row (see events.counts)
+        if event.max_participants and event.registration_count >= event.max_participants:
+            if not event.waitlist_enabled:
+                raise RegistrationClosed('Registration is closed for this event')
+            registration_status = 'waitlisted'
+
+        registration = EventRegistration.objects.create(
+            event=event,
+            status=registration_status,
+            idempotency_key=scoped_key(idempotency_key, data['email']),
+            **data
+        )
+    return registration, True
+
+
+def promote_waitlist(event):
+    """Fill free seats from the waitlist, oldest first; the caller must hold the event lock"""
+    event.refresh_from_db(fields=['max_participants', 'registration_count'])
+    waitlist = event.registrations.filter(status='waitlisted').order_by('registered_at', 'id')
+    if event.max_participants:
+        free_seats = event.max_participants - event.registration_count
+        if free_seats <= 0:
+            return []
+        waitlist = waitlist[:free_seats]
+    promoted = list(waitlist.values_list('id', flat=True))
+    if promoted:
+        update_registrations(
+            EventRegistration.objects.filter(pk__in=promoted), status='confirmed', updated_at=timezone.now()
+        )
+    return promoted
+
+
+def cancel_registration(registration):
+    """Delete a registration and hand its seat to the waitlist; returns promoted ids"""
+    with transaction.atomic():
+        event = lock_event(registration.event_id)
+        registration.refresh_from_db(fields=['status'])
+        was_confirmed = registration.status == 'confirmed'
+        registration.delete()
+        if was_confirmed:
+            return promote_waitlist(event)
+    return []
+
+
+def cancel_registrations(registrations):
+    """Delete a queryset of registrations, promoting waitlists per event"""
+    promoted = []
+    event_ids = set(registrations.values_list('event_id', flat=True))
+    for event_id in sorted(event_ids):
+        with transaction.atomic():
+            event = lock_event(event_id)
+            delete_registrations(registrations.filter(event_id=event_id))
+            promoted += promote_waitlist(event)
+    return promoted
+
+
+def capacity_changed(event_id):
+    """Promote waitlisted registrations after max_participants was raised or removed"""
+    with transaction.atomic():
+        return promote_waitlist(lock_event(event_id))
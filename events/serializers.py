@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from .checkin import make_token
 from .models import Event, EventRegistration, EventSpeaker, EventSchedule, EventFeedback
 
 
@@ -41,7 +42,7 @@ class EventSerializer(serializers.ModelSerializer):
             'id', 'title', 'description', 'event_type', 'status',
             'start_date', 'end_date', 'registration_deadline',
             'location', 'venue', 'address', 'is_online', 'meeting_link',
-            'registration_required', 'max_participants',
+            'registration_required', 'max_participants', 'waitlist_enabled',
             'registration_fee', 'payment_required', 'payment_qr_code',
             'payment_upi_id', 'payment_instructions',
             'contact_person', 'contact_email', 'contact_phone',
@@ -50,7 +51,7 @@ class EventSerializer(serializers.ModelSerializer):
             'created_by_name', 'created_at', 'updated_at',
             'speakers', 'schedule',
             'is_upcoming', 'is_past', 'is_ongoing', 'is_registration_open',
-            'registration_count', 'spots_remaining'
+            'registration_count', 'attended_count', 'paid_count', 'spots_remaining'
         ]
         read_only_fields = ['created_at', 'updated_at']
 
@@ -68,7 +69,7 @@ class EventListSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'description', 'event_type', 'status',
             'start_date', 'end_date', 'location', 'venue',
-            'registration_required', 'max_participants', 'registration_fee',
+            'registration_required', 'max_participants', 'waitlist_enabled', 'registration_fee',
             'banner_image', 'is_featured',
             'created_by_name', 'created_at',
             'is_upcoming', 'is_registration_open', 'registration_count', 'spots_remaining'
@@ -79,21 +80,28 @@ class EventRegistrationSerializer(serializers.ModelSerializer):
     event_title = serializers.CharField(source='event.title', read_only=True)
     event_date = serializers.DateTimeField(source='event.start_date', read_only=True)
     payment_status_display = serializers.CharField(source='get_payment_status_display', read_only=True)
+    checkin_token = serializers.SerializerMethodField()
     
     class Meta:
         model = EventRegistration
         fields = [
-            'id', 'event', 'event_title', 'event_date',
+            'id', 'event', 'event_title', 'event_date', 'status',
             'name', 'email', 'mobile_number',
             'institution', 'department', 'year_of_study',
             'organization', 'designation',
             'payment_status', 'payment_status_display', 'payment_amount',
             'payment_date', 'payment_reference',
             'dietary_requirements', 'special_needs',
-            'attended', 'certificate_issued',
+            'attended', 'certificate_issued', 'certificate_file', 'checkin_token',
             'registered_at', 'updated_at'
         ]
-        read_only_fields = ['registered_at', 'updated_at', 'payment_amount']
+        read_only_fields = ['registered_at', 'updated_at', 'payment_amount', 'status', 'certificate_file']
+    
+    def get_checkin_token(self, obj):
+        """Signed ticket for the QR code; waitlisted registrations and idempotent replays get none"""
+        if self.context.get('replay'):
+            return None
+        return make_token(obj) if obj.pk and obj.status == 'confirmed' else None
     
     def validate_email(self, value):
         """Ensure email is unique per event"""
@@ -146,15 +154,23 @@ class EventFeedbackSerializer(serializers.ModelSerializer):
 
 class EventRegistrationCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating event registrations (event field is set automatically)"""
+    checkin_token = serializers.SerializerMethodField()
     
     class Meta:
         model = EventRegistration
         fields = [
+            'id', 'status',
             'name', 'email', 'mobile_number',
             'institution', 'department', 'year_of_study',
             'organization', 'designation',
-            'dietary_requirements', 'special_needs'
+            'dietary_requirements', 'special_needs', 'checkin_token'
         ]
+        read_only_fields = ['id', 'status']
+    
+    def get_checkin_token(self, obj):
+        if self.context.get('replay'):
+            return None
+        return make_token(obj) if obj.pk and obj.status == 'confirmed' else None
     
     def validate_email(self, value):
         """Ensure email is unique per event"""
@@ -0,0 +1,38 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import analytics, caching
+from .models import Event, EventFeedback, EventRegistration, EventSchedule, EventSpeaker
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+@receiver(post_save, sender=EventRegistration)
+@receiver(post_delete, sender=EventRegistration)
+def invalidate_event_cache(sender, raw=False, **kwargs):
+    """Cached stats/upcoming/featured go stale once the change is committed"""
+    if raw:
+        return
+    transaction.on_commit(caching.invalidate)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=EventFeedback)
+@receiver(post_delete, sender=EventFeedback)
+def invalidate_feedback_analytics(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    analytics.invalidate_on_commit(instance.pk if sender is Event else instance.event_id)
+
+
+@receiver(post_save, sender=EventSchedule)
+@receiver(post_delete, sender=EventSchedule)
+@receiver(post_save, sender=EventSpeaker)
+@receiver(post_delete, sender=EventSpeaker)
+def touch_event(sender, instance, raw=False, **kwargs):
+    """Sessions and speakers have no updated_at; bump the event's so its .ics feed revalidates"""
+    if raw:
+        return
+    Event.objects.filter(pk=instance.event_id).update(updated_at=timezone.now())
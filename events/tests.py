@@ -0,0 +1,136 @@
+"""
+Tests for the event listing endpoints and the denormalized counters.
+
+The list, upcoming and featured endpoints must cost the same number of
+queries whether a page holds one event or a full page, each with its own
+registrations (registration counts are columns on Event, see
+``events.counts``). Editing an event must not write back counters that
+changed after it was loaded.
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.settings import api_settings
+from rest_framework.test import APIClient
+
+from .models import Event, EventRegistration
+from .serializers import EventSerializer
+
+User = get_user_model()
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class EventListingQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.creator = User.objects.create_user(username='organizer', password='x', first_name='Event', last_name='Team')
+        cls.created = 0
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def create_events(self, count, featured=False):
+        now = timezone.now()
+        for _ in range(count):
+            EventListingQueryCountTests.created += 1
+            number = EventListingQueryCountTests.created
+            event = Event.objects.create(
+                title=f'Event {number}', description='Details', event_type='workshop', status='published',
+                start_date=now + timedelta(days=number), end_date=now + timedelta(days=number, hours=3),
+                location='Main Hall', created_by=self.creator, is_featured=featured, max_participants=100,
+            )
+            for index in range(3):
+                EventRegistration.objects.create(
+                    event=event, name=f'Guest {index}', email=f'guest{index}@example.com', mobile_number='9999999999',
+                )
+
+    def get(self, url, expected_queries, expected_items):
+        cache.clear()
+        with self.assertNumQueries(expected_queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        items = data['results'] if isinstance(data, dict) else data
+        self.assertEqual(len(items), expected_items)
+        return items
+
+    def test_event_list_queries_do_not_grow_with_page_size(self):
+        page_size = api_settings.PAGE_SIZE
+
+        self.create_events(1)
+        self.get('/api/events/events/', 2, 1)
+
+        self.create_events(page_size + 5)
+        items = self.get('/api/events/events/', 2, page_size)
+        self.assertTrue(all(item['registration_count'] == 3 for item in items))
+
+    def test_upcoming_queries_do_not_grow_with_page_size(self):
+        self.create_events(1)
+        self.get('/api/events/upcoming/', 1, 1)
+
+        self.create_events(10)
+        items = self.get('/api/events/upcoming/', 1, 5)
+        self.assertTrue(all(item['spots_remaining'] == 97 for item in items))
+
+    def test_featured_queries_do_not_grow_with_page_size(self):
+        self.create_events(1, featured=True)
+        self.get('/api/events/featured/', 1, 1)
+
+        self.create_events(10, featured=True)
+        items = self.get('/api/events/featured/', 1, 3)
+        self.assertTrue(all(item['created_by_name'] == 'Event Team' for item in items))
+
+    def test_cached_listing_costs_no_queries(self):
+        self.create_events(3, featured=True)
+        self.get('/api/events/featured/', 1, 3)
+        with self.assertNumQueries(0):
+            self.client.get('/api/events/featured/')
+
+
+class EventEditCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user(username='staff', password='x', is_staff=True)
+        now = timezone.now()
+        cls.event = Event.objects.create(
+            title='Workshop', description='Details', event_type='workshop', status='published',
+            start_date=now + timedelta(days=7), end_date=now + timedelta(days=7, hours=3),
+            location='Main Hall', created_by=cls.staff, max_participants=100,
+        )
+
+    def register(self, email):
+        EventRegistration.objects.create(event=self.event, name='Guest', email=email, mobile_number='9999999999')
+
+    def test_saving_a_stale_event_keeps_the_counters(self):
+        event = Event.objects.get(pk=self.event.pk)
+        self.register('guest@example.com')
+        event.title = 'Renamed workshop'
+        event.save()
+
+        event.refresh_from_db()
+        self.assertEqual(event.title, 'Renamed workshop')
+        self.assertEqual(event.registration_count, 1)
+
+    def test_api_edit_during_a_registration_keeps_the_counters(self):
+        client = APIClient()
+        client.force_authenticate(self.staff)
+
+        def register_meanwhile(serializer, data):
+            # Lands after the view loaded the event and before it saves
+            self.register('meanwhile@example.com')
+            return data
+
+        with mock.patch.object(EventSerializer, 'validate', autospec=True, side_effect=register_meanwhile):
+            response = client.patch(f'/api/events/events/{self.event.pk}/', {'title': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        event = Event.objects.get(pk=self.event.pk)
+        self.assertEqual(event.title, 'Renamed')
+        self.assertEqual(event.registration_count, 1)
@@ -18,6 +18,14 @@ urlpatterns = [
     path('upcoming/', views.upcoming_events, name='upcoming-events'),
     path('featured/', views.featured_events, name='featured-events'),
     path('stats/', views.event_stats, name='event-stats'),
+    path('feedback-analytics/', views.feedback_comparison, name='feedback-comparison'),
+    path('cache-stats/', views.cache_stats, name='event-cache-stats'),
+    path('check-in/', views.check_in, name='check-in'),
+    path('check-in/sync/', views.sync_check_ins, name='check-in-sync'),
+    path('check-in/stats/', views.check_in_stats, name='check-in-stats'),
+    path('calendar.ics', views.events_calendar, name='events-calendar'),
+    path('calendar/<str:event_type>.ics', views.event_type_calendar, name='event-type-calendar'),
+    path('calendar/events/<int:pk>.ics', views.event_calendar, name='event-calendar'),
     path('quick-register/', views.quick_register, name='quick-register'),
     path('submit-feedback/', views.submit_feedback, name='submit-feedback'),
 ]
@@ -1,14 +1,26 @@
 from rest_framework import generics, permissions, status, viewsets
 from rest_framework.decorators import api_view, permission_classes, action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.response import Response
-from django.db.models import Q, Count
+from django.db.models import Q, Count, Sum
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.http import require_safe
 from django.utils import timezone
+import csv
+
+from . import analytics, bulk, caching, certificates, checkin, feeds, notifications
 from .models import Event, EventRegistration, EventSpeaker, EventSchedule, EventFeedback
 from .serializers import (
     EventSerializer, EventListSerializer, EventRegistrationSerializer,
     EventRegistrationCreateSerializer, EventSpeakerSerializer, EventScheduleSerializer, EventFeedbackSerializer
 )
+from .registration import (
+    RegistrationError, ReplayConflict, cancel_registration, capacity_changed, find_replay, register_participant
+)
 
 
 class EventViewSet(viewsets.ModelViewSet):
@@ -26,7 +38,9 @@ class EventViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         """Filter events based on user permissions and query params"""
-        queryset = Event.objects.all()
+        queryset = Event.objects.for_listing()
+        if self.action == 'retrieve':
+            queryset = queryset.prefetch_related('speakers', 'schedule__speaker')
         
         # Public users can only see published and active events
         if not self.request.user.is_authenticated:
@@ -56,46 +70,157 @@ class EventViewSet(viewsets.ModelViewSet):
         """Set created_by to current user"""
         serializer.save(created_by=self.request.user)
     
+    def perform_update(self, serializer):
+        """Seats freed by a capacity change go to the waitlist; registrants hear about cancellations and venue changes"""
+        before = {field: getattr(serializer.instance, field) for field in ['status', *notifications.VENUE_FIELDS]}
+        event = serializer.save()
+        capacity_changed(event.pk)
+        changed = [field for field, value in before.items() if getattr(event, field) != value]
+        notifications.event_changed(event, changed, user=self.request.user)
+    
     @action(detail=True, methods=['get'])
     def registrations(self, request, pk=None):
         """Get registrations for a specific event"""
         event = self.get_object()
-        registrations = event.registrations.all()
+        registrations = event.registrations.select_related('event')
         
         serializer = EventRegistrationSerializer(registrations, many=True)
         return Response({
             'registrations': serializer.data,
-            'count': registrations.count(),
+            'count': len(serializer.data),
             'event': event.title
         })
     
     @action(detail=True, methods=['post'])
     def register(self, request, pk=None):
-        """Register for an event"""
+        """Register for an event (waitlisted when full, if the event allows it)"""
         event = self.get_object()
+        idempotency_key = request.headers.get('Idempotency-Key')
         
-        # Check if registration is open
-        if not event.is_registration_open:
-            return Response(
-                {'error': 'Registration is closed for this event'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        # Check if user already registered (by email)
-        email = request.data.get('email')
-        if email and EventRegistration.objects.filter(event=event, email=email).exists():
+        # A retried submission gets the original registration back, without its ticket
+        try:
+            existing = find_replay(event.pk, idempotency_key, request.data)
+        except ReplayConflict as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+        if existing is not None:
             return Response(
-                {'error': 'You have already registered for this event'},
-                status=status.HTTP_400_BAD_REQUEST
+                EventRegistrationCreateSerializer(existing, context={'replay': True}).data, status=status.HTTP_200_OK
             )
         
-        # Create registration
         serializer = EventRegistrationCreateSerializer(data=request.data)
-        if serializer.is_valid():
-            serializer.save(event=event)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Capacity is checked and the seat taken under a lock on the event
+        try:
+            registration, created = register_participant(event.pk, serializer.validated_data, idempotency_key)
+        except ReplayConflict as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+        except RegistrationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(
+            EventRegistrationCreateSerializer(registration, context={'replay': not created}).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+    
+    @action(detail=True, methods=['post'], url_path='import-registrations',
+            parser_classes=[MultiPartParser, FormParser, JSONParser])
+    def import_registrations(self, request, pk=None):
+        """Bulk import offline registrations from a CSV file or a JSON list (staff only)"""
+        if not request.user.is_authenticated or not request.user.is_staff:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        event = self.get_object()
+        csv_file = request.FILES.get('csv_file')
+        if csv_file is not None:
+            try:
+                headers, missing, rows = bulk.read_csv(csv_file)
+                if missing:
+                    return Response(
+                        {'error': f'Missing required headers: {", ".join(missing)}'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                result = bulk.import_registrations(event.pk, rows)
+            except (UnicodeDecodeError, csv.Error) as e:
+                return Response({'error': f'Failed to process CSV file: {str(e)}'}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            rows = request.data.get('registrations')
+            if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+                return Response(
+                    {'error': 'Upload a csv_file or send a list of registrations'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            result = bulk.import_registrations(event.pk, rows)
+        
+        return Response(
+            {'message': 'Registration import completed', **result},
+            status=status.HTTP_201_CREATED if result['successful_imports'] else status.HTTP_200_OK
+        )
+    
+    @action(detail=True, methods=['get', 'post'])
+    def certificates(self, request, pk=None):
+        """Queue (POST) or follow (GET) bulk certificate generation for attendees (staff only)"""
+        if not request.user.is_authenticated or not request.user.is_staff:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
         
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        event = self.get_object()
+        if request.method == 'POST':
+            reissue = str(request.data.get('reissue', '')).lower() in ('1', 'true', 'yes')
+            run, created = certificates.start_run(event, user=request.user, reissue=reissue)
+            response_status = status.HTTP_202_ACCEPTED
+        else:
+            run = event.certificate_runs.first()
+            if run is None:
+                return Response({'error': 'No certificate runs for this event'}, status=status.HTTP_404_NOT_FOUND)
+            response_status = status.HTTP_200_OK
+        
+        return Response({
+            'id': run.id,
+            'status': run.status,
+            'reissue': run.reissue,
+            'total': run.total,
+            'generated': run.generated,
+            'failed': run.failed,
+            'progress': run.progress,
+            'last_error': run.last_error,
+            'created_at': run.created_at,
+            'started_at': run.started_at,
+            'finished_at': run.finished_at,
+        }, status=response_status)
+    
+    @action(detail=True, methods=['get', 'post'], url_path='notifications')
+    def notify(self, request, pk=None):
+        """Queue (POST) a message to registrants, or list (GET) sent ones with delivery stats (staff only)"""
+        if not request.user.is_authenticated or not request.user.is_staff:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        event = self.get_object()
+        if request.method == 'POST':
+            kind = request.data.get('kind', 'custom')
+            subject = request.data.get('subject')
+            body = request.data.get('body')
+            if kind not in notifications.TEMPLATES:
+                return Response(
+                    {'error': f'kind must be one of: {", ".join(notifications.TEMPLATES)}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if kind == 'custom' and not (subject and body):
+                return Response({'error': 'subject and body are required'}, status=status.HTTP_400_BAD_REQUEST)
+            
+            notification = notifications.queue(event, kind, subject=subject, body=body, user=request.user)
+            return Response({
+                'id': notification.id,
+                'kind': notification.kind,
+                'subject': notification.subject,
+                'recipient_count': notification.recipient_count
+            }, status=status.HTTP_202_ACCEPTED)
+        
+        return Response({
+            'event': event.title,
+            'delivery_stats': notifications.delivery_stats([event.pk])[event.pk],
+            'notifications': notifications.notification_stats(event)
+        })
     
     @action(detail=True, methods=['get'])
     def speakers(self, request, pk=None):
@@ -123,6 +248,15 @@ class EventViewSet(viewsets.ModelViewSet):
         
         serializer = EventFeedbackSerializer(feedback, many=True)
         return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'], url_path='feedback-analytics')
+    def feedback_analytics(self, request, pk=None):
+        """Rating distributions, means, recommend score and response rate for an event (staff only)"""
+        if not request.user.is_authenticated or not request.user.is_staff:
+            return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+        
+        event = self.get_object()
+        return Response(analytics.get_analytics([event.pk])[event.pk])
 
 
 class EventRegistrationViewSet(viewsets.ModelViewSet):
@@ -155,6 +289,38 @@ class EventRegistrationViewSet(viewsets.ModelViewSet):
         
         return queryset.none()
     
+    def create(self, request, *args, **kwargs):
+        """Register through the capacity-safe engine; replays return the original without its ticket"""
+        try:
+            existing = find_replay(
+                int(request.data.get('event')), request.headers.get('Idempotency-Key'), request.data
+            )
+        except (TypeError, ValueError):
+            existing = None
+        except ReplayConflict as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+        if existing is not None:
+            return Response(
+                self.get_serializer(existing, context={**self.get_serializer_context(), 'replay': True}).data,
+                status=status.HTTP_200_OK
+            )
+        return super().create(request, *args, **kwargs)
+    
+    def perform_create(self, serializer):
+        data = dict(serializer.validated_data)
+        event = data.pop('event')
+        try:
+            serializer.instance, created = register_participant(
+                event.pk, data, self.request.headers.get('Idempotency-Key')
+            )
+        except RegistrationError as e:
+            raise ValidationError({'error': str(e)})
+        serializer.context['replay'] = not created
+    
+    def perform_destroy(self, instance):
+        """Cancelling a confirmed registration promotes the waitlist"""
+        cancel_registration(instance)
+    
     @action(detail=True, methods=['post'])
     def mark_attended(self, request, pk=None):
         """Mark registration as attended (staff only)"""
@@ -172,7 +338,7 @@ class EventRegistrationViewSet(viewsets.ModelViewSet):
     
     @action(detail=True, methods=['post'])
     def issue_certificate(self, request, pk=None):
-        """Issue certificate (staff only)"""
+        """Render and issue the participation certificate (staff only)"""
         if not request.user.is_authenticated or request.user.role not in ['superuser', 'faculty_coordinator', 'tech_head']:
             return Response(
                 {'error': 'Permission denied'},
@@ -180,10 +346,12 @@ class EventRegistrationViewSet(viewsets.ModelViewSet):
             )
         
         registration = self.get_object()
-        registration.certificate_issued = True
-        registration.save()
+        certificates.issue_certificate(registration)
         
-        return Response({'message': 'Certificate issued'})
+        return Response({
+            'message': 'Certificate issued',
+            'certificate_file': self.get_serializer(registration).data['certificate_file']
+        })
     
     @action(detail=True, methods=['post'])
     def verify_payment(self, request, pk=None):
@@ -273,50 +441,204 @@ class EventFeedbackViewSet(viewsets.ModelViewSet):
 @permission_classes([permissions.AllowAny])
 def upcoming_events(request):
     """Get upcoming events for display"""
-    events = Event.objects.filter(
+    events = Event.objects.for_listing().filter(
         status='published',
         is_active=True,
         start_date__gt=timezone.now()
     ).order_by('start_date')[:5]
     
-    serializer = EventListSerializer(events, many=True)
-    return Response(serializer.data)
+    return Response(caching.get_or_compute(
+        'upcoming_events', lambda: EventListSerializer(events, many=True).data
+    ))
 
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def featured_events(request):
     """Get featured events"""
-    events = Event.objects.filter(
+    events = Event.objects.for_listing().filter(
         status='published',
         is_active=True,
         is_featured=True
     ).order_by('-start_date')[:3]
     
-    serializer = EventListSerializer(events, many=True)
-    return Response(serializer.data)
+    return Response(caching.get_or_compute(
+        'featured_events', lambda: EventListSerializer(events, many=True).data
+    ))
 
 
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])
 def event_stats(request):
     """Get event statistics"""
-    total_events = Event.objects.count()
-    published_events = Event.objects.filter(status='published').count()
-    upcoming_events = Event.objects.filter(
-        status='published',
-        start_date__gt=timezone.now()
-    ).count()
-    total_registrations = EventRegistration.objects.count()
+    return Response(caching.get_or_compute('event_stats', compute_event_stats))
+
+
+def compute_event_stats():
+    # One pass over Event; registrations are summed from the denormalized counters
+    stats = Event.objects.aggregate(
+        total_events=Count('id'),
+        published_events=Count('id', filter=Q(status='published')),
+        upcoming_events=Count('id', filter=Q(status='published', start_date__gt=timezone.now())),
+        total_registrations=Sum('registration_count'),
+    )
+    
+    return {
+        'total_events': stats['total_events'],
+        'published_events': stats['published_events'],
+        'upcoming_events': stats['upcoming_events'],
+        'total_registrations': stats['total_registrations'] or 0
+    }
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def feedback_comparison(request):
+    """Feedback analytics side by side for ?events=1,2,3 or ?event_type=... (staff only)"""
+    if not request.user.is_staff:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    event_ids = request.query_params.get('events')
+    if event_ids:
+        try:
+            event_ids = [int(event_id) for event_id in event_ids.split(',') if event_id.strip()]
+        except ValueError:
+            return Response({'error': 'events must be a comma-separated list of ids'}, status=status.HTTP_400_BAD_REQUEST)
+    else:
+        events = Event.objects.filter(is_active=True, status__in=['published', 'completed'])
+        event_type = request.query_params.get('event_type')
+        if event_type:
+            events = events.filter(event_type=event_type)
+        event_ids = list(events.order_by('-start_date').values_list('id', flat=True)[:analytics.MAX_EVENTS])
+    
+    if len(event_ids) > analytics.MAX_EVENTS:
+        return Response({'error': f'At most {analytics.MAX_EVENTS} events'}, status=status.HTTP_400_BAD_REQUEST)
     
+    results = analytics.get_analytics(event_ids)
     return Response({
-        'total_events': total_events,
-        'published_events': published_events,
-        'upcoming_events': upcoming_events,
-        'total_registrations': total_registrations
+        'events': [results[event_id] for event_id in event_ids if event_id in results],
+        'count': len(results)
     })
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def cache_stats(request):
+    """This worker's hit/miss/stale counters and TTLs for the cached event endpoints (staff only)"""
+    if not request.user.is_staff:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    return Response(caching.get_stats())
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def check_in(request):
+    """Scan a QR ticket at the gate (staff only); attendance is queued and written in batches"""
+    if not request.user.is_staff:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    token = request.data.get('token')
+    if not token:
+        return Response({'error': 'token is required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        result = checkin.check_in(token, event_id=request.data.get('event_id'))
+    except (checkin.InvalidTicket, TypeError, ValueError) as e:
+        return Response({'status': 'invalid', 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if result['status'] in checkin.REJECTED:
+        return Response({**result, 'error': checkin.REJECTED[result['status']]}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(result)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def sync_check_ins(request):
+    """Upload scans queued by an offline scanner device (staff only)"""
+    if not request.user.is_staff:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    scans = request.data.get('scans')
+    if not isinstance(scans, list) or not scans:
+        return Response({'error': 'scans must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(scans) > 5000:
+        return Response({'error': 'At most 5000 scans per request'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        results = checkin.sync_scans(scans, event_id=request.data.get('event_id'))
+    except (TypeError, ValueError):
+        return Response({'error': 'Invalid event_id'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    summary = {}
+    for result in results:
+        summary[result['status']] = summary.get(result['status'], 0) + 1
+    return Response({'results': results, 'summary': summary})
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def check_in_stats(request):
+    """This worker's scan counts and the queued attendance writes (staff only)"""
+    if not request.user.is_staff:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    return Response(checkin.get_stats())
+
+
+def calendar_response(request, scope, queryset, build, filename, allow_empty=True):
+    """Serve a feed, answering polls for an unchanged one with 304 Not Modified"""
+    version, last_modified = feeds.get_validator(queryset)
+    if last_modified is None and not allow_empty:
+        raise Http404('Event not found')
+    etag = quote_etag(version)
+    last_modified_ts = int(last_modified.timestamp()) if last_modified else None
+    
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified_ts)
+    if response is None:
+        response = HttpResponse(feeds.get_body(scope, version, build), content_type='text/calendar; charset=utf-8')
+        response['Content-Disposition'] = f'inline; filename="{filename}"'
+    
+    response['ETag'] = etag
+    if last_modified_ts is not None:
+        response['Last-Modified'] = http_date(last_modified_ts)
+    patch_cache_control(response, public=True, max_age=feeds.MAX_AGE)
+    return response
+
+
+@require_safe
+def events_calendar(request):
+    """iCalendar feed of all published events"""
+    queryset = feeds.published_events()
+    return calendar_response(
+        request, 'all', queryset, lambda: feeds.build_events_feed(queryset, 'EESA Events'), 'eesa-events.ics'
+    )
+
+
+@require_safe
+def event_type_calendar(request, event_type):
+    """iCalendar feed of published events of one type"""
+    labels = dict(Event.EVENT_TYPES)
+    if event_type not in labels:
+        raise Http404('Unknown event type')
+    
+    queryset = feeds.published_events().filter(event_type=event_type)
+    return calendar_response(
+        request, f'type:{event_type}', queryset,
+        lambda: feeds.build_events_feed(queryset, f'EESA Events: {labels[event_type]}'), f'eesa-{event_type}.ics'
+    )
+
+
+@require_safe
+def event_calendar(request, pk):
+    """iCalendar feed of one published event and its schedule sessions"""
+    queryset = feeds.published_events().filter(pk=pk)
+    return calendar_response(
+        request, f'event:{pk}', queryset, lambda: feeds.build_event_feed(queryset), f'event-{pk}.ics',
+        allow_empty=False,
+    )
+
+
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
 def quick_register(request):
@@ -331,6 +653,20 @@ def quick_register(request):
             status=status.HTTP_404_NOT_FOUND
         )
     
+    idempotency_key = request.headers.get('Idempotency-Key')
+    try:
+        existing = find_replay(event.pk, idempotency_key, request.data)
+    except ReplayConflict as e:
+        return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+    if existing is not None:
+        return Response(
+            {
+                'message': 'Registration successful',
+                'registration': EventRegistrationSerializer(existing, context={'replay': True}).data
+            },
+            status=status.HTTP_200_OK
+        )
+    
     # Check if registration is open
     if not event.is_registration_open:
         return Response(
@@ -338,16 +674,23 @@ def quick_register(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # Create registration
+    # Create registration; capacity is enforced under a lock on the event
     serializer = EventRegistrationSerializer(data=request.data)
     if serializer.is_valid():
-        serializer.save(event=event)
+        data = dict(serializer.validated_data)
+        data.pop('event', None)
+        try:
+            registration, created = register_participant(event.pk, data, idempotency_key)
+        except ReplayConflict as e:
+            return Response({'error': str(e)}, status=status.HTTP_409_CONFLICT)
+        except RegistrationError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         return Response(
             {
                 'message': 'Registration successful',
-                'registration': serializer.data
+                'registration': EventRegistrationSerializer(registration, context={'replay': not created}).data
             },
-            status=status.HTTP_201_CREATED
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
         )
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -1,5 +1,8 @@
 from django.contrib import admin
-from .models import Company, PlacementDrive, StudentCoordinator, PlacementStatistics, PlacedStudent, PlacementBrochure
+from .models import (
+    ApplicationStatusChange, Company, PlacementDrive, StudentCoordinator, PlacementStatistics, PlacedStudent,
+    PlacementBrochure, StudentProfile
+)
 
 
 @admin.register(Company)
@@ -88,6 +91,21 @@ class PlacementDriveAdmin(admin.ModelAdmin):
 # PlacementApplication removed from admin - managed through PlacementDrive interface
 
 
+@admin.register(ApplicationStatusChange)
+class ApplicationStatusChangeAdmin(admin.ModelAdmin):
+    """Read-only audit trail of application status changes"""
+    list_display = ['application', 'field', 'from_value', 'to_value', 'changed_by', 'changed_at']
+    list_filter = ['field', 'to_value', 'changed_at']
+    search_fields = ['application__student__username', 'application__drive__title', 'note']
+    list_select_related = ['application__student', 'application__drive', 'changed_by']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(StudentCoordinator)
 class StudentCoordinatorAdmin(admin.ModelAdmin):
     list_display = ['user', 'designation', 'mobile_number', 'email', 'is_active', 'display_order']
@@ -128,7 +146,11 @@ class PlacementStatisticsAdmin(admin.ModelAdmin):
     list_display = ['batch_year', 'academic_year', 'total_students', 'total_placed', 'placement_percentage', 'average_package']
     list_filter = ['academic_year', 'batch_year']
     search_fields = ['academic_year', 'batch_year']
-    readonly_fields = ['placement_percentage', 'created_at', 'updated_at']
+    # Rolled up from placed students (placements.rollups); only total_students is entered by hand
+    readonly_fields = [
+        'placement_percentage', 'total_placed', 'highest_package', 'average_package', 'median_package',
+        'total_companies_visited', 'total_offers', 'created_at', 'updated_at'
+    ]
     
     fieldsets = (
         ('Basic Information', {
@@ -166,7 +188,7 @@ class PlacementStatisticsAdmin(admin.ModelAdmin):
 @admin.register(PlacedStudent)
 class PlacedStudentAdmin(admin.ModelAdmin):
     list_display = ['student_name', 'company', 'job_title', 'package_lpa', 'batch_year', 'is_verified', 'offer_date']
-    list_filter = ['batch_year', 'job_type', 'is_verified', 'company', 'offer_date']
+    list_filter = ['batch_year', 'branch', 'job_type', 'is_verified', 'company', 'offer_date']
     search_fields = ['student_name', 'student_email', 'roll_number', 'company__name', 'job_title']
     readonly_fields = ['created_by', 'created_at', 'updated_at']
     list_editable = ['is_verified']
@@ -174,7 +196,7 @@ class PlacedStudentAdmin(admin.ModelAdmin):
     
     fieldsets = (
         ('Student Information', {
-            'fields': ('student_name', 'student_email', 'roll_number', 'batch_year', 'cgpa', 'student_photo')
+            'fields': ('student_name', 'student_email', 'roll_number', 'batch_year', 'branch', 'cgpa', 'student_photo')
         }),
         ('Placement Details', {
             'fields': ('company', 'placement_drive', 'job_title', 'package_lpa', 'package_details', 'work_location', 'job_type')
@@ -200,6 +222,15 @@ class PlacedStudentAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
+@admin.register(StudentProfile)
+class StudentProfileAdmin(admin.ModelAdmin):
+    list_display = ['student', 'batch_year', 'cgpa', 'percentage', 'updated_at']
+    list_filter = ['batch_year']
+    search_fields = ['student__username', 'student__email', 'student__first_name', 'student__last_name']
+    readonly_fields = ['created_at', 'updated_at']
+    raw_id_fields = ['student']
+
+
 @admin.register(PlacementBrochure)
 class PlacementBrochureAdmin(admin.ModelAdmin):
     list_display = ['title', 'academic_year', 'is_current', 'uploaded_by', 'created_at']
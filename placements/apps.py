@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PlacementsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'placements'
+    
+    def ready(self):
+        import placements.signals
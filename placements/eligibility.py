@@ -0,0 +1,142 @@
+"""
+Which students are eligible for which placement drives.
+
+A drive's ``eligible_batches`` JSON list is mirrored into ``DriveBatch``
+rows so that batches can be joined and indexed instead of scanned. A
+student is eligible when their ``StudentProfile`` batch is one of the
+drive's batches and their CGPA and percentage meet the drive's minimums.
+The matches are stored as ``DriveEligibility`` rows.
+
+Saving a drive recomputes that drive's eligible set, and saving a profile
+recomputes that student's drives. Both run after commit, and only the rows
+that differ are inserted or deleted. ``python manage.py
+rebuild_drive_eligibility`` recomputes everything. With the sets
+precomputed, "drives I can apply to" and "eligible but not applied" are a
+join plus a NOT EXISTS on indexed columns.
+"""
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+
+def parse_batches(value):
+    """Graduation years from an eligible_batches list; entries may be ints or strings"""
+    batches = set()
+    for item in value or []:
+        try:
+            batches.add(int(item))
+        except (TypeError, ValueError):
+            continue
+    return batches
+
+
+def sync_batches(drive):
+    from .models import DriveBatch
+
+    wanted = parse_batches(drive.eligible_batches)
+    existing = set(DriveBatch.objects.filter(drive=drive).values_list('batch_year', flat=True))
+    if existing - wanted:
+        DriveBatch.objects.filter(drive=drive, batch_year__in=existing - wanted).delete()
+    DriveBatch.objects.bulk_create(
+        [DriveBatch(drive=drive, batch_year=batch_year) for batch_year in wanted - existing],
+        ignore_conflicts=True,
+    )
+
+
+def apply_changes(current, wanted, rows, make_row):
+    """Delete the ``rows`` that are no longer wanted and insert the missing ones; returns (added, removed)"""
+    from .models import DriveEligibility
+
+    removed, added = current - wanted, wanted - current
+    if removed:
+        rows(removed).delete()
+    DriveEligibility.objects.bulk_create([make_row(key) for key in added], ignore_conflicts=True)
+    return len(added), len(removed)
+
+
+def refresh_drive(drive_id):
+    """Recompute the students eligible for one drive"""
+    from .models import DriveBatch, DriveEligibility, PlacementDrive, StudentProfile
+
+    drive = PlacementDrive.objects.filter(pk=drive_id).first()
+    if drive is None:
+        return 0, 0
+    sync_batches(drive)
+    wanted = set(
+        StudentProfile.objects.filter(
+            batch_year__in=DriveBatch.objects.filter(drive=drive).values('batch_year'),
+            cgpa__gte=drive.min_cgpa,
+            percentage__gte=drive.min_percentage,
+        ).values_list('student_id', flat=True)
+    )
+    current = set(DriveEligibility.objects.filter(drive=drive).values_list('student_id', flat=True))
+    return apply_changes(
+        current, wanted,
+        lambda student_ids: DriveEligibility.objects.filter(drive=drive, student_id__in=student_ids),
+        lambda student_id: DriveEligibility(drive=drive, student_id=student_id),
+    )
+
+
+def refresh_student(student_id):
+    """Recompute the drives one student is eligible for"""
+    from .models import DriveEligibility, PlacementDrive, StudentProfile
+
+    profile = StudentProfile.objects.filter(student_id=student_id).first()
+    wanted = set()
+    if profile is not None:
+        wanted = set(
+            PlacementDrive.objects.filter(
+                batches__batch_year=profile.batch_year,
+                min_cgpa__lte=profile.cgpa,
+                min_percentage__lte=profile.percentage,
+            ).values_list('pk', flat=True)
+        )
+    current = set(DriveEligibility.objects.filter(student_id=student_id).values_list('drive_id', flat=True))
+    return apply_changes(
+        current, wanted,
+        lambda drive_ids: DriveEligibility.objects.filter(student_id=student_id, drive_id__in=drive_ids),
+        lambda drive_id: DriveEligibility(drive_id=drive_id, student_id=student_id),
+    )
+
+
+def refresh_drive_on_commit(drive_id):
+    transaction.on_commit(lambda: refresh_drive(drive_id))
+
+
+def refresh_student_on_commit(student_id):
+    transaction.on_commit(lambda: refresh_student(student_id))
+
+
+def rebuild():
+    """Recompute every drive; returns (drives, added, removed)"""
+    from .models import PlacementDrive
+
+    drives = added = removed = 0
+    for drive_id in PlacementDrive.objects.order_by('pk').values_list('pk', flat=True).iterator():
+        drive_added, drive_removed = refresh_drive(drive_id)
+        drives += 1
+        added += drive_added
+        removed += drive_removed
+    return drives, added, removed
+
+
+def open_drives_for(student):
+    """Active drives with registration open that the student is eligible for and has not applied to"""
+    from .models import PlacementApplication, PlacementDrive
+
+    now = timezone.now()
+    applied = PlacementApplication.objects.filter(drive=OuterRef('pk'), student=student)
+    return PlacementDrive.objects.filter(
+        eligible_students__student=student,
+        is_active=True,
+        registration_start__lte=now,
+        registration_end__gte=now,
+    ).filter(~Exists(applied))
+
+
+def eligible_not_applied(drive):
+    """Eligibility rows of students who have not applied to the drive"""
+    from .models import DriveEligibility, PlacementApplication
+
+    applied = PlacementApplication.objects.filter(drive=OuterRef('drive_id'), student=OuterRef('student_id'))
+    return DriveEligibility.objects.filter(drive=drive).filter(~Exists(applied))
@@ -0,0 +1,70 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from placements.models import Company, PlacementApplication, PlacementDrive
+from placements.serializers import PlacementDriveListSerializer, PlacementDriveSerializer
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Time serializing placement drives and report the queries it costs (regression tests: placements.tests)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--drives', type=int, default=200, help='Number of drives to serialize')
+
+    def handle(self, *args, **options):
+        count = options['drives']
+        self.stdout.write(f'🚀 Serializing {count} placement drives...')
+
+        # Everything runs in a transaction that is rolled back, so no drives are left behind
+        with transaction.atomic():
+            self.make_drives(count)
+            small = self.measure(10)
+            large = self.measure(count)
+            transaction.set_rollback(True)
+
+        for name in ['list', 'detail']:
+            small_queries, small_ms = small[name]
+            large_queries, large_ms = large[name]
+            self.stdout.write(
+                f'   {name}: 10 drives in {small_ms:.1f} ms ({small_queries} queries), '
+                f'{count} in {large_ms:.1f} ms ({large_queries} queries)'
+            )
+        self.stdout.write(self.style.SUCCESS('✅ Done'))
+
+    def make_drives(self, count):
+        suffix = time.time_ns()
+        user = User.objects.create(username=f'drive-benchmark-{suffix}')
+        students = User.objects.bulk_create([
+            User(username=f'drive-benchmark-{suffix}-{i}', email=f'student{i}@example.com') for i in range(3)
+        ])
+        now = timezone.now()
+        drives = []
+        for i in range(count):
+            company = Company.objects.create(name=f'Benchmark {suffix} {i}', created_by=user)
+            drives.append(PlacementDrive(
+                company=company, title=f'Drive {i}', description='', job_type='full_time',
+                registration_start=now, registration_end=now + timedelta(days=7),
+                drive_date=now + timedelta(days=14), created_by=user,
+            ))
+        drives = PlacementDrive.objects.bulk_create(drives)
+        PlacementApplication.objects.bulk_create([
+            PlacementApplication(drive=drive, student=student) for drive in drives for student in students
+        ])
+
+    def measure(self, count):
+        drives = PlacementDrive.objects.filter(title__startswith='Drive ').for_listing().order_by('-id')[:count]
+        results = {}
+        for name, serializer_class in [('list', PlacementDriveListSerializer), ('detail', PlacementDriveSerializer)]:
+            started = time.perf_counter()
+            with CaptureQueriesContext(connection) as captured:
+                serializer_class(drives.all(), many=True).data
+            results[name] = (len(captured), 1000 * (time.perf_counter() - started))
+        return results
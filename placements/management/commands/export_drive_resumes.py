@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from placements import resume_export
+from placements.models import PlacementDrive
+
+
+class Command(BaseCommand):
+    help = "Write a ZIP of a placement drive's applicant resumes plus a CSV manifest"
+
+    def add_arguments(self, parser):
+        parser.add_argument('drive_id', type=int)
+        parser.add_argument('--output', help='Archive path (default: <company>_<drive>_resumes.zip)')
+        parser.add_argument('--status', action='append', default=[], help='Only applications with this status (repeatable)')
+        parser.add_argument('--threads', type=int, default=None, help='Parallel fetches for remote storage (default PLACEMENTS_RESUME_FETCH_THREADS)')
+
+    def handle(self, *args, **options):
+        try:
+            drive = PlacementDrive.objects.select_related('company').get(pk=options['drive_id'])
+        except PlacementDrive.DoesNotExist:
+            raise CommandError(f'Placement drive {options["drive_id"]} not found')
+        
+        output = options['output'] or resume_export.bundle_filename(drive)
+        self.stdout.write(f'📦 Exporting resumes for {drive} to {output}...')
+        
+        written = 0
+        with open(output, 'wb') as f:
+            for chunk in resume_export.stream_bundle(drive, statuses=options['status'], threads=options['threads']):
+                f.write(chunk)
+                written += len(chunk)
+        
+        self.stdout.write(self.style.SUCCESS(f'✅ Wrote {written / 1024 / 1024:.1f} MB to {output}'))
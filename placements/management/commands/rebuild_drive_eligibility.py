@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from placements import eligibility
+
+
+class Command(BaseCommand):
+    help = 'Recompute drive batches and eligible students for every placement drive'
+
+    def handle(self, *args, **options):
+        self.stdout.write('🔄 Rebuilding drive eligibility...')
+        drives, added, removed = eligibility.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Checked {drives} drives: {added} eligibility rows added, {removed} removed'
+        ))
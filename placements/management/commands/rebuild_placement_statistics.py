@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from placements import rollups
+from placements.models import PlacementStatistics
+
+
+class Command(BaseCommand):
+    help = 'Recompute every PlacementStatistics row from the placed student records'
+
+    def handle(self, *args, **options):
+        self.stdout.write('🔄 Rebuilding placement statistics...')
+        written = rollups.rebuild()
+        
+        for stat in PlacementStatistics.objects.all():
+            self.stdout.write(
+                f'   {stat.branch} {stat.batch_year} ({stat.academic_year}): '
+                f'{stat.total_offers} offers, {stat.total_placed} placed, median {stat.median_package} LPA'
+            )
+        
+        self.stdout.write(self.style.SUCCESS(f'✅ Rebuilt {written} statistics rows'))
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placements', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='placedstudent',
+            name='branch',
+            field=models.CharField(default='Electrical & Electronics Engineering', max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='placedstudent',
+            index=models.Index(fields=['batch_year', 'branch'], name='placements__batch_y_15e046_idx'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.1.4 on 2026-10-18 06:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_drive_batches(apps, schema_editor):
+    from placements.eligibility import parse_batches
+
+    PlacementDrive = apps.get_model('placements', 'PlacementDrive')
+    DriveBatch = apps.get_model('placements', 'DriveBatch')
+    DriveBatch.objects.bulk_create([
+        DriveBatch(drive_id=drive_id, batch_year=batch_year)
+        for drive_id, batches in PlacementDrive.objects.values_list('id', 'eligible_batches').iterator()
+        for batch_year in parse_batches(batches)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placements', '0002_placed_student_branch'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DriveBatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch_year', models.IntegerField()),
+                ('drive', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='batches', to='placements.placementdrive')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['batch_year'], name='placements__batch_y_554503_idx')],
+                'unique_together': {('drive', 'batch_year')},
+            },
+        ),
+        migrations.CreateModel(
+            name='DriveEligibility',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('drive', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eligible_students', to='placements.placementdrive')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='eligible_drives', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Drive eligibilities',
+                'indexes': [models.Index(fields=['student', 'drive'], name='placements__student_a04108_idx')],
+                'unique_together': {('drive', 'student')},
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch_year', models.IntegerField(help_text='Graduation year')),
+                ('cgpa', models.DecimalField(decimal_places=2, max_digits=4)),
+                ('percentage', models.DecimalField(decimal_places=2, default=0.0, max_digits=5)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='placement_profile', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-batch_year', 'student__username'],
+                'indexes': [models.Index(fields=['batch_year', 'cgpa'], name='placements__batch_y_696c06_idx')],
+            },
+        ),
+        migrations.RunPython(populate_drive_batches, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations, models
+
+
+def merge_duplicate_groups(apps, schema_editor):
+    """
+    Collapse statistics rows that share (batch_year, branch) into the oldest
+    one, keeping the largest hand-entered total_students, and set every
+    row's academic_year to the batch's final year as the rollup does.
+    """
+    PlacementStatistics = apps.get_model('placements', 'PlacementStatistics')
+
+    kept = {}
+    for stat in PlacementStatistics.objects.order_by('created_at', 'pk'):
+        group = (stat.batch_year, stat.branch)
+        if group not in kept:
+            kept[group] = stat
+            continue
+        first = kept[group]
+        first.total_students = max(first.total_students, stat.total_students)
+        stat.delete()
+
+    for (batch_year, branch), stat in kept.items():
+        stat.academic_year = f'{batch_year - 1}-{batch_year}'
+        stat.save(update_fields=['academic_year', 'total_students'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('placements', '0004_application_status_changes'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_groups, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='placementstatistics',
+            name='academic_year',
+            field=models.CharField(help_text='e.g., 2024-2025; set from batch_year by the rollup', max_length=9),
+        ),
+        migrations.AlterUniqueTogether(
+            name='placementstatistics',
+            unique_together={('batch_year', 'branch')},
+        ),
+    ]
@@ -17,8 +17,9 @@ def resume_upload_path(instance, filename):
     """Generate upload path for placement resumes"""
     import os
     name, ext = os.path.splitext(filename)
-    safe_name = "".join(c for c in instance.student_name if c.isalnum() or c in (' ', '-', '_')).rstrip()[:20]
-    safe_company = "".join(c for c in instance.placement_drive.company.name if c.isalnum() or c in (' ', '-', '_')).rstrip()[:20]
+    student_name = instance.student.get_full_name() or instance.student.username
+    safe_name = "".join(c for c in student_name if c.isalnum() or c in (' ', '-', '_')).rstrip()[:20]
+    safe_company = "".join(c for c in instance.drive.company.name if c.isalnum() or c in (' ', '-', '_')).rstrip()[:20]
     return f'placements/resumes/{safe_company.replace(" ", "_")}/{safe_name.replace(" ", "_")}{ext}'
 
 
@@ -71,6 +72,14 @@ class Company(models.Model):
         return self.name
 
 
+class PlacementDriveQuerySet(models.QuerySet):
+    def for_listing(self):
+        """Join company and creator and count applications in the same query"""
+        return self.select_related('company__created_by', 'created_by').annotate(
+            applications_count=models.Count('applications')
+        )
+
+
 class PlacementDrive(models.Model):
     """Placement drive/recruitment event model"""
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='placement_drives')
@@ -124,6 +133,8 @@ class PlacementDrive(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     
+    objects = PlacementDriveQuerySet.as_manager()
+    
     class Meta:
         ordering = ['-drive_date']
         
@@ -201,6 +212,28 @@ class PlacementApplication(models.Model):
         return f"{self.student.get_full_name()} - {self.drive.title}"
 
 
+class ApplicationStatusChange(models.Model):
+    """Audit trail of status/result_status changes made to placement applications"""
+    application = models.ForeignKey(PlacementApplication, on_delete=models.CASCADE, related_name='status_changes')
+    field = models.CharField(max_length=20, choices=[
+        ('status', 'Status'),
+        ('result_status', 'Result Status'),
+    ])
+    from_value = models.CharField(max_length=20)
+    to_value = models.CharField(max_length=20)
+    note = models.TextField(blank=True)
+    
+    # Metadata
+    changed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    changed_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-changed_at']
+        
+    def __str__(self):
+        return f"{self.application_id}: {self.field} {self.from_value} -> {self.to_value}"
+
+
 def student_coordinator_image_upload_path(instance, filename):
     """Upload path for student coordinator images"""
     return f'coordinators/images/{instance.user.username}_{filename}'
@@ -239,9 +272,15 @@ class StudentCoordinator(models.Model):
         return f"{self.user.get_full_name()} - {self.designation}"
 
 
+DEFAULT_BRANCH = 'Electrical & Electronics Engineering'
+
+
 class PlacementStatistics(models.Model):
-    """Placement statistics for tracking and reporting"""
-    academic_year = models.CharField(max_length=9, help_text="e.g., 2024-2025")
+    """
+    Placement statistics for tracking and reporting. Everything except
+    total_students is rolled up from PlacedStudent (see placements.rollups).
+    """
+    academic_year = models.CharField(max_length=9, help_text="e.g., 2024-2025; set from batch_year by the rollup")
     batch_year = models.IntegerField(help_text="Graduation year")
     branch = models.CharField(max_length=100)
     
@@ -261,7 +300,7 @@ class PlacementStatistics(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
-        unique_together = ['academic_year', 'batch_year', 'branch']
+        unique_together = ['batch_year', 'branch']
         ordering = ['-batch_year', 'branch']
         
     def __str__(self):
@@ -281,6 +320,7 @@ class PlacedStudent(models.Model):
     student_email = models.EmailField()
     roll_number = models.CharField(max_length=50)
     batch_year = models.IntegerField(help_text="Graduation year")
+    branch = models.CharField(max_length=100, default=DEFAULT_BRANCH)
     cgpa = models.DecimalField(max_digits=4, decimal_places=2)
     
     # Placement details
@@ -324,11 +364,67 @@ class PlacedStudent(models.Model):
     class Meta:
         ordering = ['-offer_date', '-package_lpa']
         unique_together = ['student_email', 'company', 'offer_date']
+        indexes = [
+            models.Index(fields=['batch_year', 'branch']),
+        ]
         
     def __str__(self):
         return f"{self.student_name} - {self.company.name} ({self.package_lpa} LPA)"
 
 
+class StudentProfile(models.Model):
+    """A student's academic record, matched against drive requirements (see placements.eligibility)"""
+    student = models.OneToOneField(User, on_delete=models.CASCADE, related_name='placement_profile')
+    batch_year = models.IntegerField(help_text="Graduation year")
+    cgpa = models.DecimalField(max_digits=4, decimal_places=2)
+    percentage = models.DecimalField(max_digits=5, decimal_places=2, default=0.0)
+    
+    # Metadata
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        ordering = ['-batch_year', 'student__username']
+        indexes = [
+            models.Index(fields=['batch_year', 'cgpa']),
+        ]
+        
+    def __str__(self):
+        return f"{self.student.username} - {self.batch_year} ({self.cgpa} CGPA)"
+
+
+class DriveBatch(models.Model):
+    """A graduation year a drive is open to: PlacementDrive.eligible_batches as rows"""
+    drive = models.ForeignKey(PlacementDrive, on_delete=models.CASCADE, related_name='batches')
+    batch_year = models.IntegerField()
+    
+    class Meta:
+        unique_together = ['drive', 'batch_year']
+        indexes = [
+            models.Index(fields=['batch_year']),
+        ]
+        
+    def __str__(self):
+        return f"{self.drive_id} - {self.batch_year}"
+
+
+class DriveEligibility(models.Model):
+    """Precomputed: the student meets the drive's batch, CGPA and percentage criteria"""
+    drive = models.ForeignKey(PlacementDrive, on_delete=models.CASCADE, related_name='eligible_students')
+    student = models.ForeignKey(User, on_delete=models.CASCADE, related_name='eligible_drives')
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['drive', 'student']
+        indexes = [
+            models.Index(fields=['student', 'drive']),
+        ]
+        verbose_name_plural = "Drive eligibilities"
+        
+    def __str__(self):
+        return f"{self.student_id} eligible for {self.drive_id}"
+
+
 class PlacementBrochure(models.Model):
     """Department placement brochure/information documents"""
     title = models.CharField(max_length=200, help_text="Brochure title or description")
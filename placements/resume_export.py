@@ -0,0 +1,225 @@
+"""
+Streaming ZIP export of the resumes submitted to a placement drive, with a
+CSV manifest of every application.
+
+The archive is produced as a stream. ``zipfile`` writes into a small buffer
+that is drained after every chunk, and entries use data descriptors, so the
+archive is never assembled in memory or on disk. Only the per-entry records
+for the central directory and the manifest rows are kept until the end.
+
+Local files up to ``WHOLE_READ_SIZE`` are read whole before their entry is
+started, so a read error only skips that resume; larger ones are read from
+storage in ``CHUNK_SIZE`` pieces, and if one fails part way its entry is
+closed with what was read and marked as cut short in the manifest. Remote storages
+such as Cloudinary can only hand a file back whole, one HTTP request per
+resume. Those fetches run ahead of the writer in a bounded thread pool, so
+at most ``threads * 2`` resumes are held in memory. A resume that cannot
+be read is skipped and the reason is recorded in ``manifest.csv``.
+"""
+import csv
+import io
+import logging
+import os
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+WHOLE_READ_SIZE = 4 * 1024 * 1024
+UNREADABLE = 'Resume file could not be read'
+TRUNCATED = 'Resume file was cut short while reading'
+MANIFEST_NAME = 'manifest.csv'
+MANIFEST_FIELDS = [
+    'application_id', 'student_name', 'username', 'email', 'status', 'result_status', 'applied_at', 'resume', 'error',
+]
+
+
+def get_fetch_threads():
+    return getattr(settings, 'PLACEMENTS_RESUME_FETCH_THREADS', 4)
+
+
+def get_storage():
+    from .models import PlacementApplication
+
+    return PlacementApplication._meta.get_field('resume').storage
+
+
+def is_remote(storage):
+    try:
+        storage.path('')
+    except NotImplementedError:
+        return True
+    return False
+
+
+class ZipBuffer(io.RawIOBase):
+    """Write-only, unseekable sink that zipfile writes into and the generator drains"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def safe_name(text):
+    return ''.join(c for c in text if c.isalnum() or c in (' ', '-', '_')).strip().replace(' ', '_')[:40]
+
+
+def archive_name(application):
+    student = application.student
+    name = safe_name(student.get_full_name() or student.username) or 'student'
+    ext = os.path.splitext(application.resume.name)[1].lower() or '.pdf'
+    return f'resumes/{application.pk}_{name}{ext}'
+
+
+def applications_for(drive, statuses=None):
+    applications = drive.applications.select_related('student').order_by('pk')
+    if statuses:
+        applications = applications.filter(status__in=statuses)
+    return applications
+
+
+def split(data, chunk_size):
+    return (data[i:i + chunk_size] for i in range(0, len(data), chunk_size))
+
+
+def read_chunks(storage, name, chunk_size):
+    """
+    Read a small file whole now, or open a large one now and read it lazily,
+    so a missing or unreadable file fails before its entry is started
+    """
+    if storage.size(name) <= WHOLE_READ_SIZE:
+        return split(fetch(storage, name), chunk_size)
+    handle = storage.open(name, 'rb')
+
+    def chunks():
+        with handle:
+            while True:
+                chunk = handle.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    return chunks()
+
+
+def fetch(storage, name):
+    with storage.open(name, 'rb') as handle:
+        return handle.read()
+
+
+def resume_sources(applications, storage, chunk_size, threads):
+    """
+    ``(application, chunks, error)`` in application order; ``chunks`` is None
+    when there is no resume or it could not be read.
+    """
+    if not is_remote(storage):
+        for application in applications.iterator(chunk_size=500):
+            if not application.resume:
+                yield application, None, ''
+                continue
+            try:
+                chunks = read_chunks(storage, application.resume.name, chunk_size)
+            except Exception as e:
+                logger.warning('Could not read resume of application %s: %s', application.pk, e)
+                yield application, None, UNREADABLE
+                continue
+            yield application, chunks, ''
+        return
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        pending = deque()
+
+        def ready():
+            application, future = pending.popleft()
+            if future is None:
+                return application, None, ''
+            try:
+                data = future.result()
+                return application, split(data, chunk_size), ''
+            except Exception as e:
+                logger.warning('Could not fetch resume of application %s: %s', application.pk, e)
+                return application, None, UNREADABLE
+
+        for application in applications.iterator(chunk_size=500):
+            future = pool.submit(fetch, storage, application.resume.name) if application.resume else None
+            pending.append((application, future))
+            if len(pending) >= threads * 2:
+                yield ready()
+        while pending:
+            yield ready()
+
+
+def manifest_row(application, resume_name, error):
+    student = application.student
+    return [
+        application.pk,
+        student.get_full_name(),
+        student.username,
+        student.email,
+        application.status,
+        application.result_status,
+        timezone.localtime(application.applied_at).isoformat(),
+        resume_name,
+        error,
+    ]
+
+
+def stream_bundle(drive, statuses=None, chunk_size=CHUNK_SIZE, threads=None):
+    """Yield the bytes of a ZIP holding the drive's resumes and ``manifest.csv``"""
+    storage = get_storage()
+    threads = threads or get_fetch_threads()
+    buffer = ZipBuffer()
+    manifest = io.StringIO()
+    writer = csv.writer(manifest)
+    writer.writerow(MANIFEST_FIELDS)
+
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        sources = resume_sources(applications_for(drive, statuses), storage, chunk_size, threads)
+        for application, chunks, error in sources:
+            resume_name = ''
+            if chunks is not None:
+                resume_name = archive_name(application)
+                chunks = iter(chunks)
+                with archive.open(resume_name, 'w') as entry:
+                    while True:
+                        try:
+                            chunk = next(chunks, None)
+                        except Exception as e:
+                            # The entry's first bytes are already sent; close it with what was read
+                            logger.warning('Resume of application %s failed mid-read: %s', application.pk, e)
+                            error = TRUNCATED
+                            break
+                        if chunk is None:
+                            break
+                        entry.write(chunk)
+                        data = buffer.drain()
+                        if data:
+                            yield data
+            writer.writerow(manifest_row(application, resume_name, error))
+            data = buffer.drain()
+            if data:
+                yield data
+
+        archive.writestr(MANIFEST_NAME, manifest.getvalue())
+    # Closing the archive writes the central directory
+    yield buffer.drain()
+
+
+def bundle_filename(drive):
+    return f'{safe_name(drive.company.name)}_{safe_name(drive.title)}_resumes.zip'
@@ -0,0 +1,140 @@
+"""
+PlacementStatistics rolled up from PlacedStudent rows.
+
+There is one statistics row per (batch_year, branch), enforced by the
+table, and the rollup updates it in place; its academic_year is set to the
+batch's final year (batch 2025 -> "2024-2025"), when its placements happen,
+whatever was entered by hand. Offers, placed students, the highest/average/median package and the
+number of recruiting companies are computed from active PlacedStudent rows.
+total_students is the batch strength, which no other table knows, so it
+stays hand-entered and the rollup never touches it.
+
+A PlacedStudent save or delete refreshes only its own group (and the group
+it moved out of) after the transaction commits. The median comes from a
+window query that returns just the middle one or two packages per group,
+so no package list is ever loaded into Python. ``python manage.py
+rebuild_placement_statistics`` recomputes every group.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Avg, Count, F, Max, Q, Window
+from django.db.models.functions import RowNumber
+
+GROUP_FIELDS = ['batch_year', 'branch']
+ROLLUP_FIELDS = [
+    'academic_year', 'total_placed', 'highest_package', 'average_package', 'median_package',
+    'total_companies_visited', 'total_offers', 'updated_at',
+]
+CENTS = Decimal('0.01')
+
+
+def academic_year(batch_year):
+    return f'{batch_year - 1}-{batch_year}'
+
+
+def placed_students(groups=None):
+    """Active offers, optionally limited to some ``(batch_year, branch)`` groups"""
+    from .models import PlacedStudent
+
+    queryset = PlacedStudent.objects.filter(is_active=True)
+    if groups is not None:
+        condition = Q(pk__in=[])
+        for batch_year, branch in groups:
+            condition |= Q(batch_year=batch_year, branch=branch)
+        queryset = queryset.filter(condition)
+    return queryset
+
+
+def medians(queryset):
+    """``{(batch_year, branch): median package}`` from the middle row(s) of each group"""
+    partition = [F(field) for field in GROUP_FIELDS]
+    middle = (
+        queryset.order_by()
+        .annotate(
+            position=Window(RowNumber(), partition_by=partition, order_by=[F('package_lpa').asc(), F('pk').asc()]),
+            group_size=Window(Count('pk'), partition_by=partition),
+        )
+        # One row for an odd group size, the two central ones for an even size
+        .filter(Q(position=(F('group_size') + 1) / 2) | Q(position=(F('group_size') + 2) / 2))
+        .values_list(*GROUP_FIELDS, 'package_lpa')
+    )
+    packages = {}
+    for batch_year, branch, package in middle:
+        packages.setdefault((batch_year, branch), []).append(package)
+    return {group: sum(values) / len(values) for group, values in packages.items()}
+
+
+def compute(groups=None):
+    """``{(batch_year, branch): figures}`` in two queries (aggregates, then medians)"""
+    queryset = placed_students(groups)
+    rows = (
+        queryset.order_by()
+        .values(*GROUP_FIELDS)
+        .annotate(
+            total_offers=Count('pk'),
+            total_placed=Count('student_email', distinct=True),
+            total_companies_visited=Count('company', distinct=True),
+            highest_package=Max('package_lpa'),
+            average_package=Avg('package_lpa'),
+        )
+    )
+    median_packages = medians(queryset)
+
+    results = {}
+    for row in rows:
+        group = (row.pop('batch_year'), row.pop('branch'))
+        row['average_package'] = Decimal(row['average_package']).quantize(CENTS)
+        row['median_package'] = Decimal(median_packages[group]).quantize(CENTS)
+        results[group] = row
+    return results
+
+
+def empty_figures():
+    return {
+        'total_offers': 0, 'total_placed': 0, 'total_companies_visited': 0,
+        'highest_package': 0, 'average_package': 0, 'median_package': 0,
+    }
+
+
+def save(figures):
+    """Upsert statistics rows on (batch_year, branch) in one query, leaving total_students alone"""
+    from .models import PlacementStatistics
+
+    rows = [
+        PlacementStatistics(academic_year=academic_year(batch_year), batch_year=batch_year, branch=branch, **values)
+        for (batch_year, branch), values in figures.items()
+    ]
+    PlacementStatistics.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=GROUP_FIELDS,
+        update_fields=ROLLUP_FIELDS,
+    )
+
+
+def refresh(groups):
+    """Recompute the given groups; a group with no offers left is zeroed, not deleted"""
+    groups = set(groups)
+    if not groups:
+        return
+    figures = {group: empty_figures() for group in groups}
+    figures.update(compute(groups))
+    save(figures)
+
+
+def refresh_on_commit(groups):
+    transaction.on_commit(lambda: refresh(groups))
+
+
+def rebuild():
+    """Recompute every group; returns the number of statistics rows written"""
+    from .models import PlacementStatistics
+
+    figures = {
+        (batch_year, branch): empty_figures()
+        for batch_year, branch in PlacementStatistics.objects.values_list(*GROUP_FIELDS)
+    }
+    figures.update(compute())
+    save(figures)
+    return len(figures)
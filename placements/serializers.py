@@ -49,6 +49,9 @@ class PlacementDriveSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at', 'updated_at', 'created_by']
     
     def get_applications_count(self, obj):
+        # Annotated by PlacementDrive.objects.for_listing(); counted here otherwise
+        if hasattr(obj, 'applications_count'):
+            return obj.applications_count
         return obj.applications.count()
     
     def validate(self, data):
@@ -104,12 +107,15 @@ class PlacementStatisticsSerializer(serializers.ModelSerializer):
     class Meta:
         model = PlacementStatistics
         fields = [
-            'id', 'academic_year', 'batch_year', 'total_students',
+            'id', 'academic_year', 'batch_year', 'branch', 'total_students',
             'total_placed', 'highest_package', 'average_package', 'median_package',
             'total_companies_visited', 'total_offers', 'placement_percentage',
             'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        read_only_fields = [
+            'id', 'total_placed', 'highest_package', 'average_package', 'median_package',
+            'total_companies_visited', 'total_offers', 'created_at', 'updated_at'
+        ]
 
 
 # Simplified serializers for lists and dropdowns
@@ -123,13 +129,14 @@ class PlacementDriveListSerializer(serializers.ModelSerializer):
     company_name = serializers.CharField(source='company.name', read_only=True)
     company_logo = serializers.ImageField(source='company.logo', read_only=True)
     is_registration_open = serializers.ReadOnlyField()
+    applications_count = serializers.IntegerField(read_only=True)
     
     class Meta:
         model = PlacementDrive
         fields = [
             'id', 'title', 'company_name', 'company_logo', 'job_type',
             'package_lpa', 'registration_end', 'drive_date', 'location',
-            'is_registration_open', 'is_featured'
+            'is_registration_open', 'is_featured', 'applications_count'
         ]
 
 
@@ -159,7 +166,7 @@ class PlacedStudentSerializer(serializers.ModelSerializer):
         model = PlacedStudent
         fields = [
             'id', 'student_name', 'student_email', 'roll_number',
-            'batch_year', 'cgpa', 'company', 'company_details', 'placement_drive',
+            'batch_year', 'branch', 'cgpa', 'company', 'company_details', 'placement_drive',
             'job_title', 'package_lpa', 'package_details', 'work_location',
             'job_type', 'offer_date', 'joining_date', 'offer_letter',
             'student_photo', 'testimonial', 'is_verified', 'is_active',
@@ -178,7 +185,7 @@ class PlacedStudentListSerializer(serializers.ModelSerializer):
     class Meta:
         model = PlacedStudent
         fields = [
-            'id', 'student_name', 'batch_year', 'cgpa',
+            'id', 'student_name', 'batch_year', 'branch', 'cgpa',
             'company_name', 'company_logo', 'job_title', 'package_lpa',
             'work_location', 'job_type', 'job_type_display', 'offer_date',
             'is_verified', 'created_at'
@@ -0,0 +1,42 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import eligibility, rollups
+from .models import PlacedStudent, PlacementDrive, StudentProfile
+
+
+@receiver(pre_save, sender=PlacedStudent)
+def remember_group(sender, instance, raw=False, **kwargs):
+    """An edit can move an offer to another batch/branch; both groups need a refresh"""
+    instance._previous_group = None
+    if raw or instance.pk is None:
+        return
+    instance._previous_group = (
+        PlacedStudent.objects.filter(pk=instance.pk).values_list('batch_year', 'branch').first()
+    )
+
+
+@receiver(post_save, sender=PlacedStudent)
+@receiver(post_delete, sender=PlacedStudent)
+def refresh_statistics(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    groups = {(instance.batch_year, instance.branch)}
+    if getattr(instance, '_previous_group', None):
+        groups.add(instance._previous_group)
+    rollups.refresh_on_commit(groups)
+
+
+@receiver(post_save, sender=PlacementDrive)
+def refresh_drive_eligibility(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    eligibility.refresh_drive_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_delete, sender=StudentProfile)
+def refresh_student_eligibility(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    eligibility.refresh_student_on_commit(instance.student_id)
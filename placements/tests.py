@@ -0,0 +1,81 @@
+"""
+Query-count regression tests for placement drive listings.
+
+Serializing drives must cost the same number of queries for 10 drives as
+for 200, each with its own company, creator and applications (see
+``PlacementDriveQuerySet.for_listing``).
+"""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import Company, PlacementApplication, PlacementDrive
+from .serializers import PlacementDriveListSerializer, PlacementDriveSerializer
+
+User = get_user_model()
+
+APPLICATIONS_PER_DRIVE = 3
+
+
+class DriveListingQueryCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create_user(username='organizer', password='x', first_name='Placement', last_name='Cell')
+        cls.students = [
+            User.objects.create_user(username=f'student{i}', password='x', email=f'student{i}@example.com')
+            for i in range(APPLICATIONS_PER_DRIVE)
+        ]
+        now = timezone.now()
+        drives = []
+        for i in range(200):
+            company = Company.objects.create(name=f'Company {i}', created_by=cls.organizer)
+            drives.append(PlacementDrive(
+                company=company, title=f'Drive {i}', description='', job_type='full_time',
+                registration_start=now - timedelta(days=1), registration_end=now + timedelta(days=7),
+                drive_date=now + timedelta(days=14, minutes=i), created_by=cls.organizer,
+            ))
+        drives = PlacementDrive.objects.bulk_create(drives)
+        PlacementApplication.objects.bulk_create([
+            PlacementApplication(drive=drive, student=student) for drive in drives for student in cls.students
+        ])
+
+    def drives(self, count):
+        return PlacementDrive.objects.for_listing().order_by('-id')[:count]
+
+    def assert_serializes_in_one_query(self, serializer_class):
+        for count in (10, 200):
+            with self.subTest(drives=count):
+                with self.assertNumQueries(1):
+                    data = serializer_class(self.drives(count), many=True).data
+                self.assertEqual(len(data), count)
+                self.assertTrue(all(item['applications_count'] == APPLICATIONS_PER_DRIVE for item in data))
+
+    def test_list_serializer_queries_are_constant(self):
+        self.assert_serializes_in_one_query(PlacementDriveListSerializer)
+
+    def test_detail_serializer_queries_are_constant(self):
+        self.assert_serializes_in_one_query(PlacementDriveSerializer)
+
+    def test_drive_list_endpoint_queries_are_constant(self):
+        client = APIClient()
+        for page_size in (10, 100):
+            with self.subTest(page_size=page_size):
+                with self.assertNumQueries(1):
+                    response = client.get('/api/placements/drives/', {'page_size': page_size})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.json()['drives']), page_size)
+                self.assertEqual(response.json()['page_count'], page_size)
+                self.assertNotIn('count', response.json())
+
+    def test_drive_detail_endpoint_is_one_query(self):
+        client = APIClient()
+        client.force_authenticate(self.organizer)
+        drive = PlacementDrive.objects.order_by('id').first()
+        with self.assertNumQueries(1):
+            response = client.get(f'/api/placements/drives/{drive.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['company']['name'], 'Company 0')
+        self.assertEqual(response.json()['applications_count'], APPLICATIONS_PER_DRIVE)
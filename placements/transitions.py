@@ -0,0 +1,149 @@
+"""
+Bulk status changes for the applications of a placement drive.
+
+A request carries one or more transitions, each a list of application ids
+and a target ``status`` and/or ``result_status``. Everything happens in one
+transaction:
+
+- The rows are locked and read with a single query.
+- Each move is checked against ``TRANSITIONS``.
+- Every target state gets one ``UPDATE``.
+- The audit trail is written with one ``bulk_create``.
+
+Every id gets an outcome: updated, unchanged, invalid, not_found or
+duplicate. One bad id never blocks the rest.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+MAX_APPLICATIONS = 1000
+
+# field -> {current value: values it may move to}
+TRANSITIONS = {
+    'status': {
+        'applied': {'shortlisted', 'rejected', 'withdrawn'},
+        'shortlisted': {'selected', 'rejected', 'withdrawn'},
+        'selected': {'withdrawn'},
+        'rejected': set(),
+        'withdrawn': set(),
+    },
+    'result_status': {
+        'pending': {'selected', 'not_selected'},
+        'selected': set(),
+        'not_selected': set(),
+    },
+}
+
+
+class TransitionError(Exception):
+    pass
+
+
+def parse_transitions(data):
+    """
+    ``[(ids, target)]`` from ``{"ids": [...], "status": ...}`` or from
+    ``{"transitions": [{"ids": [...], "status": ..., "result_status": ...}, ...]}``.
+    """
+    if not hasattr(data, 'get'):
+        raise TransitionError('Expected an object')
+    groups = data.get('transitions', [data])
+    if not isinstance(groups, list) or not groups:
+        raise TransitionError('transitions must be a non-empty list')
+
+    parsed = []
+    for group in groups:
+        if not isinstance(group, dict):
+            raise TransitionError('Each transition must be an object')
+        target = {field: group[field] for field in TRANSITIONS if group.get(field)}
+        if not target:
+            raise TransitionError('Each transition needs a status or result_status')
+        for field, value in target.items():
+            if value not in TRANSITIONS[field]:
+                raise TransitionError(f'Unknown {field}: {value}')
+        ids = group.get('ids')
+        if not isinstance(ids, list) or not ids:
+            raise TransitionError('Each transition needs a non-empty ids list')
+        try:
+            ids = [int(application_id) for application_id in ids]
+        except (TypeError, ValueError):
+            raise TransitionError('ids must be integers')
+        parsed.append((ids, target))
+
+    if sum(len(ids) for ids, _ in parsed) > MAX_APPLICATIONS:
+        raise TransitionError(f'At most {MAX_APPLICATIONS} applications per request')
+    return parsed
+
+
+def check(current, target):
+    """The reason a move is not allowed, or None"""
+    for field, value in target.items():
+        if current[field] != value and value not in TRANSITIONS[field][current[field]]:
+            return f'Cannot change {field} from {current[field]} to {value}'
+    return None
+
+
+def apply_transitions(drive, groups, user=None, note=''):
+    """Apply parsed transitions to the drive's applications; returns one outcome per requested id"""
+    from .models import ApplicationStatusChange, PlacementApplication
+
+    outcomes = []
+    updates = {}
+    changes = []
+    seen = set()
+    with transaction.atomic():
+        requested = [application_id for ids, _ in groups for application_id in ids]
+        current = {
+            row['id']: row
+            for row in PlacementApplication.objects.select_for_update()
+            .filter(drive=drive, pk__in=requested)
+            .values('id', 'status', 'result_status')
+        }
+
+        for ids, target in groups:
+            for application_id in ids:
+                if application_id in seen:
+                    outcomes.append({'id': application_id, 'outcome': 'duplicate', 'error': 'Listed more than once'})
+                    continue
+                seen.add(application_id)
+
+                row = current.get(application_id)
+                if row is None:
+                    outcomes.append({'id': application_id, 'outcome': 'not_found', 'error': 'Not an application for this drive'})
+                    continue
+                error = check(row, target)
+                if error:
+                    outcomes.append({
+                        'id': application_id, 'outcome': 'invalid', 'error': error,
+                        'status': row['status'], 'result_status': row['result_status'],
+                    })
+                    continue
+
+                changed = {field: value for field, value in target.items() if row[field] != value}
+                if changed:
+                    updates.setdefault(tuple(sorted(target.items())), []).append(application_id)
+                    changes.extend(
+                        ApplicationStatusChange(
+                            application_id=application_id, field=field, from_value=row[field], to_value=value,
+                            note=note, changed_by=user,
+                        )
+                        for field, value in changed.items()
+                    )
+                outcomes.append({
+                    'id': application_id,
+                    'outcome': 'updated' if changed else 'unchanged',
+                    'status': target.get('status', row['status']),
+                    'result_status': target.get('result_status', row['result_status']),
+                })
+
+        now = timezone.now()
+        for target, ids in updates.items():
+            PlacementApplication.objects.filter(pk__in=ids).update(updated_at=now, **dict(target))
+        ApplicationStatusChange.objects.bulk_create(changes)
+    return outcomes
+
+
+def summarize(outcomes):
+    summary = dict.fromkeys(['updated', 'unchanged', 'invalid', 'not_found', 'duplicate'], 0)
+    for outcome in outcomes:
+        summary[outcome['outcome']] += 1
+    return summary
@@ -9,10 +9,14 @@ urlpatterns = [
     # Placement drive endpoints
     path('drives/', views.placement_drives_list, name='placement_drives_list'),
     path('drives/<int:pk>/', views.placement_drive_detail, name='placement_drive_detail'),
+    path('drives/eligible/', views.eligible_drives, name='eligible_drives'),
+    path('drives/<int:pk>/eligible-students/', views.drive_eligible_students, name='drive_eligible_students'),
+    path('drives/<int:pk>/resumes/', views.drive_resume_bundle, name='drive_resume_bundle'),
     
     # Application endpoints
     path('applications/', views.placement_applications_list, name='placement_applications_list'),
     path('applications/<int:pk>/', views.placement_application_detail, name='placement_application_detail'),
+    path('drives/<int:pk>/applications/transition/', views.transition_applications, name='transition_applications'),
     
     # Placed students endpoints
     path('placed-students/', views.placed_students_list, name='placed_students_list'),
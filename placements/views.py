@@ -1,10 +1,13 @@
 from rest_framework import status, permissions
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django.db.models import Q, Count
 from accounts.permissions import IsAdminOrTechnicalHead
-from .models import Company, PlacementDrive, PlacementApplication, StudentCoordinator, PlacementStatistics
+from academics.pagination import get_page_size
+from . import eligibility, resume_export, transitions
+from .models import Company, DriveEligibility, PlacementDrive, PlacementApplication, StudentCoordinator, PlacementStatistics
 from .serializers import (
     CompanySerializer, CompanyListSerializer,
     PlacementDriveSerializer, PlacementDriveListSerializer,
@@ -100,7 +103,7 @@ def placement_drives_list(request):
     """List all placement drives or create a new drive"""
     if request.method == 'GET':
         # Public access for GET requests
-        drives = PlacementDrive.objects.filter(is_active=True).select_related('company')
+        drives = PlacementDrive.objects.filter(is_active=True).for_listing()
         
         # Apply filters
         status_filter = request.GET.get('status')
@@ -124,10 +127,26 @@ def placement_drives_list(request):
                 Q(description__icontains=search)
             )
         
+        try:
+            page = max(1, int(request.GET.get('page', 1)))
+        except ValueError:
+            return Response({'error': 'page must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        page_size = get_page_size(request)
+        
+        # One extra row tells whether another page follows, without a COUNT query;
+        # so there is no total, and 'page_count' is the number of drives on this page
+        offset = (page - 1) * page_size
+        drives = list(drives.order_by('-drive_date', '-id')[offset:offset + page_size + 1])
+        has_more = len(drives) > page_size
+        drives = drives[:page_size]
+        
         serializer = PlacementDriveListSerializer(drives, many=True)
         return Response({
             'drives': serializer.data,
-            'count': drives.count()
+            'page_count': len(drives),
+            'page': page,
+            'page_size': page_size,
+            'has_more': has_more
         })
     
     elif request.method == 'POST':
@@ -154,7 +173,7 @@ def placement_drives_list(request):
 def placement_drive_detail(request, pk):
     """Get, update or delete a placement drive"""
     try:
-        drive = PlacementDrive.objects.select_related('company', 'created_by').get(pk=pk)
+        drive = PlacementDrive.objects.for_listing().get(pk=pk)
     except PlacementDrive.DoesNotExist:
         return Response({'error': 'Placement drive not found'}, status=status.HTTP_404_NOT_FOUND)
     
@@ -186,6 +205,72 @@ def placement_drive_detail(request, pk):
         return Response({'message': 'Placement drive deleted successfully'})
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def eligible_drives(request):
+    """Open drives the current student is eligible for and has not applied to yet"""
+    drives = eligibility.open_drives_for(request.user).for_listing().order_by('registration_end', 'id')
+    serializer = PlacementDriveListSerializer(drives, many=True)
+    return Response({
+        'drives': serializer.data,
+        'count': len(serializer.data)
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def drive_eligible_students(request, pk):
+    """Students eligible for a drive; ?not_applied=true keeps those who have not applied (staff only)"""
+    if not request.user.is_staff:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        drive = PlacementDrive.objects.get(pk=pk)
+    except PlacementDrive.DoesNotExist:
+        return Response({'error': 'Placement drive not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    if request.GET.get('not_applied', 'false').lower() == 'true':
+        rows = eligibility.eligible_not_applied(drive)
+    else:
+        rows = DriveEligibility.objects.filter(drive=drive)
+    
+    try:
+        page = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        return Response({'error': 'page must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+    page_size = get_page_size(request)
+    
+    offset = (page - 1) * page_size
+    rows = list(
+        rows.order_by('student_id').values(
+            'student_id', 'student__username', 'student__first_name', 'student__last_name', 'student__email',
+            'student__placement_profile__batch_year', 'student__placement_profile__cgpa',
+            'student__placement_profile__percentage'
+        )[offset:offset + page_size + 1]
+    )
+    has_more = len(rows) > page_size
+    students = [
+        {
+            'id': row['student_id'],
+            'username': row['student__username'],
+            'name': f"{row['student__first_name']} {row['student__last_name']}".strip(),
+            'email': row['student__email'],
+            'batch_year': row['student__placement_profile__batch_year'],
+            'cgpa': row['student__placement_profile__cgpa'],
+            'percentage': row['student__placement_profile__percentage'],
+        }
+        for row in rows[:page_size]
+    ]
+    
+    return Response({
+        'students': students,
+        'count': len(students),
+        'page': page,
+        'page_size': page_size,
+        'has_more': has_more
+    })
+
+
 # Application views
 @api_view(['GET', 'POST'])
 @permission_classes([permissions.IsAuthenticated])
@@ -297,6 +382,51 @@ def placement_application_detail(request, pk):
             return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
 
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def transition_applications(request, pk):
+    """Move many of a drive's applications to new status/result_status values at once (staff only)"""
+    if not request.user.is_staff:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        drive = PlacementDrive.objects.get(pk=pk)
+    except PlacementDrive.DoesNotExist:
+        return Response({'error': 'Placement drive not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    try:
+        groups = transitions.parse_transitions(request.data)
+    except transitions.TransitionError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    outcomes = transitions.apply_transitions(drive, groups, user=request.user, note=request.data.get('note', ''))
+    return Response({
+        'results': outcomes,
+        'summary': transitions.summarize(outcomes)
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def drive_resume_bundle(request, pk):
+    """Stream a ZIP of a drive's applicant resumes with a CSV manifest; ?status= filters (staff only)"""
+    if not request.user.is_staff:
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+    
+    try:
+        drive = PlacementDrive.objects.select_related('company').get(pk=pk)
+    except PlacementDrive.DoesNotExist:
+        return Response({'error': 'Placement drive not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    statuses = [value for value in request.GET.get('status', '').split(',') if value]
+    response = StreamingHttpResponse(
+        resume_export.stream_bundle(drive, statuses=statuses),
+        content_type='application/zip'
+    )
+    response['Content-Disposition'] = f'attachment; filename="{resume_export.bundle_filename(drive)}"'
+    return response
+
+
 # Statistics views
 @api_view(['GET'])
 @permission_classes([permissions.AllowAny])  # Changed to allow public access